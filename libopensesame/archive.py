@@ -0,0 +1,599 @@
+#-*- coding:utf-8 -*-
+
+"""
+This file is part of OpenSesame.
+
+OpenSesame is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+OpenSesame is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with OpenSesame.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from libopensesame import debug, misc
+from libopensesame.exceptions import osexception
+import gzip
+import os
+import shutil
+import tarfile
+import time
+import zipfile
+import zlib
+
+zip_ext = u'.opensesame.zip'
+
+class archive_writer(object):
+
+	"""
+	desc: |
+		Writes an .opensesame.tar.gz archive as a series of gzip members, one
+		for each file. Concatenated gzip members are read as a single stream,
+		so the result is a regular .tar.gz file.
+
+		Files are read from disk while they are compressed, so no temporary
+		copies are made. Because each file is compressed separately, files
+		that have not changed since the previous archive was written, judging
+		by their size and modification time, are copied from the previous
+		archive as they are, without being compressed again. A file that was
+		modified shortly before it was written may be modified again without
+		a change in its modification time, so for such files a CRC32 checksum
+		is also compared.
+	"""
+
+	chunk_size = 1024**2
+	# The time in seconds within which a modification time may not change
+	# after a file has been modified. This is two seconds for FAT file
+	# systems.
+	mtime_resolution = 2
+
+	def __init__(self, path, compresslevel=9, previous=None):
+
+		"""
+		desc:
+			Constructor.
+
+		arguments:
+			path:
+				desc:	The path of the archive.
+				type:	unicode
+
+		keywords:
+			compresslevel:
+				desc:	The gzip compression level, from 1 (fastest) to 9
+						(smallest).
+				type:	int
+			previous:
+				desc:	The index of a previously written archive, as returned
+						by `close()`, or None.
+				type:	[dict, NoneType]
+		"""
+
+		self.path = path
+		self.compresslevel = compresslevel
+		self._fd = open(path.encode(misc.filesystem_encoding()), u'wb')
+		# The offset in the uncompressed tar stream
+		self._offset = 0
+		self._members = {}
+		self._previous = None
+		self._previous_fd = None
+		if previous is not None and valid_index(previous):
+			self._previous = previous
+			self._previous_fd = open(previous[u'path'].encode(
+				misc.filesystem_encoding()), u'rb')
+
+	def add_dir(self, arcname):
+
+		"""
+		desc:
+			Adds a folder to the archive.
+
+		arguments:
+			arcname:
+				desc:	The name of the folder in the archive.
+				type:	str
+		"""
+
+		info = tarfile.TarInfo(arcname)
+		info.type = tarfile.DIRTYPE
+		info.mode = 0755
+		info.mtime = int(time.time())
+		self._write_member(info, None)
+
+	def add_file(self, src, arcname, reuse=True):
+
+		"""
+		desc:
+			Adds a file to the archive.
+
+		arguments:
+			src:
+				desc:	The path of the file.
+				type:	unicode
+			arcname:
+				desc:	The name of the file in the archive.
+				type:	str
+
+		keywords:
+			reuse:
+				desc:	Indicates whether the file can be copied from the
+						previous archive if its size and modification time have
+						not changed.
+				type:	bool
+		"""
+
+		_src = src.encode(misc.filesystem_encoding())
+		st = os.stat(_src)
+		key = st.st_size, st.st_mtime
+		if reuse and self._previous is not None:
+			member = self._previous[u'members'].get(arcname)
+			if member is not None and member[0] == key and (member[4] is None
+				or member[4] == file_crc32(_src)):
+				self._copy_member(arcname, member)
+				return
+		info = tarfile.TarInfo(arcname)
+		info.size = st.st_size
+		info.mtime = int(st.st_mtime)
+		info.mode = 0644
+		checksum = time.time() - st.st_mtime < self.mtime_resolution
+		with open(_src, u'rb') as fd:
+			self._write_member(info, fd, key, checksum)
+
+	def close(self):
+
+		"""
+		desc:
+			Finishes and closes the archive.
+
+		returns:
+			desc:	An index of the archive, which can be passed as `previous`
+					to the next writer.
+			type:	dict
+		"""
+
+		# A tar file ends with two empty blocks, and is padded to a multiple of
+		# the record size
+		end = tarfile.NUL * (2 * tarfile.BLOCKSIZE)
+		size = self._offset + len(end)
+		remainder = size % tarfile.RECORDSIZE
+		if remainder > 0:
+			end += tarfile.NUL * (tarfile.RECORDSIZE - remainder)
+		gz = self._gzip()
+		gz.write(end)
+		gz.close()
+		self._fd.close()
+		if self._previous_fd is not None:
+			self._previous_fd.close()
+		return {
+			u'path'		: self.path,
+			u'members'	: self._members,
+			}
+
+	def _gzip(self):
+
+		"""
+		desc:
+			Starts a new gzip member at the end of the archive.
+
+		returns:
+			desc:	A gzip file, which does not close the archive when it is
+					closed itself.
+			type:	GzipFile
+		"""
+
+		return gzip.GzipFile(filename=u'', mode=u'wb',
+			compresslevel=self.compresslevel, fileobj=self._fd, mtime=0)
+
+	def _write_member(self, info, fd, key=None, checksum=False):
+
+		"""
+		desc:
+			Compresses a tar header and the file contents into a new gzip
+			member.
+
+		arguments:
+			info:
+				desc:	The tar header.
+				type:	TarInfo
+			fd:
+				desc:	A file object to read the contents from, or None for
+						members without contents.
+				type:	[file, NoneType]
+
+		keywords:
+			key:
+				desc:	A (size, modification time) tuple to identify the file
+						in the next archive, or None.
+				type:	[tuple, NoneType]
+			checksum:
+				desc:	Indicates whether the CRC32 checksum of the contents
+						should be stored in the index, so that it can be
+						checked before the file is reused.
+				type:	bool
+		"""
+
+		start = self._fd.tell()
+		gz = self._gzip()
+		header = info.tobuf(tarfile.GNU_FORMAT)
+		gz.write(header)
+		raw_length = len(header)
+		crc = 0
+		if fd is not None:
+			n = 0
+			while True:
+				chunk = fd.read(self.chunk_size)
+				if chunk == '':
+					break
+				gz.write(chunk)
+				crc = zlib.crc32(chunk, crc)
+				n += len(chunk)
+			if n != info.size:
+				raise IOError(u'%s changed while it was being saved' %
+					info.name)
+			remainder = n % tarfile.BLOCKSIZE
+			if remainder > 0:
+				gz.write(tarfile.NUL * (tarfile.BLOCKSIZE - remainder))
+				n += tarfile.BLOCKSIZE - remainder
+			raw_length += n
+		gz.close()
+		self._offset += raw_length
+		if key is not None:
+			self._members[info.name] = key, start, self._fd.tell() - start, \
+				raw_length, crc if checksum else None
+
+	def _copy_member(self, arcname, member):
+
+		"""
+		desc:
+			Copies a compressed member from the previous archive.
+
+		arguments:
+			arcname:
+				desc:	The name of the file in the archive.
+				type:	str
+			member:
+				desc:	A (key, offset, length, raw length, checksum) tuple
+						from the index of the previous archive.
+				type:	tuple
+		"""
+
+		debug.msg(u'reusing %s' % arcname)
+		key, offset, length, raw_length, crc = member
+		start = self._fd.tell()
+		self._previous_fd.seek(offset)
+		while length > 0:
+			chunk = self._previous_fd.read(min(length, self.chunk_size))
+			if chunk == '':
+				raise IOError(u'%s is truncated' % self._previous[u'path'])
+			self._fd.write(chunk)
+			length -= len(chunk)
+		self._offset += raw_length
+		self._members[arcname] = key, start, self._fd.tell() - start, \
+			raw_length, crc
+
+def file_crc32(path):
+
+	"""
+	desc:
+		Computes the CRC32 checksum of a file.
+
+	arguments:
+		path:
+			desc:	The path of the file.
+			type:	str
+
+	returns:
+		desc:	The checksum, as returned by `zlib.crc32()`.
+		type:	int
+	"""
+
+	crc = 0
+	with open(path, u'rb') as fd:
+		while True:
+			chunk = fd.read(archive_writer.chunk_size)
+			if chunk == '':
+				return crc
+			crc = zlib.crc32(chunk, crc)
+
+def index_archive(index, path):
+
+	"""
+	desc:
+		Records the final path of an archive in its index, together with the
+		size and modification time of the archive, so that it can later be
+		checked whether the archive is unchanged.
+
+	arguments:
+		index:
+			desc:	The index of an archive, as returned by
+					`archive_writer.close()`.
+			type:	dict
+		path:
+			desc:	The path to which the archive has been moved.
+			type:	unicode
+	"""
+
+	index[u'path'] = path
+	st = os.stat(path.encode(misc.filesystem_encoding()))
+	index[u'key'] = st.st_size, st.st_mtime
+
+def valid_index(index):
+
+	"""
+	desc:
+		Checks whether an archive still exists and is unchanged since it was
+		indexed.
+
+	arguments:
+		index:
+			desc:	The index of an archive.
+			type:	dict
+
+	returns:
+		type:	bool
+	"""
+
+	try:
+		st = os.stat(index[u'path'].encode(misc.filesystem_encoding()))
+	except (OSError, KeyError):
+		return False
+	return index.get(u'key') == (st.st_size, st.st_mtime)
+
+class zip_writer(object):
+
+	"""
+	desc: |
+		Writes an .opensesame.zip archive. Files are stored without
+		compression, so that each file can later be read directly from the
+		archive, without decompressing anything else. Most media files are
+		compressed already, so this makes little difference for the size of
+		the archive. The interface is the same as that of `archive_writer`.
+	"""
+
+	def __init__(self, path):
+
+		"""
+		desc:
+			Constructor.
+
+		arguments:
+			path:
+				desc:	The path of the archive.
+				type:	unicode
+		"""
+
+		self.path = path
+		self._zip = zipfile.ZipFile(path.encode(misc.filesystem_encoding()),
+			u'w', zipfile.ZIP_STORED, allowZip64=True)
+
+	def add_dir(self, arcname):
+
+		"""
+		desc:
+			Adds a folder to the archive.
+
+		arguments:
+			arcname:
+				desc:	The name of the folder in the archive.
+				type:	str
+		"""
+
+		info = zipfile.ZipInfo(arcname + u'/',
+			time.localtime(time.time())[:6])
+		info.external_attr = (040755 << 16) | 0x10
+		self._zip.writestr(info, '')
+
+	def add_file(self, src, arcname, reuse=True):
+
+		"""
+		desc:
+			Adds a file to the archive.
+
+		arguments:
+			src:
+				desc:	The path of the file.
+				type:	unicode
+			arcname:
+				desc:	The name of the file in the archive.
+				type:	str
+
+		keywords:
+			reuse:
+				desc:	Ignored, because files are not compressed.
+				type:	bool
+		"""
+
+		self._zip.write(src.encode(misc.filesystem_encoding()), arcname)
+
+	def close(self):
+
+		"""
+		desc:
+			Finishes and closes the archive.
+
+		returns:
+			desc:	None, because there is no index for .zip archives.
+			type:	NoneType
+		"""
+
+		self._zip.close()
+		return None
+
+class archive_reader(object):
+
+	"""
+	desc: |
+		Reads files from an .opensesame.tar.gz or .opensesame.zip archive one
+		at a time, so that files can be extracted only when they are needed.
+
+		In a .zip archive, each file can be read directly. In a .tar.gz
+		archive, the archive is decompressed up to the requested file, but
+		nothing is written to disk except for the file itself. Therefore,
+		files in a .tar.gz archive should be extracted in a single call to
+		`extract()`, rather than one at a time.
+
+		After the archive has been closed, it is opened again when a file is
+		read from it.
+	"""
+
+	def __init__(self, path):
+
+		"""
+		desc:
+			Constructor.
+
+		arguments:
+			path:
+				desc:	The path of the archive.
+				type:	[str, unicode]
+		"""
+
+		self.path = path
+		self._zip = None
+		self._tar = None
+		self._reopen()
+		if self._zip is not None:
+			members = [(info.filename, info, info.header_offset) \
+				for info in self._zip.infolist() \
+				if not info.filename.endswith(u'/')]
+		else:
+			members = [(info.name, info, info.offset) \
+				for info in self._tar.getmembers() if info.isfile()]
+		# The names of files in the archive, in the order in which they are
+		# stored, and a dict with (member, offset) tuples
+		self.names = []
+		self._members = {}
+		for name, info, offset in members:
+			if isinstance(name, str):
+				name = name.decode(u'utf-8')
+			self.names.append(name)
+			self._members[name] = info, offset
+
+	def read(self, name):
+
+		"""
+		desc:
+			Reads a file from the archive.
+
+		arguments:
+			name:
+				desc:	The name of the file in the archive.
+				type:	unicode
+
+		returns:
+			desc:	The contents of the file.
+			type:	str
+		"""
+
+		fd = self.open(name)
+		s = fd.read()
+		fd.close()
+		return s
+
+	def extract(self, files):
+
+		"""
+		desc:
+			Extracts files from the archive. Files are extracted in the order
+			in which they are stored, so that a .tar.gz archive is
+			decompressed only once.
+
+		arguments:
+			files:
+				desc:	A list of (name in the archive, destination path)
+						tuples.
+				type:	list
+		"""
+
+		for name, dst in sorted(files, key=lambda f: self._members[f[0]][1]):
+			debug.msg(u'extracting \'%s\'' % name)
+			src = self.open(name)
+			with open(dst.encode(misc.filesystem_encoding()), u'wb') as fd:
+				shutil.copyfileobj(src, fd, archive_writer.chunk_size)
+			src.close()
+			info = self._members[name][0]
+			if self._tar is not None:
+				mtime = info.mtime
+			else:
+				mtime = time.mktime(info.date_time + (0, 0, -1))
+			os.utime(dst.encode(misc.filesystem_encoding()), (mtime, mtime))
+
+	def close(self):
+
+		"""
+		desc:
+			Closes the archive.
+		"""
+
+		if self._tar is not None:
+			self._tar.close()
+			self._tar = None
+		if self._zip is not None:
+			self._zip.close()
+			self._zip = None
+
+	def open(self, name):
+
+		"""
+		desc:
+			Opens a file in the archive for reading.
+
+		arguments:
+			name:
+				desc:	The name of the file in the archive.
+				type:	unicode
+
+		returns:
+			desc:	A file-like object.
+		"""
+
+		if name not in self._members:
+			raise osexception(u'%s does not contain %s' % (self.path, name))
+		if self._tar is None and self._zip is None:
+			self._reopen()
+		info = self._members[name][0]
+		if self._tar is not None:
+			return self._tar.extractfile(info)
+		return self._zip.open(info)
+
+	def _reopen(self):
+
+		"""
+		desc:
+			Opens the archive, either for the first time, or after it has been
+			closed.
+		"""
+
+		path = self.path
+		if isinstance(path, unicode):
+			path = path.encode(misc.filesystem_encoding())
+		if is_zip(self.path):
+			self._zip = zipfile.ZipFile(path)
+		else:
+			self._tar = tarfile.open(path, u'r:gz')
+
+def is_zip(path):
+
+	"""
+	desc:
+		Checks whether a path refers to an .opensesame.zip archive, rather
+		than an .opensesame.tar.gz archive.
+
+	arguments:
+		path:
+			desc:	A path.
+			type:	[str, unicode]
+
+	returns:
+		type:	bool
+	"""
+
+	if isinstance(path, str):
+		path = path.decode(misc.filesystem_encoding(), u'replace')
+	return path.lower().endswith(zip_ext)
@@ -19,15 +19,17 @@ along with OpenSesame.  If not, see <http://www.gnu.org/licenses/>.
 
 from libopensesame.item_store import item_store
 from libopensesame.python_workspace import python_workspace
+from libopensesame.var_registry import var_registry
+from libopensesame.poller import poller
+from libopensesame.archive import archive_writer, zip_writer, \
+	archive_reader, index_archive, is_zip
 from libopensesame.exceptions import osexception
-from libopensesame import misc, item, plugins, debug
+from libopensesame import misc, item, plugins, debug, log_writer
 import os.path
 import shutil
 import sys
 import time
-import tarfile
 import tempfile
-import codecs
 
 # Contains a list of all pool folders, which need to be removed on program exit
 pool_folders = []
@@ -68,7 +70,7 @@ class experiment(item.item):
 	def __init__(self, name=u'experiment', string=None, pool_folder=None,
 		experiment_path=None, fullscreen=False, auto_response=False,
 		logfile=u'defaultlog.csv', subject_nr=0, items=None, workspace=None,
-		resources={}):
+		resources={}, lazy_pool=False):
 
 		"""
 		desc:
@@ -118,10 +120,31 @@ class experiment(item.item):
 				desc:	A dictionary with names as keys and paths as values.
 						This serves as a look-up table for resources.
 				type:	dict
+			lazy_pool:
+				desc:	Indicates whether files in the file pool of an
+						.opensesame.zip file should be extracted only when
+						they are first requested with `get_file()`, rather
+						than when the file is opened. The file pool of an
+						.opensesame.tar.gz file is always extracted when the
+						file is opened, because extracting files from it one
+						at a time would decompress the archive again for each
+						file.
+				type:	bool
 		"""
 
 		global pool_folders
 
+		# The index of variables needs to exist before any item is parsed
+		self.var_registry = var_registry(self)
+		# The profiler is created when the experiment starts, if profiling is
+		# enabled
+		self.profiler = None
+		# The index of the last saved .opensesame.tar.gz file, which allows
+		# unchanged pool files to be copied from it when saving again
+		self._archive_index = None
+		# Response polling loops spin until the experiment starts and the
+		# polling strategy is known
+		self.poller = poller()
 		if items == None:
 			self.items = item_store(self)
 		else:
@@ -140,6 +163,9 @@ class experiment(item.item):
 		self.transparent_variables = u'no'
 		self.bidi = u'no'
 		self.resources = resources
+		# The cache of generated stimuli, which is shared by all back-ends
+		from libopensesame.stimulus_cache import shared_cache
+		self.stimulus_cache = shared_cache
 
 		# Set default variables
 		self.start = u'experiment'
@@ -200,9 +226,23 @@ class experiment(item.item):
 			debug.msg(u'reusing existing pool folder')
 			self.pool_folder = pool_folder
 		debug.msg(u'pool folder is \'%s\'' % self.pool_folder)
-
-		string = self.open(string)
-		item.item.__init__(self, name, self, string)
+		# In lazy-pool mode, the archive stays open, and pool files that have
+		# not been extracted yet are kept in a dict with names in the archive
+		# as values
+		self.lazy_pool = lazy_pool
+		self._pool_archive = None
+		self._lazy_pool_files = {}
+
+		script = self.open(string)
+		try:
+			item.item.__init__(self, name, self, script)
+		finally:
+			if not isinstance(script, basestring):
+				script.close()
+		if not self.lazy_pool or len(self._lazy_pool_files) == 0 or \
+			(self._pool_archive is not None and \
+			not is_zip(self._pool_archive.path)):
+			self.extract_pool()
 
 		# Default subject info
 		self.set_subject(subject_nr)
@@ -273,36 +313,54 @@ class experiment(item.item):
 		and the definition string.
 		"""
 
-		# Read the string until the end of the definition
-		def_str = u''
+		# Read the string until the end of the definition. The lines are
+		# collected in a list, because concatenating unicode strings one line
+		# at a time takes quadratic time.
+		def_lines = []
 		line = next(s, None)
 		if line == None:
 			return None, u''
-		get_next = False
 		while True:
 			if len(line) > 0:
 				if line[0] != u'\t':
 					break
 				else:
-					def_str += line + u'\n'
+					def_lines.append(line)
 			line = next(s, None)
 			if line == None:
 				break
-		return line, def_str
+		if len(def_lines) == 0:
+			return line, u''
+		return line, u'\n'.join(def_lines) + u'\n'
 
 	def from_string(self, string):
 
 		"""
-		Reads the entire experiment from a string.
+		Reads the entire experiment from a string, or from a file object
+		that contains an experiment script (see read_script()).
 
 		Arguments:
-		string	--	The definition string.
+		string	--	The definition string, or a file object.
+		"""
+
+		if not isinstance(string, basestring):
+			self.read_script(string)
+			return
+		self.from_lines(iter(string.split(u'\n')))
+
+	def from_lines(self, s):
+
+		"""
+		Reads the entire experiment from an iterator of lines.
+
+		Arguments:
+		s	--	An iterator that gives the lines of the definition string,
+				without line endings.
 		"""
 
 		self.variables = {}
 		self.comments = []
 		debug.msg(u"building experiment")
-		s = iter(string.split("\n"));
 		line = next(s, None)
 		while line != None:
 			get_next = True
@@ -335,9 +393,12 @@ class experiment(item.item):
 		self.save_state()
 		self.running = True
 		self.init_random()
+		self.init_stimulus_cache()
 		self.init_display()
 		self.init_sound()
 		self.init_log()
+		self.init_profiler()
+		self.init_poller()
 		self.reset_feedback()
 
 		print(u"experiment.run(): experiment started at %s" % time.ctime())
@@ -370,11 +431,22 @@ class experiment(item.item):
 		from openexp import sampler, canvas
 		self.running = False
 		try:
-			self._log.flush()
-			os.fsync(self._log)
 			self._log.close()
 		except:
 			pass
+		if self.profiler is not None:
+			try:
+				self.profiler.save()
+			finally:
+				self.profiler.close()
+				self.profiler = None
+		if self.poller.mode != u'spin':
+			print(u'experiment.end(): %(mode)s polling, %(sleeps)d sleeps, '
+				u'overshoot mean %(mean_overshoot_ms).3f ms, max '
+				u'%(max_overshoot_ms).3f ms' % self.poller.report())
+		# The archive is opened again if pool files are requested later on
+		if self._pool_archive is not None:
+			self._pool_archive.close()
 		sampler.close_sound(self)
 		canvas.close_display(self)
 		self.cleanup()
@@ -389,16 +461,64 @@ class experiment(item.item):
 		A Unicode definition string for the experiment.
 		"""
 
-		s = u'# Generated by OpenSesame %s (%s)\n' % (misc.version, \
+		return u''.join(self.script_chunks())
+
+	def script_chunks(self):
+
+		"""
+		desc:
+			Generates the definition string of the experiment in chunks: the
+			header, each variable, and each item.
+
+		returns:
+			desc:	A generator of unicode strings.
+			type:	generator
+		"""
+
+		yield u'# Generated by OpenSesame %s (%s)\n' % (misc.version, \
 			misc.codename) + \
 			u'# %s (%s)\n' % (time.ctime(), os.name) + \
 			u'# <http://www.cogsci.nl/opensesame>\n\n'
 		for var in sorted(self.variables):
-			s += self.variable_to_string(var)
-		s += u'\n'
+			yield self.variable_to_string(var)
+		yield u'\n'
 		for item in sorted(self.items):
-			s += self.items[item].to_string() + u'\n'
-		return s
+			yield self.items[item].to_string() + u'\n'
+
+	def write_script(self, fd):
+
+		"""
+		desc:
+			Writes the experiment script to a file object, one item at a time,
+			so that the full script is never in memory. The script is written
+			as it is saved to disk, i.e. with special characters in U+XXXX
+			notation (see `usanitize()`).
+
+		arguments:
+			fd:
+				desc:	A file object that has been opened for writing.
+				type:	file
+		"""
+
+		for chunk in self.script_chunks():
+			fd.write(self.usanitize(chunk))
+
+	def read_script(self, fd):
+
+		"""
+		desc:
+			Reads the experiment from a file object that contains an
+			experiment script, as written by `write_script()`. The script is
+			read one line at a time, so that the full script is never in
+			memory.
+
+		arguments:
+			fd:
+				desc:	A file object that has been opened for reading.
+				type:	file
+		"""
+
+		self.from_lines(self.unsanitize(line.rstrip('\r\n')) for line in fd)
 
 	def resource(self, name):
 
@@ -459,6 +579,8 @@ class experiment(item.item):
 			raise osexception(
 				u"An empty string was passed to experiment.get_file(). Please "
 				u"specify a valid filename.")
+		if path in self._lazy_pool_files:
+			self.extract_pool([path])
 		if os.path.exists(os.path.join(self.pool_folder, path)):
 			return os.path.join(self.pool_folder, path)
 		if self.experiment_path != None:
@@ -471,6 +593,31 @@ class experiment(item.item):
 					self.fallback_pool_folder, path)
 		return path
 
+	def extract_pool(self, fnames=None):
+
+		"""
+		desc:
+			Extracts files from the file pool that have not been extracted
+			yet, because the experiment was opened with `lazy_pool=True`. This
+			is done automatically by `get_file()` and `save()`.
+
+		keywords:
+			fnames:
+				desc:	A list of file names, or None to extract all remaining
+						files.
+				type:	[list, NoneType]
+		"""
+
+		if self._pool_archive is None:
+			return
+		if fnames is None:
+			fnames = list(self._lazy_pool_files.keys())
+		self._pool_archive.extract([(self._lazy_pool_files.pop(fname),
+			os.path.join(self.pool_folder, fname)) for fname in fnames])
+		if len(self._lazy_pool_files) == 0:
+			self._pool_archive.close()
+			self._pool_archive = None
+
 	def file_in_pool(self, path):
 
 		"""
@@ -492,12 +639,73 @@ class experiment(item.item):
 
 		return os.path.exists(self.get_file(path))
 
-	def save(self, path, overwrite=False, update_path=True):
+	def preload_images(self, paths, scale=None):
+
+		"""
+		desc:
+			Decodes images in advance, so that drawing them onto a canvas,
+			for example in a sketchpad, does not require decoding them from
+			disk. Decoded images are stored in the stimulus cache (see
+			`exp.stimulus_cache`), and are used by the legacy, opengl, and
+			psycho back-ends. The xpyriment back-end only uses them to
+			determine the size of images, and lets Expyriment decode the
+			images itself.
+
+		arguments:
+			paths:
+				desc:	A list of file names. These can be names of files in
+						the file pool, or full paths.
+				type:	list
+
+		keywords:
+			scale:
+				desc:	The scaling factor with which the images will be drawn,
+						or None for no scaling.
+				type:	[int, float, NoneType]
+
+		example: |
+			exp.preload_images(['target.png', 'distractor.png'])
+		"""
+
+		from openexp._canvas import canvas
+		for path in paths:
+			canvas._image(self.get_file(path), scale)
+
+	def preload_sounds(self, paths):
+
+		"""
+		desc:
+			Loads sounds in advance into the sound bank, so that samplers that
+			play them do not need to load them from disk. Each sound is loaded
+			only once, and shared by all samplers that play it. The sound bank
+			is part of the stimulus cache (see `exp.stimulus_cache`). Sounds
+			can only be preloaded after the sampler back-end has been
+			initialized, i.e. while the experiment is running. The gstreamer
+			back-end streams sounds from disk while they are played, so for
+			this back-end preloading has no effect.
+
+		arguments:
+			paths:
+				desc:	A list of file names. These can be names of files in
+						the file pool, or full paths.
+				type:	list
+
+		example: |
+			exp.preload_sounds(['standard.ogg', 'deviant.ogg'])
+		"""
+
+		from openexp import sampler
+		for path in paths:
+			sampler.preload(self, self.get_file(path))
+
+	def save(self, path, overwrite=False, update_path=True, compresslevel=9):
 
 		"""
 		desc:
 			Saves the experiment to file. If no extension is provided,
-			.opensesame.tar.gz is chosen by default.
+			.opensesame.tar.gz is chosen by default. The .opensesame.zip
+			format stores files without compression, which allows them to be
+			read from the archive one at a time.
 
 		arguments:
 			path:
@@ -512,6 +720,12 @@ class experiment(item.item):
 				desc:	Indicates if the experiment_path attribute should be
 						updated.
 				type:	bool
+			compresslevel:
+				desc:	The gzip compression level for .opensesame.tar.gz
+						files, from 1 (fastest) to 9 (smallest). Files in the
+						file pool that have not changed since the experiment
+						was last saved are not compressed again.
+				type:	int
 
 		returns:
 			desc:	The path on successful saving or False otherwise.
@@ -529,62 +743,82 @@ class experiment(item.item):
 				return False
 			debug.msg(u'saving as .opensesame file')
 			f = open(path, u'w')
-			f.write(self.usanitize(self.to_string()))
+			self.write_script(f)
 			f.close()
 			self.experiment_path = os.path.dirname(path)
 			return path
 		# Use the .opensesame.tar.gz extension by default
-		if path[-len(u'.opensesame.tar.gz'):] != u'.opensesame.tar.gz':
+		if path[-len(u'.opensesame.tar.gz'):] != u'.opensesame.tar.gz' and \
+			not is_zip(path):
 			path += u'.opensesame.tar.gz'
 		if os.path.exists(path) and not overwrite:
 			return False
-		debug.msg(u"saving as .opensesame.tar.gz file")
-		# Write the script to a text file
-		script = self.to_string()
-		script_path = os.path.join(self.pool_folder, u'script.opensesame')
-		f = open(script_path, u"w")
-		f.write(self.usanitize(script))
-		f.close()
-		# Create the archive in a a temporary folder and move it afterwards.
-		# This hack is needed, because tarfile fails on a Unicode path.
-		tmp_path = tempfile.mktemp(suffix=u'.opensesame.tar.gz')
-		tar = tarfile.open(tmp_path, u'w:gz')
-		tar.add(script_path, u'script.opensesame')
-		os.remove(script_path)
-		# We also create a temporary pool folder, where all the filenames are
-		# Unicode sanitized to ASCII format. Again, this is necessary to deal
-		# with poor Unicode support in .tar.gz.
-		tmp_pool = tempfile.mkdtemp(suffix=u'.opensesame.pool')
-		for fname in os.listdir(self.pool_folder):
-			sname = self.usanitize(fname)
-			shutil.copyfile(os.path.join(self.pool_folder, fname),
-				os.path.join(tmp_pool, sname))
-		tar.add(tmp_pool, u'pool', True)
-		tar.close()
-		# Move the file to the intended location
-		shutil.move(tmp_path, path)
-		if update_path:
-			self.experiment_path = os.path.dirname(path)
-		# Clean up the temporary pool folder
+		# All pool files need to be on disk before they can be saved
+		self.extract_pool()
+		# Create the archive in a temporary file in the target folder and move
+		# it afterwards, so that the previous archive can be read while the
+		# new one is written, and is replaced only when the new one is
+		# complete. Pool files are added under Unicode-sanitized names,
+		# because of poor Unicode support in .tar.gz.
+		fs_encoding = misc.filesystem_encoding()
+		fd, tmp_path = tempfile.mkstemp(suffix=u'.tmp', prefix=u'.',
+			dir=os.path.dirname(os.path.abspath(path)).encode(fs_encoding))
+		os.close(fd)
+		tmp_path = tmp_path.decode(fs_encoding)
 		try:
-			shutil.rmtree(tmp_pool)
-			debug.msg(u'Removed temporary pool folder: %s' % tmp_pool)
+			# mkstemp() creates files that only the owner can read, so give
+			# the archive the permissions of a regularly created file
+			umask = os.umask(0)
+			os.umask(umask)
+			os.chmod(tmp_path.encode(fs_encoding), 0666 & ~umask)
+			if is_zip(path):
+				debug.msg(u'saving as .opensesame.zip file')
+				writer = zip_writer(tmp_path)
+			else:
+				debug.msg(u'saving as .opensesame.tar.gz file')
+				writer = archive_writer(tmp_path, compresslevel=compresslevel,
+					previous=self._archive_index)
+			script_path = os.path.join(self.pool_folder, u'script.opensesame')
+			f = open(script_path, u'w')
+			self.write_script(f)
+			f.close()
+			writer.add_file(script_path, u'script.opensesame', reuse=False)
+			os.remove(script_path)
+			writer.add_dir(u'pool')
+			for fname in sorted(os.listdir(self.pool_folder)):
+				src = os.path.join(self.pool_folder, fname)
+				if os.path.isfile(src):
+					writer.add_file(src, u'pool/' + self.usanitize(fname))
+			index = writer.close()
+			# Move the file to the intended location
+			shutil.move(tmp_path.encode(fs_encoding), path.encode(fs_encoding))
 		except:
-			debug.msg(u'Failed to remove temporary pool folder: %s' % tmp_pool)
+			if os.path.exists(tmp_path.encode(fs_encoding)):
+				os.remove(tmp_path.encode(fs_encoding))
+			raise
+		if update_path:
+			self.experiment_path = os.path.dirname(path)
+			# Only the main archive is remembered, so that backups, which may
+			# be compressed less, are not used as a source for it
+			if index is not None:
+				index_archive(index, path)
+			self._archive_index = index
 		return path
 
 	def open(self, src):
 
 		"""
-		If the path exists, open the file, extract the pool and return the
-		contents of the script.opensesame. Otherwise just return the input
-		string, because it probably was a definition to begin with.
+		If the path exists, open the file and return a file object for the
+		script, which is read one line at a time by read_script(). For
+		archives, the pool files are remembered, and extracted after the
+		script has been read (see extract_pool()). Otherwise just return the
+		input string, because it probably was a definition to begin with.
 
 		Arguments:
 		src		--	A definition string or a file to be opened.
 
 		Returns:
-		A unicode defition string.
+		A unicode defition string, or a file object.
 		"""
 
 		# If the path is not a path at all, but a string containing
@@ -596,45 +830,29 @@ class experiment(item.item):
 			if isinstance(src, unicode):
 				return src
 			return src.decode(self.encoding, u'replace')
-		# If the file is a regular text script,
-		# read it and return it
+		# If the file is a regular text script, open it
 		ext = u'.opensesame.tar.gz'
-		if src[-len(ext):] != ext:
+		if src[-len(ext):] != ext and not is_zip(src):
 			debug.msg(u'opening .opensesame file')
 			self.experiment_path = os.path.dirname(src)
-			return self.unsanitize(open(src, u'rU').read())
-		debug.msg(u"opening .opensesame.tar.gz file")
-		# If the file is a .tar.gz archive, extract the pool to the pool folder
-		# and return the contents of opensesame.script.
-		tar = tarfile.open(src, u'r:gz')
-		for name in tar.getnames():
-			# Here, all paths except name are Unicode. In addition, fname is
-			# Unicode unsanitized, because the files as saved are Unicode
-			# sanitized (see save()).
-			uname = name.decode(self.encoding)
-			folder, fname = os.path.split(uname)
-			fname = self.unsanitize(fname)
-			if folder == u"pool":
-				# NOTE: When merging into `ising`, this needs to be ported to
-				# the py3compat system, and Python 3 compatibility needs to be
-				# checked.
-				debug.msg(u"extracting '%s'" % uname)
-				# Tar requires the pool folder to be encoded
-				tar.extract(name, self.pool_folder.encode(
-					misc.filesystem_encoding()))
-				# And so does os.rename
-				from_name = os.path.join(self.pool_folder, uname).encode(
-					misc.filesystem_encoding())
-				to_name = os.path.join(self.pool_folder, fname).encode(
-					misc.filesystem_encoding())
-				os.rename(from_name, to_name)
-				os.rmdir(os.path.join(self.pool_folder, folder))
-		script_path = os.path.join(self.pool_folder, u"script.opensesame")
-		tar.extract(u"script.opensesame", self.pool_folder)
-		script = self.unsanitize(open(script_path, u"rU").read())
-		os.remove(script_path)
+			return open(src, u'rU')
+		debug.msg(u'opening archive')
+		# If the file is an archive, remember which files are in the pool, and
+		# return script.opensesame, which is stored before the pool. The pool
+		# is extracted afterwards, or on demand in lazy-pool mode for
+		# .opensesame.zip files (see __init__()). Pool files
+		# have been saved under Unicode-sanitized names (see save()).
+		archive = archive_reader(src)
+		pool = []
+		for name in archive.names:
+			folder, fname = os.path.split(name)
+			if folder == u'pool':
+				pool.append((self.unsanitize(fname), name))
+		debug.msg(u'%d pool files in archive' % len(pool))
+		self._pool_archive = archive
+		self._lazy_pool_files = dict(pool)
 		self.experiment_path = os.path.dirname(src)
-		return script
+		return archive.open(u'script.opensesame')
 
 	def reset_feedback(self):
 
@@ -676,20 +894,41 @@ class experiment(item.item):
 		A list of tupless
 		"""
 
-		l = []
-		# Create a dictionary of items that also includes the experiment
-		item_dict = dict(self.items.items() + [(u'global', self)]).items()
-		seen = []
-		for item_name, item in item_dict:
-			# Create a dictionary of variables that includes the broadcasted
-			# ones as wel as the indirectly registered ones (using item.set())
-			var_dict = item.var_info() + item.variables.items()
-			for var, val in var_dict:
-				if var not in seen and (filt in var.lower() or filt in \
-					self.unistr(val).lower() or filt in item_name.lower()):
-					l.append( (var, val, item_name) )
-					seen.append(var)
-		return l
+		return self.var_registry.var_list(filt)
+
+	def init_profiler(self):
+
+		"""
+		desc:
+			Starts profiling all items, if the `profile` variable is set to
+			`yes`. See `libopensesame.profiler`.
+		"""
+
+		if self.get_check(u'profile', u'no', [u'yes', u'no']) == u'no':
+			return
+		from libopensesame.profiler import profiler
+		self.profiler = profiler(self)
+		for item in self.items.values():
+			self.profiler.wrap_item(item)
+
+	def init_poller(self):
+
+		"""
+		desc:
+			Selects how response polling loops wait, as specified by the
+			`poll_mode`, `poll_sleep_ms`, and `poll_spin_ms` variables. See
+			`libopensesame.poller`.
+		"""
+
+		mode = self.get_check(u'poll_mode', u'spin', poller.modes)
+		sleep_ms = self.get_check(u'poll_sleep_ms', 1)
+		spin_ms = self.get_check(u'poll_spin_ms', 2)
+		for var, val in ((u'poll_sleep_ms', sleep_ms),
+			(u'poll_spin_ms', spin_ms)):
+			if type(val) not in (int, float) or val < 0:
+				raise osexception(
+					u'%s should be a non-negative numeric value' % var)
+		self.poller = poller(mode, sleep_ms, spin_ms)
 
 	def init_random(self):
 
@@ -718,6 +957,22 @@ class experiment(item.item):
 		except:
 			pass
 
+	def init_stimulus_cache(self):
+
+		"""
+		desc:
+			Applies the memory budget of the stimulus cache, as specified by
+			the `stimulus_cache_mb` variable, and empties the cache.
+		"""
+
+		mb = self.get_check(u'stimulus_cache_mb', 256)
+		if type(mb) not in (int, float) or mb < 0:
+			raise osexception(
+				u'stimulus_cache_mb should be a non-negative numeric value')
+		self.stimulus_cache.resize(int(mb * 1024**2))
+		self.stimulus_cache.clear()
+		self.stimulus_cache.reset_stats()
+
 	def init_sound(self):
 
 		"""Intializes the sound backend."""
@@ -747,7 +1002,7 @@ class experiment(item.item):
 			self.experiment_path != None:
 			self.logfile = os.path.join(self.experiment_path, self.logfile)
 		# Open the logfile
-		self._log = codecs.open(self.logfile, u'w', encoding=self.encoding)
+		self._log = log_writer.open_log(self, self.logfile)
 		debug._print(u"experiment.init_log(): using '%s' as logfile (%s)" % \
 			(self.logfile, self.encoding))
 
@@ -29,6 +29,21 @@ except:
 		reason=u'warning')
 	bidi_func = None
 
+# The maximum number of layouts that are cached. When this number is exceeded,
+# the cache is cleared.
+max_layout_cache = 1000
+# Text layouts with the text, position, and font settings as key
+layout_cache = {}
+
+def clear_layout_cache():
+
+	"""
+	Empties the layout cache. This should be done when fonts change, because
+	the layout depends on the size of the words.
+	"""
+
+	layout_cache.clear()
+
 class html(HTMLParser):
 
 	"""
@@ -115,7 +130,9 @@ class html(HTMLParser):
 		color=None, bidi=False, html=True, dry_run=False):
 
 		"""
-		Renders an HTML formatted string onto a canvas.
+		Renders an HTML formatted string onto a canvas. The layout of the text,
+		i.e. the position and style of each word, is cached, so that rendering
+		the same text again only draws the words.
 
 		Arguments:
 		text		-- 	The text string.
@@ -144,6 +161,57 @@ class html(HTMLParser):
 		# Make sure that it's a string
 		text = canvas.experiment.unistr(text)
 		debug.msg(text)
+		backup_style = {
+			u'style' : canvas.font_style,
+			u'bold' : canvas.font_bold,
+			u'italic' : canvas.font_italic,
+			u'color' : canvas.fgcolor,
+			u'size' : canvas.font_size,
+			u'underline' : canvas.font_underline
+			}
+		# The layout depends on the canvas back-end, because it measures the
+		# words, and on the screen width if no maximum width is given. Colors
+		# are not always hashable, so their representation is used instead.
+		key = text, x, y, max_width, center, repr(color), bidi, html, \
+			type(canvas), canvas.experiment.width, canvas.font_style, \
+			canvas.font_size, canvas.font_bold, canvas.font_italic, \
+			canvas.font_underline, repr(canvas.fgcolor)
+		try:
+			words, size = layout_cache[key]
+		except KeyError:
+			words, size = self.layout(text, x, y, canvas, max_width=max_width,
+				center=center, color=color, bidi=bidi, html=html)
+			if len(layout_cache) >= max_layout_cache:
+				layout_cache.clear()
+			layout_cache[key] = words, size
+		if not dry_run:
+			for word, style, _x, _y in words:
+				canvas.set_font(style[u'style'], int(style[u'size']), \
+					bold=style[u'bold'], italic=style[u'italic'], underline= \
+					style[u'underline'])
+				canvas.set_fgcolor(style[u'color'])
+				canvas._text(word, _x, _y)
+
+		# Restore the canvas font and colors
+		canvas.set_fgcolor(backup_style[u'color'])
+		canvas.set_font(backup_style[u'style'], int(backup_style[u'size']), \
+			bold=backup_style[u'bold'], italic=backup_style[u'italic'])
+		if dry_run:
+			return size
+
+	def layout(self, text, x, y, canvas, max_width=None, center=False, \
+		color=None, bidi=False, html=True):
+
+		"""
+		Parses an HTML formatted string and determines where each word should
+		be drawn, without modifying the canvas. For the arguments, see
+		render().
+
+		Returns:
+		A (words, size) tuple, where words is a list of (word, style, x, y)
+		tuples, and size is the (width, height) of the text.
+		"""
+
 		# Parse bi-directional strings
 		if bidi and bidi_func != None:
 			text = bidi_func(text)
@@ -160,7 +228,6 @@ class html(HTMLParser):
 			u'size' : canvas.font_size,
 			u'underline' : canvas.font_underline
 			}
-		backup_style = self.default_style.copy()
 
 		# Optionally override color
 		if color != None:
@@ -189,85 +256,76 @@ class html(HTMLParser):
 			self.handle_data(text)
 		self.text.append(self.paragraph)
 
-		# If we want to center the next, we need a dry run to calculate all the
-		# line lengths and determine the vertical and horizontal offset for each
-		# line
+		# A first pass calculates all the line lengths, which determine the
+		# size of the text, and the vertical and horizontal offset for each
+		# line when the text is centered
 		max_width = 0
 		height = 0
-		if center or dry_run:
-			l_x_offset = []
+		l_x_offset = []
+		_y = y
+		for paragraph in self.text:
+			_x = x
+			width = 0
+			dy = canvas._text_size(u'dummy')[1]
+			for word, style in paragraph:
+
+				# Set the style
+				canvas.set_font(style[u'style'], int(style[u'size']), \
+					bold=style[u'bold'], italic=style[u'italic'], \
+					underline=style[u'underline'])
+
+				# Line wrap if we run out of the screen
+				dx, dy = canvas._text_size(word)
+				if _x+dx > max_x + (max_x-x):
+					l_x_offset.append(-(_x-x)/2)
+					_x = x
+					_y += dy
+					dx = canvas._text_size(word.lstrip())[0]
+					word = word.lstrip()
+
+				_x += dx
+				width += dx
+			l_x_offset.append(-(_x-x)/2)
+			_y += dy
+			max_width = max(max_width, width)
+			height += dy
+		l_x_offset.reverse()
+		y_offset = -(_y-y)/2
+
+		# A second pass determines where each word is drawn
+		words = []
+		if center:
+			_y = y+y_offset
+		else:
 			_y = y
-			for paragraph in self.text:
-				_x = x
-				width = 0
-				dy = canvas._text_size(u'dummy')[1]
-				for word, style in paragraph:
-
-					# Set the style
-					canvas.set_font(style[u'style'], int(style[u'size']), \
-						bold=style[u'bold'], italic=style[u'italic'], \
-						underline=style[u'underline'])
-
-					# Line wrap if we run out of the screen
-					dx, dy = canvas._text_size(word)
-					if _x+dx > max_x + (max_x-x):
-						l_x_offset.append(-(_x-x)/2)
-						_x = x
-						_y += dy
-						dx = canvas._text_size(word.lstrip())[0]
-						word = word.lstrip()
-
-					# Draw!
-					_x += dx
-					width += dx
-				l_x_offset.append(-(_x-x)/2)
-				_y += dy
-				max_width = max(max_width, width)
-				height += dy
-			l_x_offset.reverse()
-			y_offset = -(_y-y)/2
-		if not dry_run:
-			# Now render it onto the canvas
+		for paragraph in self.text:
 			if center:
-				_y = y+y_offset
+				_x = x+l_x_offset.pop()
 			else:
-				_y = y
-			for paragraph in self.text:
-				if center:
-					_x = x+l_x_offset.pop()
-				else:
-					_x = x
-				dy = canvas._text_size(u'dummy')[1]
-				for word, style in paragraph:
-
-					# Set the style
-					canvas.set_font(style[u'style'], int(style[u'size']), \
-						bold=style[u'bold'], italic=style[u'italic'], underline= \
-						style[u'underline'])
-					canvas.set_fgcolor(style[u'color'])
-
-					# Line wrap if we run out of the screen
-					dx, dy = canvas._text_size(word)
-					if _x+dx > max_x:
-						if center:
-							_x = x+l_x_offset.pop()
-						else:
-							_x = x
-						_y += dy
-						dx = canvas._text_size(word.lstrip())[0]
-						word = word.lstrip()
-
-					# Draw!
-					canvas._text(word, _x, _y)
-					_x += dx
-				_y += dy
-
-		# Restore the canvas font and colors
-		canvas.set_fgcolor(backup_style[u'color'])
-		canvas.set_font(backup_style[u'style'], int(backup_style[u'size']), \
-			bold=backup_style[u'bold'], italic=backup_style[u'italic'])
-		if dry_run:
-			return max_width, height
+				_x = x
+			dy = canvas._text_size(u'dummy')[1]
+			for word, style in paragraph:
+
+				# Set the style
+				canvas.set_font(style[u'style'], int(style[u'size']), \
+					bold=style[u'bold'], italic=style[u'italic'], underline= \
+					style[u'underline'])
+
+				# Line wrap if we run out of the screen
+				dx, dy = canvas._text_size(word)
+				if _x+dx > max_x:
+					if center:
+						_x = x+l_x_offset.pop()
+					else:
+						_x = x
+					_y += dy
+					dx = canvas._text_size(word.lstrip())[0]
+					word = word.lstrip()
+
+				words.append( (word, style, _x, _y) )
+				_x += dx
+			_y += dy
+		return words, (max_width, height)
 
 	def pop_style(self):
 
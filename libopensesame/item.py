@@ -20,7 +20,7 @@ along with OpenSesame.  If not, see <http://www.gnu.org/licenses/>.
 import openexp.mouse
 import openexp.keyboard
 from libopensesame.exceptions import osexception
-from libopensesame import debug, regexp
+from libopensesame import debug, regexp, text_template, script_lexer
 import codecs
 import string
 import os
@@ -32,6 +32,10 @@ class item(object):
 	"""Abstract class that serves as the basis for all OpenSesame items."""
 
 	encoding = u'utf-8'
+	# Compiled conditional statements, shared by all items. When the maximum
+	# size is exceeded, the cache is cleared.
+	cond_cache = {}
+	max_cond_cache = 1000
 
 	def __init__(self, name, experiment, string=None):
 
@@ -72,6 +76,7 @@ class item(object):
 		if not hasattr(self, u'round_decimals'):
 			self.round_decimals = 2
 		self.from_string(string)
+		self.experiment.var_registry.touch(self)
 
 	def reset(self):
 
@@ -279,13 +284,9 @@ class item(object):
 		val = self.unistr(self.variables[var])
 		# Multiline variables are stored as a block
 		if u'\n' in val or u'"' in val:
-			s = u'__%s__\n' % var
-			for l in val.split(u'\n'):
-				s += '\t%s\n' % l
-			while s[-1] in (u'\t', u'\n'):
-				s = s[:-1]
-			s += u'\n\t__end__\n'
-			return s
+			s = u'__%s__\n' % var + u''.join(u'\t%s\n' % l for l in \
+				val.split(u'\n'))
+			return s.rstrip(u'\t\n') + u'\n\t__end__\n'
 		# Regular variables
 		else:
 			return u'set %s "%s"\n' % (var, val)
@@ -317,7 +318,7 @@ class item(object):
 					self.experiment.notify( \
 						u'It appears that a textblock has been closed without being opened. The most likely reason is that you have used the string "__end__", which has a special meaning for OpenSesame.')
 				else:
-					self.set(textblock_var, textblock_val)
+					self.set(textblock_var, u''.join(textblock_val))
 					textblock_var = None
 			# The beginning of a textblock. A new textblock is only started when
 			# a textblock is not already ongoing, and only if the textblock
@@ -328,7 +329,9 @@ class item(object):
 				if textblock_var in self.reserved_words:
 					textblock_var = u'_' + textblock_var
 				if textblock_var != u'':
-					textblock_val = u''
+					# The lines are collected in a list and joined when the
+					# textblock ends
+					textblock_val = []
 				else:
 					textblock_var = None
 				# We cannot just strip the multiline code, because that may mess
@@ -338,9 +341,9 @@ class item(object):
 			# Collect the contents of a textblock
 			elif textblock_var != None:
 				if strip_tab:
-					textblock_val += line[1:] + u'\n'
+					textblock_val.append(line[1:] + u'\n')
 				else:
-					textblock_val += line + u'\n'
+					textblock_val.append(line + u'\n')
 			# Parse regular variables
 			elif not self.parse_variable(line):
 				self.parse_line(line)
@@ -360,12 +363,12 @@ class item(object):
 
 		if item_type == None:
 			item_type = self.item_type
-		s = u'define %s %s\n' % (item_type, self.name)
+		l = [u'define %s %s\n' % (item_type, self.name)]
 		for comment in self.comments:
-			s += u'\t# %s\n' % comment.strip()
+			l.append(u'\t# %s\n' % comment.strip())
 		for var in sorted(self.variables):
-			s += u'\t' + self.variable_to_string(var)
-		return s
+			l.append(u'\t' + self.variable_to_string(var))
+		return u''.join(l)
 
 	def resolution(self):
 
@@ -440,6 +443,7 @@ class item(object):
 		# Register the variables
 		setattr(self, var, val)
 		self.variables[var] = val
+		self.experiment.var_registry.touch(self)
 
 	def unset(self, var):
 
@@ -466,6 +470,7 @@ class item(object):
 			delattr(self, var)
 		except:
 			pass
+		self.experiment.var_registry.touch(self)
 
 	def get(self, var, _eval=True):
 
@@ -760,16 +765,22 @@ class item(object):
 		if type(text) != unicode:
 			return text
 
+		# Text without square brackets cannot contain variable references
+		if u'[' not in text:
+			return text
 		# Prepare a template for rounding floats
 		if round_float:
 			float_template = u'%%.%sf' % self.get("round_decimals")
-		# Find and replace all variables in the text
+		# Replace all variables in the text. The text is parsed only once into
+		# a cached template. Substituted values may themselves form new
+		# variable references (e.g., '[[var]]'), in which case we repeat until
+		# the text doesn't change anymore.
 		while True:
-			m = regexp.find_variable.search(text)
-			if m == None:
-				break
-			var = m.group(0)[1:-1]
-			if not soft_ignore or self.has(var):
+			template = text_template.get(text)
+			values = {}
+			for var in template.dependencies:
+				if soft_ignore and not self.has(var):
+					continue
 				val = self.get(var)
 				# Quote strings if necessary
 				if type(val) == unicode and quote_str:
@@ -779,7 +790,14 @@ class item(object):
 					val = float_template % val
 				else:
 					val = self.unistr(val)
-				text = text.replace(m.group(0), val, 1)
+				values[var] = val
+			if len(values) == 0:
+				break
+			_text = template.render(values)
+			if _text == text or regexp.find_variable.search(_text) is None:
+				text = _text
+				break
+			text = _text
 		return self.auto_type(text)
 
 	def compile_cond(self, cond, bytecode=True):
@@ -799,13 +817,19 @@ class item(object):
 		statement.
 		"""
 
-		src = cond
+		# Compiled statements are shared by all items, and only depend on the
+		# source
+		key = cond, bytecode
+		try:
+			return item.cond_cache[key]
+		except KeyError:
+			pass
 
 		# If the conditional statement is preceded by a '=', it is interpreted as
 		# Python code, like 'self.get("correct") == 1'. In this case we only have
 		# to strip the preceding space
-		if len(src) > 0 and src[0] == u'=':
-			code = src[1:]
+		if len(cond) > 0 and cond[0] == u'=':
+			code = cond[1:]
 			debug.msg(u'Python-style conditional statement: %s' % code)
 
 		# Otherwise, it is interpreted as a traditional run if statement, like
@@ -813,32 +837,28 @@ class item(object):
 		else:
 			operators = u"!=", u"==", u"=", u"<", u">", u">=", u"<=", u"+", \
 				u"-", u"(", u")", u"/", u"*", u"%", u"~", u"**", u"^"
-			op_chars = u"!", u"=", u"=", u"<", u">", u"+", u"-", u"(", u")", \
-				u"/", u"*", u"%", u"~", u"*", u"^"
-			whitespace = u" ", u"\t", u"\n"
 			keywords = u"and", u"or", u"is", u"not", u"true", u"false"
 			capitalize = u"true", u"false", u"none"
 
-			# Try to fix missing spaces
-			redo = True
-			while redo:
-				redo = False
-				for i in range(len(cond)):
-					if cond[i] in op_chars:
-						if i != 0 and cond[i-1] not in op_chars + whitespace:
-							cond = cond[:i] + u" " + cond[i:]
-							redo = True
-							break
-						if i < len(cond)-1 and cond[i+1] not in \
-							op_chars+whitespace:
-							cond = cond[:i+1] + u" " + cond[i+1:]
-							redo = True
-							break
-
-			# Rebuild the conditional string
+			def unquote(m):
+				if m.group(1) is not None:
+					return script_lexer.double_escape.sub(u'\\1', m.group(1))
+				if m.group(2) is not None:
+					return m.group(2)
+				return m.group(3)
+
+			# Split the statement into operators and words in a single pass,
+			# and rebuild it
 			l = []
-			i = 0
-			for word in self.split(cond):
+			for op, word, invalid in regexp.cond_token.findall(cond):
+				if invalid:
+					raise osexception( \
+						u'Failed to parse conditional statement "%s". Is there a closing quotation missing, or a trailing backslash?' \
+						% cond)
+				if op:
+					word = op
+				else:
+					word = regexp.cond_unquote.sub(unquote, word)
 				if len(word) > 2 and word[0] == u"[" and word[-1] == u"]":
 					l.append(u"self.get(u'%s')" % word[1:-1])
 				elif word == u"=":
@@ -858,22 +878,23 @@ class item(object):
 						l.append(u"u\"%s\"" % word)
 					else:
 						l.append(self.unistr(word))
-				i += 1
 
 			code = u" ".join(l)
 			if code != u"True":
-				debug.msg(u"'%s' => '%s'" % (src, code))
+				debug.msg(u"'%s' => '%s'" % (cond, code))
 
 		# Optionally compile the conditional statement to bytecode and return
-		if not bytecode:
-			return code
-		try:
-			bytecode = compile(code, u"<conditional statement>", u"eval")
-		except:
-			raise osexception( \
-				u"'%s' is not a valid conditional statement in sequence item '%s'" \
-				% (cond, self.name))
-		return bytecode
+		if bytecode:
+			try:
+				code = compile(code, u"<conditional statement>", u"eval")
+			except:
+				raise osexception( \
+					u"'%s' is not a valid conditional statement in sequence item '%s'" \
+					% (cond, self.name))
+		if len(item.cond_cache) >= item.max_cond_cache:
+			item.cond_cache.clear()
+		item.cond_cache[key] = code
+		return code
 
 	def var_info(self):
 
@@ -974,11 +995,11 @@ class item(object):
 			u'unsanitize() expects first argument to be unicode or str, not "%s"' \
 			% type(s))
 		s = self.unistr(s)
-		while True:
-			m = regexp.unsanitize.search(s)
-			if m == None:
-				break
-			s = s.replace(m.group(0), unichr(int(m.group(1), 16)), 1)
+		# Replace all notations in one pass, and repeat this in case the
+		# replacements have formed new notations
+		while regexp.unsanitize.search(s) != None:
+			s = regexp.unsanitize.sub(lambda m: unichr(int(m.group(1), 16)),
+				s)
 		return s
 
 	def unistr(self, val):
@@ -1032,8 +1053,8 @@ class item(object):
 
 		"""
 		Splits a unicode string in the same way as shlex.split(). Unfortunately,
-		shlex doesn't handle unicode properly, so this wrapper function is
-		required.
+		shlex doesn't handle unicode properly, and is slow, so the line is split
+		by libopensesame.script_lexer instead.
 
 		Arguments:
 		u -- a unicode string
@@ -1043,10 +1064,8 @@ class item(object):
 		http://docs.python.org/library/shlex.html#shlex.split
 		"""
 
-		import shlex
 		try:
-			return [chunk.decode(self.encoding) for chunk in shlex.split( \
-				u.encode(self.encoding))]
+			return script_lexer.split(self.unistr(u))
 		except Exception as e:
 			raise osexception( \
 				u'Failed to parse line "%s". Is there a closing quotation missing?' \
@@ -1152,8 +1171,7 @@ class item(object):
 			self.flush_log()
 		"""
 
-		self.experiment._log.flush()
-		os.fsync(self.experiment._log)
+		self.experiment._log.fsync()
 
 def osreplace(exc):
 
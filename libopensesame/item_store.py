@@ -42,6 +42,10 @@ class item_store(object):
 
 		self.__items__ = {}
 		self.experiment = experiment
+		# The generation is increased whenever items are added, replaced, or
+		# removed, so that items that keep references to other items, such as
+		# the execution plan of sequences, know when to resolve them again.
+		self.generation = 0
 
 	def new(self, _type, name=None, script=None):
 
@@ -89,6 +93,11 @@ class item_store(object):
 			item_class = getattr(item_module, _type)
 			item = item_class(name, self.experiment, script)
 			self.__items__[name] = item
+		self.generation += 1
+		# Items that are created while the experiment is being profiled are
+		# profiled as well
+		if self.experiment.profiler is not None:
+			self.experiment.profiler.wrap_item(item)
 		return item
 
 	def valid_name(self, item_type, suggestion=None):
@@ -133,13 +142,15 @@ class item_store(object):
 
 	# The properties below emulate a dict interface.
 
-	@property
-	def __setitem__(self):
-		return self.__items__.__setitem__
+	def __setitem__(self, name, item):
 
-	@property
-	def __delitem__(self):
-		return self.__items__.__delitem__
+		self.generation += 1
+		self.__items__[name] = item
+
+	def __delitem__(self, name):
+
+		self.generation += 1
+		del self.__items__[name]
 
 	@property
 	def __len__(self):
@@ -171,6 +182,9 @@ class item_store(object):
 
 		if not isinstance(name, basestring):
 			return False
+		# Most names match exactly, so first try a direct lookup
+		if name in self.__items__:
+			return True
 		for item in self.__items__:
 			if item.lower() == name.lower():
 				return True
@@ -178,6 +192,11 @@ class item_store(object):
 
 	def __getitem__(self, name):
 
+		# Most names match exactly, so first try a direct lookup
+		try:
+			return self.__items__[name]
+		except (KeyError, TypeError):
+			pass
 		for item in self.__items__:
 			if item.lower() == name.lower():
 				return self.__items__[item]
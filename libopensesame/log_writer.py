@@ -0,0 +1,417 @@
+#-*- coding:utf-8 -*-
+
+"""
+This file is part of OpenSesame.
+
+OpenSesame is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+OpenSesame is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with OpenSesame.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from libopensesame.exceptions import osexception
+from libopensesame import debug, misc
+import codecs
+import io
+import os
+import time
+import zipfile
+
+class log_writer(object):
+
+	"""
+	desc: |
+		Writes the log file as plain-text .csv. This is the default log format.
+
+		Log writers are file-like objects, which are available as `exp._log`.
+		The log format is selected with the `log_format` experimental variable,
+		which can be `csv` (default), `buffered_csv`, or `npz`.
+	"""
+
+	def __init__(self, experiment, path):
+
+		"""
+		desc:
+			Constructor.
+
+		arguments:
+			experiment:
+				desc:	The experiment object.
+				type:	experiment
+			path:
+				desc:	The path to the log file.
+				type:	unicode
+		"""
+
+		self.experiment = experiment
+		self.path = path
+		self._file = codecs.open(path, u'w', encoding=experiment.encoding)
+
+	def write(self, msg):
+
+		"""
+		desc:
+			Writes text to the log file.
+
+		arguments:
+			msg:
+				desc:	The text to write.
+				type:	unicode
+		"""
+
+		self._file.write(msg)
+
+	def write_header(self, names):
+
+		"""
+		desc:
+			Writes a row of column names, as done by the logger item when it
+			runs for the first time.
+
+		arguments:
+			names:
+				desc:	A list of variable names.
+				type:	list
+		"""
+
+		self.write(u','.join(names) + u'\n')
+
+	def write_row(self, values, quote=True, names=None):
+
+		"""
+		desc:
+			Writes a row of values, as done by the logger item.
+
+		arguments:
+			values:
+				desc:	A list of unicode values, in the same order as the
+						column names passed to `write_header()`.
+				type:	list
+
+		keywords:
+			quote:
+				desc:	Indicates whether values should be surrounded by
+						double quotes.
+				type:	bool
+			names:
+				desc:	The column names that were passed to `write_header()`,
+						which identify the table that the row belongs to when
+						there is more than one logger, or None for the most
+						recent header. Plain-text formats ignore this.
+				type:	[list, NoneType]
+		"""
+
+		if quote:
+			self.write(u'"' + u'","'.join(values) + u'"\n')
+		else:
+			self.write(u','.join(values) + u'\n')
+
+	def flush(self):
+
+		"""
+		desc:
+			Flushes pending writes to the operating system.
+		"""
+
+		self._file.flush()
+
+	def fsync(self):
+
+		"""
+		desc:
+			Flushes pending writes and forces them to be written to disk.
+		"""
+
+		self.flush()
+		os.fsync(self._file.fileno())
+
+	def fileno(self):
+
+		"""
+		desc:
+			Returns the file descriptor of the log file, so that `os.fsync()`
+			can be called on the writer.
+
+		returns:
+			type:	int
+		"""
+
+		return self._file.fileno()
+
+	def close(self):
+
+		"""
+		desc:
+			Writes all pending data to disk and closes the log file.
+		"""
+
+		self.fsync()
+		self._file.close()
+
+class buffered_log_writer(log_writer):
+
+	"""
+	desc: |
+		Writes the log file as plain-text .csv, but buffers rows in memory and
+		writes them to disk in batches. A batch is written, and synced to disk,
+		when it contains `log_flush_rows` rows (default: 100), or when
+		`log_flush_interval` ms (default: 5000) have passed since the last
+		batch, whichever comes first. The buffer is also written when the
+		experiment ends, including when it ends because of an error.
+	"""
+
+	def __init__(self, experiment, path):
+
+		super(buffered_log_writer, self).__init__(experiment, path)
+		self.flush_rows = experiment.get_check(u'log_flush_rows', 100)
+		self.flush_interval = experiment.get_check(u'log_flush_interval', 5000)
+		self._buffer = []
+		self._buffered_rows = 0
+		self._last_sync = time.time()
+
+	def write(self, msg):
+
+		self._buffer.append(msg)
+		self.check_sync()
+
+	def write_header(self, names):
+
+		self._buffered_rows += 1
+		super(buffered_log_writer, self).write_header(names)
+
+	def write_row(self, values, quote=True, names=None):
+
+		self._buffered_rows += 1
+		super(buffered_log_writer, self).write_row(values, quote=quote)
+
+	def check_sync(self):
+
+		"""
+		desc:
+			Syncs to disk if `log_flush_rows` rows have been buffered, or if
+			`log_flush_interval` ms have passed since the last sync. Free text
+			that is written with `log()` is buffered as well, but does not
+			count as a row.
+		"""
+
+		if self._buffered_rows >= self.flush_rows or \
+			1000. * (time.time() - self._last_sync) >= self.flush_interval:
+			self.fsync()
+
+	def flush(self):
+
+		if len(self._buffer) > 0:
+			self._file.write(u''.join(self._buffer))
+			self._buffer = []
+		self._buffered_rows = 0
+		self._file.flush()
+
+	def fsync(self):
+
+		super(buffered_log_writer, self).fsync()
+		self._last_sync = time.time()
+
+class npz_log_writer(buffered_log_writer):
+
+	"""
+	desc: |
+		Writes the rows of logger items in a binary, columnar format: a NumPy
+		.npz archive, with the same name as the log file, but with a `.npz`
+		extension.
+
+		Each distinct header, i.e. each logger with its own set of variables,
+		starts a table. Tables are numbered in the order in which they first
+		occur. The rows of each table are collected into chunks of
+		`log_flush_rows` rows, which are appended to the archive as one array
+		per column. The arrays are called `table[nr]_chunk[nr]_[variable]`,
+		e.g. `table00_chunk0000_response`. Columns that contain only numbers
+		are stored as floats, other columns as unicode strings.
+
+		Until a chunk has been written, its rows are kept in an append-only
+		journal (the .npz path with a `.journal` extension), which is synced
+		to disk periodically, as described for the `buffered_csv` format.
+		Each line of the journal starts with a table number, followed by a
+		colon and either the header (marked by a `#`) or a row, in the same
+		format as in a .csv log file. The journal is removed when the
+		experiment ends normally. Free text, written with `log()`, goes to the
+		log file itself.
+
+		This format requires NumPy.
+	"""
+
+	def __init__(self, experiment, path):
+
+		try:
+			import numpy
+		except ImportError:
+			raise osexception(
+				u'The npz log format requires NumPy, which is not available')
+		self._numpy = numpy
+		self.npz_path = os.path.splitext(path)[0] + u'.npz'
+		self.journal_path = self.npz_path + u'.journal'
+		if os.path.exists(self.npz_path):
+			os.remove(self.npz_path)
+		self._journal = codecs.open(self.journal_path, u'w',
+			encoding=experiment.encoding)
+		# Tables are dicts with a number, column names, pending rows (with
+		# their journal lines), and a chunk counter, and have the column names
+		# as a tuple as key.
+		self._tables = {}
+		self._last_table = None
+		super(npz_log_writer, self).__init__(experiment, path)
+
+	def write_header(self, names):
+
+		key = tuple(names)
+		if key not in self._tables:
+			self._tables[key] = {
+				u'nr'		: len(self._tables),
+				u'names'	: list(names),
+				u'rows'		: [],
+				u'journal'	: [],
+				u'chunk'	: 0,
+				}
+			self._journal.write(self._journal_header(self._tables[key]))
+		self._last_table = self._tables[key]
+
+	def write_row(self, values, quote=True, names=None):
+
+		if names is not None:
+			table = self._tables.get(tuple(names))
+		else:
+			table = self._last_table
+		if table is None or len(values) != len(table[u'names']):
+			raise osexception(
+				u'The npz log format requires a header with one name for each '
+				u'logged value')
+		if quote:
+			line = u'"' + u'","'.join([value.replace(u'"', u'""') \
+				for value in values]) + u'"'
+		else:
+			line = u','.join(values)
+		line = u'%d:%s\n' % (table[u'nr'], line)
+		table[u'rows'].append(values)
+		table[u'journal'].append(line)
+		self._journal.write(line)
+		if len(table[u'rows']) >= self.flush_rows:
+			self.write_chunk(table)
+		elif 1000. * (time.time() - self._last_sync) >= self.flush_interval:
+			self.fsync()
+
+	def write_chunk(self, table):
+
+		"""
+		desc:
+			Appends the rows of a table that have been collected to the .npz
+			archive as a new chunk, and removes them from the journal.
+
+		arguments:
+			table:
+				desc:	A table.
+				type:	dict
+		"""
+
+		if len(table[u'rows']) == 0:
+			return
+		numpy = self._numpy
+		zf = zipfile.ZipFile(self.npz_path.encode(
+			misc.filesystem_encoding()), u'a', zipfile.ZIP_STORED)
+		for i, name in enumerate(table[u'names']):
+			column = [row[i] for row in table[u'rows']]
+			try:
+				a = numpy.array(column, dtype=float)
+			except ValueError:
+				a = numpy.array(column, dtype=unicode)
+			buf = io.BytesIO()
+			numpy.lib.format.write_array(buf, a, allow_pickle=False)
+			zf.writestr(str(u'table%.2d_chunk%.4d_%s.npy' % (table[u'nr'],
+				table[u'chunk'], name)), buf.getvalue())
+		zf.close()
+		with open(self.npz_path.encode(misc.filesystem_encoding()),
+			u'rb') as fd:
+			os.fsync(fd.fileno())
+		debug.msg(u'wrote chunk %d of table %d (%d rows) to %s' % (
+			table[u'chunk'], table[u'nr'], len(table[u'rows']),
+			self.npz_path))
+		table[u'chunk'] += 1
+		table[u'rows'] = []
+		table[u'journal'] = []
+		# The rows are safe now, so restart the journal with only the rows of
+		# the other tables that have not been written yet
+		self._journal.close()
+		self._journal = codecs.open(self.journal_path, u'w',
+			encoding=self.experiment.encoding)
+		for other in sorted(self._tables.values(), key=lambda t: t[u'nr']):
+			self._journal.write(self._journal_header(other))
+			self._journal.write(u''.join(other[u'journal']))
+
+	def _journal_header(self, table):
+
+		"""
+		desc:
+			Formats the header of a table for the journal.
+
+		arguments:
+			table:
+				desc:	A table.
+				type:	dict
+
+		returns:
+			type:	unicode
+		"""
+
+		return u'%d:#%s\n' % (table[u'nr'], u','.join(table[u'names']))
+
+	def fsync(self):
+
+		self._journal.flush()
+		os.fsync(self._journal.fileno())
+		super(npz_log_writer, self).fsync()
+
+	def close(self):
+
+		for table in sorted(self._tables.values(), key=lambda t: t[u'nr']):
+			self.write_chunk(table)
+		super(npz_log_writer, self).close()
+		self._journal.close()
+		os.remove(self.journal_path)
+
+# The available log formats
+log_formats = {
+	u'csv'			: log_writer,
+	u'buffered_csv'	: buffered_log_writer,
+	u'npz'			: npz_log_writer,
+	}
+
+def open_log(experiment, path):
+
+	"""
+	desc:
+		Opens a log writer for the format that is specified by the `log_format`
+		experimental variable.
+
+	arguments:
+		experiment:
+			desc:	The experiment object.
+			type:	experiment
+		path:
+			desc:	The path to the log file.
+			type:	unicode
+
+	returns:
+		desc:	A log writer.
+		type:	log_writer
+	"""
+
+	log_format = experiment.get_check(u'log_format', u'csv',
+		sorted(log_formats.keys()))
+	debug.msg(u'log format is %s' % log_format)
+	return log_formats[log_format](experiment, path)
@@ -49,15 +49,15 @@ class logger(item.item):
 			# If auto logging is enabled, collect all variables
 			if self.get(u'auto_log') == u'yes':
 				self.logvars = []
-				for logvar, val, item in self.experiment.var_list():
-					if (self.has(logvar) or self.get(u'ignore_missing') == \
-						u'yes') and logvar not in self.logvars:
+				ignore_missing = self.get(u'ignore_missing') == u'yes'
+				for logvar in self.experiment.var_registry.names():
+					if ignore_missing or self.has(logvar):
 						self.logvars.append(logvar)
 						debug.msg(u'auto-logging "%s"' % logvar)
 			# Sort the logvars to ascertain a consistent ordering
 			self.logvars.sort()
 			# Draw the first line with variables
-			self.log(u','.join(self.logvars))
+			self.experiment._log.write_header(self.logvars)
 
 		l = []
 		for var in self.logvars:
@@ -72,10 +72,8 @@ class logger(item.item):
 						% (self.name, var, var, self.name))
 			l.append(val)
 
-		if self.get(u'use_quotes') == u'yes':
-			self.log(u'"' + (u'","'.join(l)) + u'"')
-		else:
-			self.log(u",".join(l))
+		self.experiment._log.write_row(l,
+			quote=self.get(u'use_quotes') == u'yes', names=self.logvars)
 
 	def from_string(self, string):
 
@@ -106,7 +104,7 @@ class logger(item.item):
 		A definition string
 		"""
 
-		s = item.item.to_string(self, u'logger')
+		l = [item.item.to_string(self, u'logger')]
 		for logvar in self.logvars:
-			s += u'\tlog "%s"\n' % logvar
-		return s
+			l.append(u'\tlog "%s"\n' % logvar)
+		return u''.join(l)
@@ -20,14 +20,22 @@ along with OpenSesame.  If not, see <http://www.gnu.org/licenses/>.
 from libopensesame.exceptions import osexception
 from libopensesame import item, debug
 import openexp.keyboard
+from collections import deque
 from random import *
 from math import *
+try:
+	import numpy
+except ImportError:
+	numpy = None
 
 class loop(item.item):
 
 	"""A loop item runs a single other item multiple times"""
 
 	description = u'Repeatedly runs another item'
+	# The types of items whose prepare phase only creates stimuli, and that
+	# can therefore be prepared ahead without side effects
+	prepare_ahead_types = [u'sketchpad', u'sampler', u'synth']
 
 	def reset(self):
 
@@ -41,6 +49,7 @@ class loop(item.item):
 		self.order = u'random'
 		self.item = u''
 		self.break_if = u'never'
+		self.prepare_ahead = u'no'
 
 	def from_string(self, string):
 
@@ -77,6 +86,8 @@ class loop(item.item):
 					if cycle not in self.matrix:
 						self.matrix[cycle] = {}
 					self.matrix[cycle][var] = val
+		# The loop columns are declared through var_info()
+		self.experiment.var_registry.touch(self)
 
 	def run(self):
 
@@ -130,10 +141,15 @@ class loop(item.item):
 				u"Could not find item '%s', which is called by loop item '%s'" \
 				% (self.item, self.name))
 
+		# Optionally prepare all cycles before the block starts
+		if self.get(u'prepare_ahead') == u'yes':
+			self.prepare_cycles(l)
+
 		# And run!
 		_item = self.experiment.items[self.item]
+		l = deque(l)
 		while len(l) > 0:
-			cycle = l.pop(0)
+			cycle = l.popleft()
 			self.apply_cycle(cycle)
 			if self._break_if != None and eval(self._break_if):
 				break
@@ -146,13 +162,124 @@ class loop(item.item):
 				if self.order == u'random':
 					shuffle(l)
 
-	def apply_cycle(self, cycle):
+	def prepare_cycles(self, l):
+
+		"""
+		Warms up the stimulus cache before the block starts, by preparing the
+		stimuli for each cycle, so that stimuli that are generated or loaded
+		during the prepare phase (e.g., images, Gabor patches, and sounds) are
+		already cached when the cycles are run. This is cache warming only:
+		the prepared state of the items is discarded, and the items are still
+		prepared before each cycle, but their prepare phase then mostly
+		consists of cache lookups. Only items whose prepare phase has no side
+		effects, i.e. sketchpads, samplers, and synths that are run by the
+		loop directly or through sequences, are prepared; inline_scripts and
+		other items are not. Loop variables that are Python expressions
+		(starting with '=') are not evaluated ahead. Cycles are prepared in
+		the order in which they will be run, also when it is not known whether
+		they will be reached (because of a break-if condition), and
+		preparation stops before the next cycle would exceed the budget of the
+		stimulus cache. Afterwards, the variables, the state of the prepared
+		items, and the state of the random number generators are restored, so
+		that the block runs exactly as it would otherwise.
+
+		Arguments:
+		l 			--	A list of cycle numbers.
+		"""
+
+		cache = self.experiment.stimulus_cache
+		if cache.max_bytes <= 0:
+			print(u'Warning: loop item "%s" is not prepared ahead, because the stimulus cache is disabled' \
+				% self.name)
+			return
+		items = self.prepare_ahead_items()
+		if len(items) == 0:
+			print(u'Warning: loop item "%s" is not prepared ahead, because it does not run any sketchpads, samplers, or synths' \
+				% self.name)
+			return
+		# Remember the state that is changed by preparing, so that it can be
+		# restored afterwards
+		_vars = self.experiment.variables.copy()
+		states = [(_item, _item.__dict__.copy()) for _item in items]
+		random_state = getstate()
+		if numpy is not None:
+			numpy_state = numpy.random.get_state()
+		evictions = cache.evictions
+		t0 = self.time()
+		seen = set()
+		# The largest number of bytes that a single cycle has added to the
+		# cache, which is used to predict whether the next cycle still fits
+		cycle_bytes = 0
+		for cycle in l:
+			if cycle in seen:
+				continue
+			if cache.nbytes + cycle_bytes > cache.max_bytes:
+				debug.msg(u'stimulus cache is full')
+				break
+			seen.add(cycle)
+			nbytes = cache.nbytes
+			self.apply_cycle(cycle, evaluate=False)
+			for _item in items:
+				try:
+					_item.prepare()
+				except Exception as e:
+					# Errors are raised again when the cycle is actually run
+					debug.msg(u'failed to prepare %s ahead for cycle %d: %s' \
+						% (_item.name, cycle, e))
+			cycle_bytes = max(cycle_bytes, cache.nbytes - nbytes)
+			if cache.evictions > evictions:
+				debug.msg(u'stimulus cache is full')
+				break
+		for var in self.experiment.variables.keys():
+			if var not in _vars:
+				self.experiment.unset(var)
+		for var, val in _vars.items():
+			self.experiment.set(var, val)
+		for _item, state in states:
+			_item.__dict__.clear()
+			_item.__dict__.update(state)
+		setstate(random_state)
+		if numpy is not None:
+			numpy.random.set_state(numpy_state)
+		debug.msg(u'prepared %d cycles ahead in %s ms' % (len(seen),
+			self.time() - t0))
+
+	def prepare_ahead_items(self):
+
+		"""
+		Collects the items that can be prepared ahead (see prepare_cycles()).
+
+		Returns:
+		A list of items.
+		"""
+
+		items = []
+		seen = set()
+		names = [self.item]
+		while len(names) > 0:
+			name = names.pop(0)
+			if name in seen or name not in self.experiment.items:
+				continue
+			seen.add(name)
+			_item = self.experiment.items[name]
+			if _item.item_type == u'sequence':
+				names += [child for child, cond in _item.items]
+			elif _item.item_type in self.prepare_ahead_types:
+				items.append(_item)
+		return items
+
+	def apply_cycle(self, cycle, evaluate=True):
 
 		"""
 		Sets all the loop variables according to the cycle.
 
 		Arguments:
 		cycle 		--	The cycle nr.
+
+		Keyword arguments:
+		evaluate	--	Indicates whether variables that are Python
+						expressions should be evaluated. If False, these
+						variables are not set. (default=True)
 		"""
 
 		# If the cycle is not defined, we don't have to do anything
@@ -165,6 +292,8 @@ class loop(item.item):
 			# Python statement, for example to call functions from
 			# the random or math module
 			if type(val) == unicode and len(val) > 1 and val[0] == "=":
+				if not evaluate:
+					continue
 				try:
 					val = eval(val[1:])
 				except Exception as e:
@@ -183,12 +312,13 @@ class loop(item.item):
 		A definition string.
 		"""
 
-		s = super(loop, self).to_string()
+		l = [super(loop, self).to_string()]
 		for i in self.matrix:
 			for var in self.matrix[i]:
-				s += u'\tsetcycle %d %s "%s"\n' % (i, var, self.matrix[i][var])
-		s += u'\trun %s\n' % self.item
-		return s
+				l.append(u'\tsetcycle %d %s "%s"\n' % (i, var,
+					self.matrix[i][var]))
+		l.append(u'\trun %s\n' % self.item)
+		return u''.join(l)
 
 	def var_info(self):
 
@@ -72,6 +72,8 @@ def opensesamerun_options():
 	parser.set_defaults(width=1024)
 	parser.set_defaults(height=768)
 	parser.set_defaults(custom_resolution=False)
+	parser.set_defaults(headless=False)
+	parser.set_defaults(lazy_pool=False)
 	group = optparse.OptionGroup(parser, u'Subject and log file options')
 	group.add_option(u"-s", u"--subject", action=u"store", dest=u"subject", \
 		help=u"Subject number")
@@ -94,6 +96,10 @@ def opensesamerun_options():
 		help=u"Print lots of debugging messages to the standard output")
 	group.add_option(u"--stack", action=u"store_true", dest=u"stack", help= \
 		u"Print stack information")
+	group.add_option(u"--headless", action=u"store_true", dest=u"headless", \
+		help=u"Run without a display, sound, or participant, using the null back-ends")
+	group.add_option(u"--lazy-pool", action=u"store_true", dest=u"lazy_pool",
+		help=u"Extract files from the file pool of an .opensesame.zip file only when they are needed, so that the experiment starts faster")
 	parser.add_option_group(group)
 	group = optparse.OptionGroup(parser, u"Miscellaneous options")
 	group.add_option(u"--pylink", action=u"store_true", dest=u"pylink", help= \
@@ -0,0 +1,139 @@
+#-*- coding:utf-8 -*-
+
+"""
+This file is part of OpenSesame.
+
+OpenSesame is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+OpenSesame is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with OpenSesame.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import time
+
+class poller(object):
+
+	"""
+	desc: |
+		Decides how loops that poll an input device, such as the keyboard, the
+		mouse, or a serial response box, wait between two polls. The strategy
+		is selected with the `poll_mode` experimental variable:
+
+		- `spin` (default) polls continuously. This gives the most precise
+		  timestamps, but keeps one CPU core fully busy.
+		- `block` sleeps `poll_sleep_ms` (default: 1) between polls, so that
+		  the CPU is mostly idle. Responses are timestamped up to one sleep
+		  interval late.
+		- `hybrid` sleeps like `block`, but polls continuously during the last
+		  `poll_spin_ms` (default: 2) before a timeout, so that timeouts are as
+		  precise as with `spin`.
+
+		The operating system may sleep longer than requested. The poller
+		measures by how much each sleep overshoots, because this adds to the
+		latency of response timestamps. A summary is printed when the
+		experiment ends.
+	"""
+
+	modes = [u'spin', u'block', u'hybrid']
+
+	def __init__(self, mode=u'spin', sleep_ms=1, spin_ms=2):
+
+		"""
+		desc:
+			Constructor.
+
+		keywords:
+			mode:
+				desc:	The polling strategy: 'spin', 'block', or 'hybrid'.
+				type:	unicode
+			sleep_ms:
+				desc:	The sleep interval between polls.
+				type:	[int, float]
+			spin_ms:
+				desc:	The period before a timeout during which the 'hybrid'
+						strategy polls continuously.
+				type:	[int, float]
+		"""
+
+		self.mode = mode
+		self.sleep_ms = sleep_ms
+		self.spin_ms = spin_ms
+		self.reset_stats()
+
+	def reset_stats(self):
+
+		"""
+		desc:
+			Resets the overshoot statistics.
+		"""
+
+		self.sleeps = 0
+		self.total_overshoot = 0.
+		self.max_overshoot = 0.
+
+	def idle(self, elapsed=0, timeout=None):
+
+		"""
+		desc:
+			Waits before the next poll, depending on the polling strategy.
+			This is called once for each iteration of a polling loop.
+
+		keywords:
+			elapsed:
+				desc:	The time that has passed since polling started, in
+						milliseconds.
+				type:	[int, float]
+			timeout:
+				desc:	The timeout in milliseconds, or None if there is no
+						timeout.
+				type:	[int, float, NoneType]
+		"""
+
+		if self.mode == u'spin':
+			return
+		ms = self.sleep_ms
+		if timeout is not None:
+			remaining = timeout - elapsed
+			if self.mode == u'hybrid':
+				remaining -= self.spin_ms
+			if remaining <= 0:
+				return
+			ms = min(ms, remaining)
+		t0 = time.time()
+		time.sleep(ms / 1000.)
+		overshoot = 1000. * (time.time() - t0) - ms
+		self.sleeps += 1
+		self.total_overshoot += overshoot
+		if overshoot > self.max_overshoot:
+			self.max_overshoot = overshoot
+
+	def report(self):
+
+		"""
+		desc:
+			Summarizes how much sleeps overshot the requested interval.
+
+		returns:
+			desc:	A dict with the keys 'mode', 'sleeps', 'mean_overshoot_ms',
+					and 'max_overshoot_ms'.
+			type:	dict
+		"""
+
+		if self.sleeps == 0:
+			mean = 0.
+		else:
+			mean = self.total_overshoot / self.sleeps
+		return {
+			u'mode'				: self.mode,
+			u'sleeps'			: self.sleeps,
+			u'mean_overshoot_ms'	: mean,
+			u'max_overshoot_ms'	: self.max_overshoot,
+			}
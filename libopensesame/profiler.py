@@ -0,0 +1,338 @@
+#-*- coding:utf-8 -*-
+
+"""
+This file is part of OpenSesame.
+
+OpenSesame is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+OpenSesame is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with OpenSesame.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from libopensesame import debug
+import codecs
+import json
+import os
+
+class profiler(object):
+
+	"""
+	desc: |
+		Records when items are prepared and run, and when canvases are
+		prepared and shown, so that the timing of an experiment can be
+		inspected afterwards.
+
+		Profiling is enabled by setting the `profile` experimental variable to
+		`yes`. While the experiment runs, the `prepare()` and `run()` functions
+		of all items, and the `prepare()` and `show()` functions of all
+		canvases, are timed. For each canvas that is shown while an item with a
+		numeric `duration` is running, the actual duration (until the next
+		canvas is shown) is compared to the requested duration. A canvas that
+		is shown at least `profile_frame_ms` ms (default: 16.7) later than
+		requested is counted as a dropped frame.
+
+		When the experiment ends, the trace is saved next to the log file, as a
+		Chrome trace-event file (`profile_format` = `chrome`, default), which
+		can be opened at `chrome://tracing`, or as a .csv file
+		(`profile_format` = `csv`).
+	"""
+
+	def __init__(self, experiment):
+
+		"""
+		desc:
+			Constructor.
+
+		arguments:
+			experiment:
+				desc:	The experiment object.
+				type:	experiment
+		"""
+
+		self.experiment = experiment
+		self.format = experiment.get_check(u'profile_format', u'chrome',
+			[u'chrome', u'csv'])
+		self.frame_ms = experiment.get_check(u'profile_frame_ms', 1000./60)
+		self.events = []
+		self.dropped_frames = 0
+		# The items that are currently being prepared or run
+		self._stack = []
+		# The last flip, which is completed when the next canvas is shown
+		self._last_flip = None
+		# Indicates whether a canvas is being shown, in which case a show()
+		# that is called by _show_rects() is not recorded separately
+		self._showing = False
+		# The items that have been wrapped, so that they can be unwrapped when
+		# the profiler is closed
+		self._items = []
+
+	def wrap_item(self, item):
+
+		"""
+		desc:
+			Starts timing the `prepare()` and `run()` functions of an item.
+
+		arguments:
+			item:
+				desc:	The item.
+				type:	item
+		"""
+
+		if getattr(item, u'_profiled', None) is self:
+			return
+		# An item that is still wrapped by another profiler, for example
+		# because the previous run of the experiment crashed, is unwrapped
+		# first, so that its timings are not recorded by the other profiler
+		if hasattr(item, u'_profiled'):
+			item._profiled.unwrap_item(item)
+		# The original functions are usually not in the __dict__ of the item,
+		# in which case None is stored, and the class functions are used again
+		# after unwrapping
+		item._unprofiled = item.__dict__.get(u'prepare'), \
+			item.__dict__.get(u'run')
+		item._profiled = self
+		item.prepare = self._wrap(item.prepare, item.name, item.item_type,
+			u'prepare', item)
+		item.run = self._wrap(item.run, item.name, item.item_type, u'run',
+			item)
+		self._items.append(item)
+
+	def unwrap_item(self, item):
+
+		"""
+		desc:
+			Stops timing an item, and restores its original `prepare()` and
+			`run()` functions.
+
+		arguments:
+			item:
+				desc:	The item.
+				type:	item
+		"""
+
+		if getattr(item, u'_profiled', None) is not self:
+			return
+		for name, func in zip((u'prepare', u'run'), item._unprofiled):
+			if func is None:
+				item.__dict__.pop(name, None)
+			else:
+				setattr(item, name, func)
+		del item._profiled
+		del item._unprofiled
+
+	def close(self):
+
+		"""
+		desc:
+			Stops timing all items. This is done when the experiment ends, so
+			that a profiler that is created when the experiment runs again
+			starts with the original items.
+		"""
+
+		for item in self._items:
+			self.unwrap_item(item)
+		self._items = []
+
+	def wrap_canvas(self, canvas):
+
+		"""
+		desc:
+			Starts timing the `prepare()` and `show()` functions of a canvas,
+			as well as `_show_rects()`, which is used by forms to show only
+			the parts of a canvas that have changed. Both are recorded as
+			`show`.
+
+		arguments:
+			canvas:
+				desc:	The canvas.
+				type:	canvas
+		"""
+
+		canvas.prepare = self._wrap(canvas.prepare, u'canvas',
+			canvas.__class__.__name__, u'prepare')
+		canvas.show = self._wrap(canvas.show, u'canvas',
+			canvas.__class__.__name__, u'show')
+		canvas._show_rects = self._wrap(canvas._show_rects, u'canvas',
+			canvas.__class__.__name__, u'show')
+
+	def _wrap(self, func, name, _type, phase, item=None):
+
+		"""
+		desc:
+			Wraps a function so that calls to it are recorded.
+
+		arguments:
+			func:
+				desc:	The function.
+				type:	function
+			name:
+				desc:	The name of the item, or 'canvas'.
+				type:	unicode
+			_type:
+				desc:	The item type or canvas back-end.
+				type:	unicode
+			phase:
+				desc:	The name of the function.
+				type:	unicode
+
+		keywords:
+			item:
+				desc:	The item, or None for canvases.
+				type:	[item, NoneType]
+
+		returns:
+			desc:	The wrapped function.
+			type:	function
+		"""
+
+		def profiled(*arglist, **kwdict):
+			if phase == u'show':
+				if self._showing:
+					return func(*arglist, **kwdict)
+				self._showing = True
+			if item is not None:
+				self._stack.append(item)
+			start = self.experiment.time()
+			try:
+				retval = func(*arglist, **kwdict)
+			finally:
+				end = self.experiment.time()
+				if item is not None:
+					self._stack.pop()
+				if phase == u'show':
+					self._showing = False
+				event = {u'name' : name, u'type' : _type, u'phase' : phase,
+					u'start' : start, u'end' : end}
+				self.events.append(event)
+			if phase == u'show':
+				self._flip(event)
+			return retval
+		return profiled
+
+	def _flip(self, event):
+
+		"""
+		desc:
+			Processes a canvas flip, by completing the previous flip and
+			remembering the requested duration of the current flip.
+
+		arguments:
+			event:
+				desc:	The event of the `show()` call.
+				type:	dict
+		"""
+
+		if self._last_flip is not None:
+			last_event, last_onset, requested = self._last_flip
+			last_event[u'actual'] = event[u'end'] - last_onset
+			late = last_event[u'actual'] - requested
+			last_event[u'late'] = late
+			if late >= self.frame_ms:
+				self.dropped_frames += 1
+				debug.msg(u'dropped frame: %.1f ms late' % late)
+		self._last_flip = None
+		if len(self._stack) == 0:
+			return
+		item = self._stack[-1]
+		event[u'name'] = item.name
+		try:
+			requested = float(item.get(u'duration'))
+		except:
+			return
+		event[u'requested'] = requested
+		self._last_flip = event, event[u'end'], requested
+
+	def path(self):
+
+		"""
+		desc:
+			Determines the path of the trace file, based on the log file.
+
+		returns:
+			desc:	A path.
+			type:	unicode
+		"""
+
+		base = os.path.splitext(self.experiment.logfile)[0]
+		if self.format == u'csv':
+			return base + u'-trace.csv'
+		return base + u'-trace.json'
+
+	def save(self, path=None):
+
+		"""
+		desc:
+			Saves the trace.
+
+		keywords:
+			path:
+				desc:	The path of the trace file, or None to save it next to
+						the log file.
+				type:	[unicode, NoneType]
+		"""
+
+		if path is None:
+			path = self.path()
+		debug.msg(u'saving trace to %s (%d dropped frames)' % (path,
+			self.dropped_frames))
+		if self.format == u'csv':
+			self._save_csv(path)
+		else:
+			self._save_chrome(path)
+
+	def _save_chrome(self, path):
+
+		"""
+		desc:
+			Saves the trace in the Chrome trace-event format. Timestamps are
+			in microseconds.
+
+		arguments:
+			path:
+				desc:	The path of the trace file.
+				type:	unicode
+		"""
+
+		l = []
+		for event in self.events:
+			args = {u'type' : event[u'type']}
+			for key in (u'requested', u'actual', u'late'):
+				if key in event:
+					args[key] = event[key]
+			l.append({u'name' : u'%s.%s' % (event[u'name'], event[u'phase']),
+				u'cat' : event[u'phase'], u'ph' : u'X', u'pid' : 0,
+				u'tid' : 0, u'ts' : 1000. * event[u'start'],
+				u'dur' : 1000. * (event[u'end'] - event[u'start']),
+				u'args' : args})
+		with open(path, u'w') as fd:
+			json.dump({u'traceEvents' : l, u'otherData' : {
+				u'dropped_frames' : self.dropped_frames}}, fd)
+
+	def _save_csv(self, path):
+
+		"""
+		desc:
+			Saves the trace as a .csv file, with one row per event. Times are
+			in milliseconds.
+
+		arguments:
+			path:
+				desc:	The path of the trace file.
+				type:	unicode
+		"""
+
+		columns = [u'name', u'type', u'phase', u'start', u'end', u'requested',
+			u'actual', u'late']
+		with codecs.open(path, u'w', encoding=self.experiment.encoding) as fd:
+			fd.write(u','.join(columns) + u'\n')
+			for event in self.events:
+				fd.write(u','.join([u'"%s"' % self.experiment.unistr(
+					event.get(column, u'NA')) for column in columns]) + u'\n')
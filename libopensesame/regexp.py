@@ -36,5 +36,23 @@ unsanitize = re.compile( \
 # Used to find variables in a string
 find_variable = re.compile(r'\[\w+\]')
 
+# Used to split a string into literal text and variable references
+split_variable = re.compile(r'\[(\w+)\]')
+
+# Used to split conditional statements into operators (first group) and
+# words, which can contain quoted parts and escaped characters (second group).
+# Anything else, i.e. an unmatched quote or a trailing backslash, ends up in
+# the third group. The quoting and escaping rules are the same as those of
+# libopensesame.script_lexer.
+cond_token = re.compile( \
+	r'(!=|==|>=|<=|\*\*|[!=<>+\-()/*%~^])|'
+	r'((?:"(?:[^"\\]|\\.)*"|\'[^\']*\'|\\.|[^\s!=<>+\-()/*%~^"\'\\])+)|'
+	r'(\S)', re.UNICODE | re.DOTALL)
+
+# Used to remove the quotes and escape characters from a word. In double
+# quotes, a backslash only escapes a double quote or a backslash.
+cond_unquote = re.compile(r'"((?:[^"\\]|\\.)*)"|\'([^\']*)\'|\\(.)',
+	re.DOTALL)
+
 # Used to convert arbitrary strings into valid Python variable names
 sanitize_var_name = re.compile('\W|^(?=\d)')
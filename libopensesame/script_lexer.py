@@ -0,0 +1,129 @@
+#-*- coding:utf-8 -*-
+
+"""
+This file is part of OpenSesame.
+
+OpenSesame is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+OpenSesame is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with OpenSesame.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import re
+
+# There is only a pure-Python implementation. Both paths below rely on
+# compiled regular expressions, so that the scanning itself runs in the C code
+# of the re module. A compiled extension would need a build step for every
+# platform that OpenSesame is packaged for, which it does not have.
+
+# The maximum number of lines for which tokens are cached. When this number is
+# exceeded, the cache is cleared, like the cache of the re module.
+max_cache = 10000
+# Tokens with the line as key
+token_cache = {}
+
+# A line without quotes and backslashes is simply split on whitespace
+plain = re.compile(u'[^ \t\r\n]+')
+special = re.compile(u'[\'"\\\\]')
+# Otherwise, the line is scanned in pieces. Adjacent pieces that are not
+# separated by whitespace form a single token.
+piece = re.compile(u'''
+	(?P<space>[ \t\r\n]+)
+	|(?P<word>[^ \t\r\n'"\\\\]+)
+	|\\\\(?P<escape>.)
+	|'(?P<single>[^']*)'
+	|"(?P<double>(?:[^"\\\\]|\\\\.)*)"
+	|(?P<error>.)
+	''', re.VERBOSE | re.DOTALL)
+# In double quotes, a backslash only escapes a double quote or a backslash
+double_escape = re.compile(u'\\\\(["\\\\])')
+
+def split(line):
+
+	"""
+	desc:
+		Splits a line of OpenSesame script into tokens, with the same quoting
+		and escaping rules as `shlex.split()` in POSIX mode: tokens are
+		separated by whitespace, single and double quotes group text into a
+		single token, and a backslash escapes the next character (in double
+		quotes, only a double quote or a backslash). Unlike `shlex`, unicode
+		is handled directly. Tokens are cached, so that a line that is split
+		more than once, e.g. by `parse_variable()` and by the item itself, is
+		scanned only once. A ValueError is raised if a quotation is not
+		closed, or if the line ends with an escape character.
+
+	arguments:
+		line:
+			desc:	A line of script.
+			type:	unicode
+
+	returns:
+		desc:	A list of tokens.
+		type:	list
+	"""
+
+	try:
+		return list(token_cache[line])
+	except KeyError:
+		pass
+	if special.search(line) is None:
+		tokens = plain.findall(line)
+	else:
+		tokens = scan(line)
+	if len(token_cache) >= max_cache:
+		token_cache.clear()
+	token_cache[line] = tuple(tokens)
+	return tokens
+
+def scan(line):
+
+	"""
+	desc:
+		Splits a line that contains quotes or backslashes into tokens, without
+		caching. See `split()`.
+
+	arguments:
+		line:
+			desc:	A line of script.
+			type:	unicode
+
+	returns:
+		desc:	A list of tokens.
+		type:	list
+	"""
+
+	tokens = []
+	token = None
+	for m in piece.finditer(line):
+		kind = m.lastgroup
+		if kind == u'space':
+			if token is not None:
+				tokens.append(token)
+				token = None
+			continue
+		if kind == u'error':
+			# A line that ends with an escape character, also in an unclosed
+			# double quotation, is reported as such by shlex
+			rest = line[m.end():]
+			if m.group(kind) == u'\\' or (m.group(kind) == u'"' and \
+				(len(rest) - len(rest.rstrip(u'\\'))) % 2 == 1):
+				raise ValueError(u'No escaped character')
+			raise ValueError(u'No closing quotation')
+		s = m.group(kind)
+		if kind == u'double' and u'\\' in s:
+			s = double_escape.sub(u'\\1', s)
+		if token is None:
+			token = s
+		else:
+			token += s
+	if token is not None:
+		tokens.append(token)
+	return tokens
@@ -33,6 +33,8 @@ class sequence(item.item):
 
 		self.items = []
 		self.flush_keyboard = u'yes'
+		self._plan = []
+		self._plan_key = None
 
 	def run(self):
 
@@ -42,9 +44,9 @@ class sequence(item.item):
 		# Optionally flush the responses to catch escape presses
 		if self._keyboard != None:
 			self._keyboard.flush()
-		for item, cond in self._items:
-			if eval(cond):
-				self.experiment.items[item].run()
+		for _item, cond in self._plan:
+			if cond is None or eval(cond):
+				_item.run()
 
 	def parse_run(self, i):
 
@@ -95,14 +97,33 @@ class sequence(item.item):
 			self._keyboard = openexp.keyboard.keyboard(self.experiment)
 		else:
 			self._keyboard = None
-		self._items = []
+		if self._plan_key != (self.experiment.items.generation, self.items):
+			self.compile_plan()
+		for _item, cond in self._plan:
+			_item.prepare()
+
+	def compile_plan(self):
+
+		"""
+		Resolves the items and compiles the conditional statements of the
+		sequence into an execution plan, i.e. a list of (item, bytecode)
+		tuples, where the bytecode is None for items that are always run. The
+		plan is compiled again only when the sequence or the experiment's items
+		change.
+		"""
+
+		self._plan = []
 		for _item, cond in self.items:
 			if _item not in self.experiment.items:
 				raise osexception( \
 					u"Could not find item '%s', which is called by sequence item '%s'" \
 					% (_item, self.name))
-			self.experiment.items[_item].prepare()
-			self._items.append( (_item, self.compile_cond(cond)) )
+			if self.compile_cond(cond, bytecode=False) == u'True':
+				bytecode = None
+			else:
+				bytecode = self.compile_cond(cond)
+			self._plan.append( (self.experiment.items[_item], bytecode) )
+		self._plan_key = self.experiment.items.generation, self.items[:]
 
 	def to_string(self):
 
@@ -113,7 +134,7 @@ class sequence(item.item):
 		A definition string.
 		"""
 
-		s = item.item.to_string(self, self.item_type)
+		l = [item.item.to_string(self, self.item_type)]
 		for _item, cond in self.items:
-			s += u'\trun %s "%s"\n' % (_item, cond)
-		return s
+			l.append(u'\trun %s "%s"\n' % (_item, cond))
+		return u''.join(l)
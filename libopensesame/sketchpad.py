@@ -126,10 +126,10 @@ class sketchpad(item, generic_response):
 			A string representation.
 		"""
 
-		s = super(sketchpad, self).to_string()
+		l = [super(sketchpad, self).to_string()]
 		for element in self.elements:
-			s += u'\t%s\n' % element.to_string()
-		return s
+			l.append(u'\t%s\n' % element.to_string())
+		return u''.join(l)
 
 	def var_info(self):
 
@@ -0,0 +1,236 @@
+#-*- coding:utf-8 -*-
+
+"""
+This file is part of OpenSesame.
+
+OpenSesame is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+OpenSesame is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with OpenSesame.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import sys
+import threading
+from collections import OrderedDict
+from libopensesame import debug
+
+class stimulus_cache(object):
+
+	"""
+	desc: |
+		A least-recently-used (LRU) cache for generated stimuli, such as Gabor
+		and noise patches. The total size of the cached stimuli is kept below
+		a memory budget; when the budget is exceeded, the stimuli that have
+		not been used for the longest time are evicted.
+
+		The cache that is used by the canvas back-ends is available as
+		`exp.stimulus_cache`. Its budget is set by the `stimulus_cache_mb`
+		experimental variable (default: 256) when the experiment starts.
+
+		__Example:__
+
+		~~~ {.python}
+		# Pre-warm the cache with all Gabor patches for the next block
+		from openexp.canvas import canvas
+		my_canvas = canvas(exp)
+		for orient in range(0, 180, 15):
+			my_canvas.gabor(0, 0, orient, .05)
+		print('%d hits, %d misses, %d evictions' % (exp.stimulus_cache.hits,
+			exp.stimulus_cache.misses, exp.stimulus_cache.evictions))
+		# And clear it again afterwards
+		exp.stimulus_cache.clear()
+		~~~
+	"""
+
+	def __init__(self, max_bytes=256*1024**2):
+
+		"""
+		desc:
+			Constructor.
+
+		keywords:
+			max_bytes:
+				desc:	The memory budget in bytes. A budget of 0 disables
+						caching.
+				type:	int
+		"""
+
+		self._cache = OrderedDict()
+		self._lock = threading.RLock()
+		self.max_bytes = max_bytes
+		self.nbytes = 0
+		self.reset_stats()
+
+	def reset_stats(self):
+
+		"""
+		desc:
+			Resets the hit, miss, and eviction counters.
+		"""
+
+		self.hits = 0
+		self.misses = 0
+		self.evictions = 0
+
+	def get(self, key, default=None):
+
+		"""
+		desc:
+			Retrieves a stimulus from the cache, and marks it as recently used.
+
+		arguments:
+			key:
+				desc:	A hashable key, typically a tuple of the parameters
+						that were used to generate the stimulus.
+
+		keywords:
+			default:
+				desc:	The value that is returned on a cache miss.
+
+		returns:
+			desc:	The cached stimulus, or `default` if `key` is not cached.
+		"""
+
+		with self._lock:
+			try:
+				value, size = self._cache.pop(key)
+			except KeyError:
+				self.misses += 1
+				return default
+			self._cache[key] = value, size
+			self.hits += 1
+			return value
+
+	def put(self, key, value, size=None):
+
+		"""
+		desc:
+			Adds a stimulus to the cache, evicting least-recently-used stimuli
+			if this is necessary to stay within the memory budget. Stimuli that
+			are larger than the entire budget are not cached.
+
+		arguments:
+			key:
+				desc:	A hashable key.
+			value:
+				desc:	The stimulus.
+
+		keywords:
+			size:
+				desc:	The size of the stimulus in bytes, or None to estimate
+						the size.
+				type:	[int, NoneType]
+		"""
+
+		if size is None:
+			size = sizeof(value)
+		with self._lock:
+			self.discard(key)
+			if size > self.max_bytes:
+				return
+			self._cache[key] = value, size
+			self.nbytes += size
+			self._evict()
+
+	def discard(self, key):
+
+		"""
+		desc:
+			Removes a stimulus from the cache, if it is cached.
+
+		arguments:
+			key:
+				desc:	A hashable key.
+		"""
+
+		with self._lock:
+			if key in self._cache:
+				value, size = self._cache.pop(key)
+				self.nbytes -= size
+
+	def clear(self):
+
+		"""
+		desc:
+			Removes all stimuli from the cache. The counters are not reset.
+		"""
+
+		with self._lock:
+			self._cache.clear()
+			self.nbytes = 0
+
+	def resize(self, max_bytes):
+
+		"""
+		desc:
+			Changes the memory budget, evicting stimuli if necessary.
+
+		arguments:
+			max_bytes:
+				desc:	The memory budget in bytes. A budget of 0 disables
+						caching.
+				type:	int
+		"""
+
+		with self._lock:
+			self.max_bytes = max_bytes
+			self._evict()
+		debug.msg(u'stimulus cache budget is %d bytes' % max_bytes)
+
+	def _evict(self):
+
+		"""
+		desc:
+			Evicts least-recently-used stimuli until the cache is within the
+			memory budget.
+		"""
+
+		while self.nbytes > self.max_bytes and len(self._cache) > 0:
+			key, (value, size) = self._cache.popitem(last=False)
+			self.nbytes -= size
+			self.evictions += 1
+
+	def __contains__(self, key):
+
+		return key in self._cache
+
+	def __len__(self):
+
+		return len(self._cache)
+
+def sizeof(value):
+
+	"""
+	desc:
+		Estimates the memory footprint of a stimulus.
+
+	arguments:
+		value:
+			desc:	A stimulus, such as a PyGame surface or a NumPy array.
+
+	returns:
+		desc:	The estimated size in bytes.
+		type:	int
+	"""
+
+	# PyGame surfaces
+	if hasattr(value, u'get_pitch') and hasattr(value, u'get_height'):
+		return value.get_pitch() * value.get_height()
+	# NumPy arrays
+	if hasattr(value, u'nbytes'):
+		return value.nbytes
+	return sys.getsizeof(value)
+
+# The cache of generated stimuli that is shared by all back-ends, and exposed
+# to the experiment as exp.stimulus_cache. It is kept in this module, rather
+# than in openexp._canvas.canvas, so that creating an experiment doesn't
+# require PyGame.
+shared_cache = stimulus_cache()
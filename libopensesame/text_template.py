@@ -0,0 +1,109 @@
+#-*- coding:utf-8 -*-
+
+"""
+This file is part of OpenSesame.
+
+OpenSesame is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+OpenSesame is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with OpenSesame.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from libopensesame import regexp
+
+# The maximum number of templates that are cached. When this number is
+# exceeded, the cache is cleared, like the cache of the re module.
+max_cache = 10000
+# Compiled templates with the source text as key
+template_cache = {}
+
+class text_template(object):
+
+	"""
+	desc:
+		A string of text that has been parsed into literal text and variable
+		references (e.g., '[var]'), so that it can be evaluated without
+		searching the text for references again.
+	"""
+
+	def __init__(self, text):
+
+		"""
+		desc:
+			Constructor.
+
+		arguments:
+			text:
+				desc:	The source text.
+				type:	unicode
+		"""
+
+		self.text = text
+		# Segments alternate between literal text (even indices) and variable
+		# names (odd indices).
+		self.segments = regexp.split_variable.split(text)
+		self.refs = tuple(self.segments[1::2])
+		# The variables that the template depends on, without duplicates
+		self.dependencies = frozenset(self.refs)
+
+	def render(self, values):
+
+		"""
+		desc:
+			Substitutes values for the variable references.
+
+		arguments:
+			values:
+				desc:	A dict with variable names as keys and unicode values
+						as values. References to variables that are not in
+						the dict are kept as they are.
+				type:	dict
+
+		returns:
+			desc:	The text with variable references replaced.
+			type:	unicode
+		"""
+
+		segments = self.segments[:]
+		for i in range(1, len(segments), 2):
+			var = segments[i]
+			if var in values:
+				segments[i] = values[var]
+			else:
+				segments[i] = u'[%s]' % var
+		return u''.join(segments)
+
+def get(text):
+
+	"""
+	desc:
+		Returns a compiled template for a string of text. Templates are
+		cached, so that each unique string is parsed only once.
+
+	arguments:
+		text:
+			desc:	The source text.
+			type:	unicode
+
+	returns:
+		desc:	A compiled template.
+		type:	text_template
+	"""
+
+	try:
+		return template_cache[text]
+	except KeyError:
+		pass
+	if len(template_cache) >= max_cache:
+		template_cache.clear()
+	template = text_template(text)
+	template_cache[text] = template
+	return template
@@ -0,0 +1,152 @@
+#-*- coding:utf-8 -*-
+
+"""
+This file is part of OpenSesame.
+
+OpenSesame is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+OpenSesame is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with OpenSesame.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+class var_registry(object):
+
+	"""
+	desc: |
+		An index of all variables that are known to the experiment, i.e. the
+		variables that items declare through `var_info()` (such as loop
+		columns and response variables) and the variables that have been set
+		with `set()`.
+
+		Declared variables are cached per item. Items mark themselves as
+		changed by calling `touch()`, which is done automatically by
+		`item.set()`, `item.unset()`, and when an item is parsed. Only changed
+		items are queried again, so that listing all variables, as done by the
+		logger and the variable inspector, does not require walking through
+		all items every time. Adding, replacing, and removing items is
+		detected through the generation of the item store.
+	"""
+
+	def __init__(self, experiment):
+
+		"""
+		desc:
+			Constructor.
+
+		arguments:
+			experiment:
+				desc:	The experiment object.
+				type:	experiment
+		"""
+
+		self.experiment = experiment
+		self._declared = {}
+		self._dirty = set()
+		self._names = None
+		self._name_set = None
+		self._generation = None
+
+	def touch(self, item):
+
+		"""
+		desc:
+			Indicates that the variables of an item may have changed.
+
+		arguments:
+			item:
+				desc:	The item, which can also be the experiment.
+				type:	item
+		"""
+
+		self._dirty.add(item)
+		self._names = None
+
+	def _items(self):
+
+		"""
+		desc:
+			Gives all items, and the experiment, and updates the cached
+			declarations of items that have changed.
+
+		returns:
+			desc:	A list of (item name, item) tuples, starting with
+					(u'global', experiment).
+			type:	list
+		"""
+
+		items = [(u'global', self.experiment)] + \
+			list(self.experiment.items.items())
+		for item_name, item in items:
+			if item in self._dirty or item not in self._declared:
+				self._declared[item] = item.var_info()
+		# Forget about items that have been deleted
+		if len(self._declared) > len(items):
+			current = set(item for item_name, item in items)
+			for item in list(self._declared.keys()):
+				if item not in current:
+					del self._declared[item]
+		self._dirty.clear()
+		return items
+
+	def var_list(self, filt=u''):
+
+		"""
+		desc:
+			Lists all variables. If a variable is known to multiple items, it
+			is listed only once.
+
+		keywords:
+			filt:
+				desc:	A search string to filter by, which should match
+						(part of) the variable name, value, or item name.
+				type:	unicode
+
+		returns:
+			desc:	A list of (variable name, value, item name) tuples.
+			type:	list
+		"""
+
+		l = []
+		seen = set()
+		for item_name, item in self._items():
+			for var, val in self._declared[item] + item.variables.items():
+				if var in seen:
+					continue
+				if filt == u'' or filt in var.lower() or filt in \
+					self.experiment.unistr(val).lower() or filt in \
+					item_name.lower():
+					l.append( (var, val, item_name) )
+					seen.add(var)
+		return l
+
+	def names(self):
+
+		"""
+		desc:
+			Lists the names of all variables. The list is cached until an item
+			changes, or until items are added, replaced, or removed.
+
+		returns:
+			desc:	A list of variable names.
+			type:	list
+		"""
+
+		if self._names is None or \
+			self._generation != self.experiment.items.generation:
+			self._names = [var for var, val, item_name in self.var_list()]
+			self._name_set = set(self._names)
+			self._generation = self.experiment.items.generation
+		return self._names
+
+	def __contains__(self, var):
+
+		self.names()
+		return var in self._name_set
@@ -171,6 +171,7 @@ class checkbox(button):
 		
 		self.checked = checked
 		self.set_var(checked)
+		self.set_dirty()
 				
 	def set_var(self, val, var=None):
 	
@@ -116,6 +116,9 @@ class form(object):
 		self.canvas = canvas(self.experiment, auto_prepare=False, fgcolor= \
 			self.item.get(u'foreground'), bgcolor=self.item.get( \
 			u'background'))
+		# The widgets that need to be drawn again, or None if the entire form
+		# needs to be drawn again
+		self._dirty = None
 
 		if theme == u'gray':
 			from themes.gray import gray
@@ -146,13 +149,15 @@ class form(object):
 
 		i = 0
 		self.mouse = mouse(self.experiment)
+		# Something else may have been shown since the form was last rendered
+		self.set_dirty()
 		if focus_widget != None:
-			self.render()
+			self.render(dirty_only=True)
 			resp = focus_widget.on_mouse_click(None)
 			if resp != None:
 				return
 		while True:
-			self.render()
+			self.render(dirty_only=True)
 			button, xy, time = self.mouse.get_click(visible=True)
 			pos = self.xy_to_index(xy)
 			if pos != None:
@@ -260,19 +265,71 @@ class form(object):
 				u'There is not enough space to show some form widgets. Please modify the form geometry!')
 		return x1+self.margins[3], y1+self.margins[0], w, h
 
-	def render(self):
+	def render(self, dirty_only=False):
 
 		"""
 		desc:
 			Draws the form and all the widgets in it.
+
+		keywords:
+			dirty_only:
+				desc:	If True, only the widgets that have been marked as
+						dirty (see `set_dirty()`) since the form was last drawn
+						are drawn again, and only their part of the display is
+						updated. This is used while the form is executed, when
+						all changes go through the widgets themselves. If
+						False, the entire form is drawn again, so that changes
+						to widget attributes, e.g. from an inline_script, are
+						always shown. Back-ends that do not support partial
+						updates always draw the entire form when something has
+						changed.
+				type:	bool
 		"""
 
 		self.validate_geometry()
-		self.canvas.clear()
-		for widget in self.widgets:
-			if widget != None:
-				widget.render()
-		self.canvas.show()
+		if dirty_only and self._dirty is not None and len(self._dirty) == 0:
+			return
+		if not dirty_only or self._dirty is None or \
+			not self.canvas.supports_partial_update:
+			self.canvas.clear()
+			for widget in self.widgets:
+				if widget != None:
+					widget.render()
+			self._dirty = set()
+			self.canvas.show()
+			return
+		# Clear and redraw the dirty widgets, including the spacing around
+		# them, which may contain part of their frame.
+		rects = []
+		pad = self.spacing / 2
+		for widget in self._dirty:
+			x, y, w, h = widget.rect
+			rect = x-pad, y-pad, w+2*pad, h+2*pad
+			self.canvas.rect(rect[0], rect[1], rect[2], rect[3], fill=True,
+				color=self.canvas.bgcolor)
+			widget.render()
+			rects.append(rect)
+		self._dirty = set()
+		self.canvas._show_rects(rects)
+
+	def set_dirty(self, widget=None):
+
+		"""
+		desc:
+			Indicates that a widget needs to be drawn again the next time that
+			the form is rendered. Widgets call this function when their state
+			changes.
+
+		keywords:
+			widget:
+				desc:	A widget, or None to draw the entire form again.
+				type:	[widget, NoneType]
+		"""
+
+		if widget is None or widget.rect is None:
+			self._dirty = None
+		elif self._dirty is not None:
+			self._dirty.add(widget)
 
 	def set_widget(self, widget, pos, colspan=1, rowspan=1):
 
@@ -313,6 +370,7 @@ class form(object):
 		self.widgets[index] = widget
 		self.span[index] = colspan, rowspan
 		widget.set_rect(self.get_rect(index))
+		self.set_dirty()
 
 	def xy_to_index(self, xy):
 
@@ -129,6 +129,7 @@ class image(widget):
 		"""
 
 		self.rect = rect
+		self.form.set_dirty()
 		if self.adjust:
 			x, y, w, h = self.rect
 			try:
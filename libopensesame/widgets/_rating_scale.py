@@ -153,7 +153,10 @@ class rating_scale(widget):
 
 		x, y, w, h = self.rect
 		cx = x+w/2
-		cy = y+h/2		
+		cy = y+h/2
+		# The positions of the nodes are determined again every time that the
+		# widget is drawn
+		self.pos_list = []
 		_h = self.form.theme_engine.box_size()		
 		if self.orientation == u'horizontal':
 			# Some ugly maths, but basically it evenly spaces the checkboxes and
@@ -206,3 +209,4 @@ class rating_scale(widget):
 				% val)
 		self.value = val
 		self.set_var(val)
+		self.set_dirty()
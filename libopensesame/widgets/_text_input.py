@@ -141,7 +141,8 @@ class text_input(label):
 		my_keyboard = keyboard(self.form.experiment)
 		my_keyboard.show_virtual_keyboard(True)
 		while True:
-			self.form.render()
+			self.set_dirty()
+			self.form.render(dirty_only=True)
 			resp, time = my_keyboard.get_key()
 			try:
 				o = ord(resp)
@@ -160,6 +161,7 @@ class text_input(label):
 							self.text[self.caret_pos+1:]
 			elif resp == u'tab':
 				self.focus = False
+				self.set_dirty()
 				my_keyboard.show_virtual_keyboard(False)
 				return None
 			elif resp == u'return' or resp == u'enter':
@@ -168,6 +170,7 @@ class text_input(label):
 					return self.text
 				else:
 					self.focus = False
+					self.set_dirty()
 					my_keyboard.show_virtual_keyboard(False)
 					return None
 			elif resp == u'left':
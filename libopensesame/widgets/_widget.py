@@ -96,6 +96,17 @@ class widget(object):
 		else:
 			self.draw_frame(self.rect)
 
+	def set_dirty(self):
+
+		"""
+		desc:
+			Indicates that the widget has changed, so that it is drawn again
+			the next time that the form is rendered. Custom widgets should call
+			this function whenever their appearance changes.
+		"""
+
+		self.form.set_dirty(self)
+
 	def set_rect(self, rect):
 
 		"""
@@ -109,6 +120,8 @@ class widget(object):
 		"""
 
 		self.rect = rect
+		# The widget may now overlap with the area of other widgets
+		self.form.set_dirty()
 
 	def set_var(self, val, var=None):
 
@@ -466,6 +466,8 @@ class loop(qtstructure_item, qtitem, loop_runtime):
 		self.auto_add_widget(self.loop_widget.ui.spin_skip, u"skip")
 		self.auto_add_widget(self.loop_widget.ui.combobox_order, u"order")
 		self.auto_add_widget(self.loop_widget.ui.checkbox_offset, u"offset")
+		self.auto_add_widget(self.loop_widget.ui.checkbox_prepare_ahead,
+			u"prepare_ahead")
 		self.auto_add_widget(self.loop_widget.ui.combobox_item, u"item")
 		self.auto_add_widget(self.loop_widget.ui.edit_break_if, u"break_if")
 		self.loop_widget.ui.edit_break_if.setValidator(cond_validator(self,
@@ -508,6 +510,7 @@ class loop(qtstructure_item, qtitem, loop_runtime):
 		break_if = self.get(u'break_if', _eval=False)
 		if break_if not in [u'never', u''] or \
 			self.get(u'offset', _eval=False) == u'yes' or \
+			self.get(u'prepare_ahead', _eval=False) == u'yes' or \
 			self.get(u'skip', _eval=False) != 0:
 			self.loop_widget.ui.checkbox_advanced.setChecked(True)
 			self.loop_widget.ui.widget_advanced.show()
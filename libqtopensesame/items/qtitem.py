@@ -329,6 +329,8 @@ class qtitem(QtCore.QObject):
 		# Normally, the script starts with a 'define' line and is indented by
 		# a tab. We want to undo this, and present only unindented content.
 		import textwrap
+		# The variables that the item declares may have changed
+		self.experiment.var_registry.touch(self)
 		script = self.to_string()
 		script = script[script.find(u'\t'):]
 		script = textwrap.dedent(script)
@@ -67,6 +67,7 @@ class qtitem_store(item_store):
 				type:	[str, unicode]
 		"""
 
+		self.generation += 1
 		del self.__items__[name]
 		for _name in self:
 			self[_name].remove_child_item(name, index=-1)
@@ -128,6 +129,7 @@ class qtitem_store(item_store):
 			self.experiment.notify(_(u'An item name cannot be empty.'))
 			return None
 		# Copy the item in the __items__dictionary
+		self.generation += 1
 		self.__items__[to_name] = self.__items__[from_name]
 		del self.__items__[from_name]
 		# Give all items a chance to update
@@ -114,7 +114,7 @@ class qtopensesame(QtGui.QMainWindow, base_component):
 
 		# Set the filter-string for opening and saving files
 		self.file_type_filter = \
-			u"OpenSesame files (*.opensesame.tar.gz *.opensesame);;OpenSesame script and file pool (*.opensesame.tar.gz);;OpenSesame script (*.opensesame)"
+			u"OpenSesame files (*.opensesame.tar.gz *.opensesame.zip *.opensesame);;OpenSesame script and file pool (*.opensesame.tar.gz);;OpenSesame script and uncompressed file pool (*.opensesame.zip);;OpenSesame script (*.opensesame)"
 		self.file_type_filter_script = u"OpenSesame script (*.opensesame)"
 		self.file_type_filter_pool = \
 			u"OpenSesame script and file pool (*.opensesame.tar.gz)"
@@ -663,7 +663,8 @@ class qtopensesame(QtGui.QMainWindow, base_component):
 				filter=self.file_type_filter, directory=cfg.file_dialog_path))
 		if path == None or path == u'' or (not path.lower().endswith(
 			u'.opensesame') and not path.lower().endswith(
-			u'.opensesame.tar.gz')):
+			u'.opensesame.tar.gz') and not path.lower().endswith(
+			u'.opensesame.zip')):
 			return
 		self.set_status(u"Opening ...", status=u'busy')
 		self.ui.tabwidget.close_all()
@@ -771,12 +772,15 @@ class qtopensesame(QtGui.QMainWindow, base_component):
 			# on the selected filter and, if no filter has been set, based on
 			# whether there is content in the file pool
 			if path[-18:].lower() != u".opensesame.tar.gz" and \
+				path[-15:].lower() != u".opensesame.zip" and \
 				path[-11:].lower() != u".opensesame":
 				debug.msg(u"automagically determing file type")
 				if u"(*.opensesame)" in file_type:
 					path += u".opensesame"
 				elif u"(*.opensesame.tar.gz)" in file_type:
 					path += u".opensesame.tar.gz"
+				elif u"(*.opensesame.zip)" in file_type:
+					path += u".opensesame.zip"
 				else:
 					path += default_extension
 				debug.msg(path)
@@ -787,6 +791,8 @@ class qtopensesame(QtGui.QMainWindow, base_component):
 			path = path.replace(u'.opensesame.tar.opensesame', u'.opensesame')
 			path = path.replace(u'.opensesame.tar.gz.opensesame',
 				u'.opensesame')
+			path = path.replace(u'.opensesame.zip.opensesame',
+				u'.opensesame')
 			# Warn if we are saving in .opensesame format and there are files
 			# in the file pool.
 			if len(os.listdir(self.experiment.pool_folder)) > 0 \
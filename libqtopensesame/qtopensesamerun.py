@@ -59,7 +59,7 @@ class qtopensesamerun(QtGui.QMainWindow, base_component):
 		"""Locates the experiment file."""
 		
 		file_type_filter = \
-			u"OpenSesame files (*.opensesame.tar.gz *.opensesame);;OpenSesame script and file pool (*.opensesame.tar.gz);;OpenSesame script (*.opensesame)"
+			u"OpenSesame files (*.opensesame.tar.gz *.opensesame.zip *.opensesame);;OpenSesame script and file pool (*.opensesame.tar.gz);;OpenSesame script and uncompressed file pool (*.opensesame.zip);;OpenSesame script (*.opensesame)"
 		path = QtGui.QFileDialog.getOpenFileName(self, \
 			u"Open experiment file", filter = file_type_filter)
 		if path == u"":
@@ -20,7 +20,17 @@ along with openexp.  If not, see <http://www.gnu.org/licenses/>.
 import random
 import pygame
 import math
+import os
 from libopensesame.exceptions import osexception
+from libopensesame import debug, misc
+from libopensesame.stimulus_cache import shared_cache
+# NumPy is used to generate Gabor and noise patches. If it is not available,
+# such as on Android, we fall back to drawing patches pixel by pixel.
+try:
+	import numpy
+	import pygame.surfarray
+except:
+	numpy = None
 
 # If available, use the yaml.inherit metaclass to copy the docstrings from
 # canvas onto the back-end-specific implementations of this class (legacy, etc.)
@@ -99,6 +109,12 @@ class canvas(object):
 
 	__metaclass__ = docinherit
 
+	# Indicates whether part of the canvas can be drawn again on top of the
+	# existing contents, and shown with `_show_rects()`. Back-ends that keep a
+	# list of stimuli, which is only reset by `clear()`, should leave this
+	# False, because otherwise the list would keep growing.
+	supports_partial_update = False
+
 	def __init__(self, experiment, bgcolor=None, fgcolor=None,
 		auto_prepare=True):
 
@@ -294,6 +310,28 @@ class canvas(object):
 
 		raise NotImplementedError()
 
+	def _show_rects(self, rects):
+
+		"""
+		visible: False
+
+		desc:
+			Shows the canvas, but only updates the parts of the display that
+			have changed since the canvas was last shown. Back-ends that cannot
+			update part of the display show the entire canvas.
+
+		arguments:
+			rects:
+				desc:	A list of (x, y, w, h) tuples.
+				type:	list
+
+		returns:
+			desc:	A timestamp.
+			type:	[int, float]
+		"""
+
+		return self.show()
+
 	def clear(self, color=None):
 
 		"""
@@ -1135,7 +1173,9 @@ env_synonyms[u"lin"] = u"l"
 env_synonyms[u"ln"] = u"l"
 env_synonyms[u"l"] = u"l"
 
-canvas_cache = {}
+# The cache of generated stimuli is shared by all back-ends (see
+# libopensesame.stimulus_cache)
+canvas_cache = shared_cache
 
 def _gabor(orient, freq, env=u"gaussian", size=96, stdev=12, phase=0,
 	col1=u"white", col2=u"black", bgmode=u"avg"):
@@ -1150,21 +1190,181 @@ def _gabor(orient, freq, env=u"gaussian", size=96, stdev=12, phase=0,
 	# Generating a Gabor patch takes quite some time, so keep
 	# a cache of previously generated Gabor patches to speed up
 	# the process.
-	global canvas_cache
-	key = u"gabor_%s_%s_%s_%s_%s_%s_%s_%s_%s" % (orient, freq, env, size,
-		stdev, phase, col1, col2, bgmode)
-	if key in canvas_cache:
-		return canvas_cache[key]
+	col1 = _color(col1)
+	col2 = _color(col2)
+	key = u"gabor", orient, freq, env, size, stdev, phase, tuple(col1), \
+		tuple(col2), bgmode
+	surface = canvas_cache.get(key)
+	if surface is not None:
+		return surface
 	# Create a surface
-	surface = pygame.Surface( (size, size) )
-	try:
-		px = pygame.PixelArray(surface)
-	except:
-		px = None
+	surface = pygame.Surface( (size, size), 0, 32)
 	# Conver the orientation to radians
 	orient = math.radians(orient)
+	if numpy is None:
+		_gabor_pixels(surface, orient, freq, env, size, stdev, phase, col1,
+			col2, bgmode)
+	else:
+		dx, dy = _grid(size)
+		# Get the coordinates (ux, uy) in the unrotated Gabor patch
+		ux = dx * math.cos(orient) - dy * math.sin(orient)
+		uy = dx * math.sin(orient) + dy * math.cos(orient)
+		# Get the amplitude without the envelope (0 .. 1)
+		amp = 0.5 + 0.5 * numpy.cos(2.0 * math.pi * (ux * freq + phase))
+		f = _envelope_array(env, size, stdev, ux, uy, numpy.hypot(dx, dy))
+		_blit_amp(surface, amp, f, col1, col2, bgmode)
+	canvas_cache.put(key, surface)
+	return surface
+
+def _noise_patch(env=u"gaussian", size=96, stdev=12, col1=u"white",
+	col2=u"black", bgmode=u"avg"):
+
+	"""
+	desc:
+		Returns a pygame surface containing a noise patch. For arguments,
+		see [canvas.noise_patch]. The noise is drawn with NumPy (if
+		available), from a generator that is seeded by the standard `random`
+		module. Therefore, `random.seed()` makes noise patches reproducible,
+		although the noise differs from that of the pixel-by-pixel fallback.
+	"""
+
+	env = _match_env(env)
+	# Generating a noise patch takes quite some time, so keep
+	# a cache of previously generated noise patches to speed up
+	# the process.
 	col1 = _color(col1)
 	col2 = _color(col2)
+	key = u"noise", env, size, stdev, tuple(col1), tuple(col2), bgmode
+	surface = canvas_cache.get(key)
+	if surface is not None:
+		return surface
+	# Create a surface
+	surface = pygame.Surface( (size, size), 0, 32)
+	if numpy is None:
+		_noise_patch_pixels(surface, env, size, stdev, col1, col2, bgmode)
+	else:
+		ux, uy = _grid(size)
+		# Get the amplitude without the envelope (0 .. 1)
+		amp = numpy.random.RandomState(random.getrandbits(32)).random_sample(
+			(size, size))
+		f = _envelope_array(env, size, stdev, ux, uy, numpy.hypot(ux, uy))
+		_blit_amp(surface, amp, f, col1, col2, bgmode)
+	canvas_cache.put(key, surface)
+	return surface
+
+def _grid(size):
+
+	"""
+	desc:
+		Creates coordinate arrays, relative to the center of a square patch.
+		The arrays are indexed as [x, y], which is how `pygame.surfarray`
+		indexes pixels.
+
+	arguments:
+		size:
+			desc:	The size of the patch.
+			type:	int
+
+	returns:
+		desc:	A (dx, dy) tuple of float arrays.
+		type:	tuple
+	"""
+
+	a = numpy.arange(size, dtype=float) - 0.5 * size
+	return numpy.meshgrid(a, a, indexing=u'ij')
+
+def _envelope_array(env, size, stdev, ux, uy, r):
+
+	"""
+	desc:
+		Computes the envelope of a patch as an array.
+
+	arguments:
+		env:
+			desc:	A standard envelope name, as returned by `_match_env()`.
+			type:	unicode
+		size:
+			desc:	The size of the patch.
+			type:	int
+		stdev:
+			desc:	The standard deviation of a Gaussian envelope.
+			type:	[int, float]
+		ux:
+			desc:	An array of (unrotated) x coordinates.
+			type:	ndarray
+		uy:
+			desc:	An array of (unrotated) y coordinates.
+			type:	ndarray
+		r:
+			desc:	An array of distances from the center.
+			type:	ndarray
+
+	returns:
+		desc:	An array of envelope values (0 .. 1), or a float if the
+				envelope is flat.
+		type:	[ndarray, float]
+	"""
+
+	if env == u"g":
+		return numpy.exp(-0.5 * (ux / stdev) ** 2 - 0.5 * (uy / stdev) ** 2)
+	if env == u"l":
+		return numpy.maximum(0, (0.5 * size - r) / (0.5 * size))
+	if env == u"c":
+		return (r <= 0.5 * size).astype(float)
+	return 1.0
+
+def _blit_amp(surface, amp, f, col1, col2, bgmode):
+
+	"""
+	desc:
+		Applies an envelope to an amplitude array, blends the two colors, and
+		writes the result straight into a surface.
+
+	arguments:
+		surface:
+			desc:	The target surface.
+			type:	Surface
+		amp:
+			desc:	An array of amplitudes without the envelope (0 .. 1).
+			type:	ndarray
+		f:
+			desc:	The envelope, as returned by `_envelope_array()`.
+			type:	[ndarray, float]
+		col1:
+			desc:	The color of the tops.
+			type:	Color
+		col2:
+			desc:	The color of the troughs.
+			type:	Color
+		bgmode:
+			desc:	The background mode.
+			type:	[str, unicode]
+	"""
+
+	if bgmode == u"avg":
+		amp = amp * f + 0.5 * (1.0 - f)
+	else:
+		amp = amp * f
+	amp = amp[:, :, numpy.newaxis]
+	c1 = numpy.array([col1.r, col1.g, col1.b], dtype=float)
+	c2 = numpy.array([col2.r, col2.g, col2.b], dtype=float)
+	# Round half up, like the built-in round() does for positive values
+	rgb = numpy.floor(c1 * amp + c2 * (1.0 - amp) + 0.5)
+	pygame.surfarray.blit_array(surface, rgb.astype(numpy.uint8))
+
+def _gabor_pixels(surface, orient, freq, env, size, stdev, phase, col1, col2,
+	bgmode):
+
+	"""
+	desc:
+		Draws a Gabor patch pixel by pixel. This is the fallback for when
+		NumPy is not available. For arguments, see [canvas.gabor].
+	"""
+
+	try:
+		px = pygame.PixelArray(surface)
+	except:
+		px = None
 	# rx and ry reflect the real coordinates in the
 	# target image
 	for rx in range(size):
@@ -1204,35 +1404,20 @@ def _gabor(orient, freq, env=u"gaussian", size=96, stdev=12, phase=0,
 				surface.set_at((rx, ry), (round(r), round(g), round(b)))
 			else:
 				px[rx][ry] = round(r), round(g), round(b)
-	canvas_cache[key] = surface
 	del px
-	return surface
 
-def _noise_patch(env=u"gaussian", size=96, stdev=12, col1=u"white",
-	col2=u"black", bgmode=u"avg"):
+def _noise_patch_pixels(surface, env, size, stdev, col1, col2, bgmode):
 
 	"""
 	desc:
-		Returns a pygame surface containing a noise patch. For arguments,
-		see [canvas.noise_patch].
+		Draws a noise patch pixel by pixel. This is the fallback for when
+		NumPy is not available. For arguments, see [canvas.noise_patch].
 	"""
 
-	env = _match_env(env)
-	# Generating a noise patch takes quite some time, so keep
-	# a cache of previously generated noise patches to speed up
-	# the process.
-	global canvas_cache
-	key = u"noise_%s_%s_%s_%s_%s_%s" % (env, size, stdev, col1, col2, bgmode)
-	if key in canvas_cache:
-		return canvas_cache[key]
-	# Create a surface
-	surface = pygame.Surface( (size, size) )
 	try:
 		px = pygame.PixelArray(surface)
 	except:
 		px = None
-	col1 = _color(col1)
-	col2 = _color(col2)
 	# rx and ry reflect the real coordinates in the
 	# target image
 	for rx in range(size):
@@ -1267,8 +1452,59 @@ def _noise_patch(env=u"gaussian", size=96, stdev=12, col1=u"white",
 				surface.set_at((rx, ry), (round(r), round(g), round(b)))
 			else:
 				px[rx][ry] = round(r), round(g), round(b)
-	canvas_cache[key] = surface
 	del px
+
+def _image(fname, scale=None):
+
+	"""
+	desc:
+		Returns a pygame surface containing a decoded, and optionally scaled,
+		image. Decoded images are kept in the stimulus cache, keyed on the
+		path, the modification time, and the scaling factor, so that images
+		are decoded only once, even when a sketchpad is prepared many times.
+
+	arguments:
+		fname:
+			desc:	The full path to the image file.
+			type:	unicode
+
+	keywords:
+		scale:
+			desc:	A scaling factor, or None for no scaling.
+			type:	[int, float, NoneType]
+
+	returns:
+		desc:	A pygame surface.
+		type:	Surface
+	"""
+
+	# The filename is encoded to a str in the filesystem encoding
+	_fname = fname.encode(misc.filesystem_encoding())
+	try:
+		mtime = os.path.getmtime(_fname)
+	except:
+		mtime = None
+	key = u'image', fname, mtime, scale
+	surface = canvas_cache.get(key)
+	if surface is not None:
+		return surface
+	try:
+		surface = pygame.image.load(_fname)
+	except pygame.error as e:
+		raise osexception(
+			u"'%s' is not a supported image format" % fname)
+	if scale != None:
+		try:
+			surface = pygame.transform.smoothscale(surface,
+				(int(surface.get_width()*scale),
+				int(surface.get_height()*scale)))
+		except:
+			debug.msg(u"smooth scaling failed for '%s'" % fname,
+				reason=u"warning")
+			surface = pygame.transform.scale(surface,
+				(int(surface.get_width()*scale),
+				int(surface.get_height()*scale)))
+	canvas_cache.put(key, surface)
 	return surface
 
 def _match_env(env):
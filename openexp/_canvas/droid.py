@@ -19,7 +19,7 @@ along with openexp.  If not, see <http://www.gnu.org/licenses/>.
 
 from math import hypot
 import pygame
-from openexp._canvas.legacy import legacy
+from openexp._canvas.legacy import legacy, clear_font_cache
 from libopensesame.exceptions import osexception
 
 try:
@@ -51,6 +51,7 @@ def init_display(experiment):
 		pygame.init()
 	experiment.window = pygame.display.set_mode(resolution)	
 	experiment.surface = pygame.display.get_surface()	
+	clear_font_cache()
 	# Set the time functions to use pygame
 	experiment._time_func = pygame.time.get_ticks
 	experiment._sleep_func = pygame.time.delay
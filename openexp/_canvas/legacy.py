@@ -21,9 +21,18 @@ import pygame
 from pygame.locals import *
 import os
 from libopensesame.exceptions import osexception
-from libopensesame import debug, html, misc
+from libopensesame import debug, html
 from openexp._canvas import canvas
 
+# Fonts are shared by all canvases, with (style, size, bold, italic, underline)
+# tuples as keys. The cache is emptied when the display is initialized, because
+# font files are found through the file pool of the experiment.
+font_cache = {}
+# The sizes of text runs, with (font key, text) tuples as keys. When the
+# maximum number of sizes is exceeded, the cache is cleared.
+max_text_size_cache = 10000
+text_size_cache = {}
+
 class legacy(canvas.canvas):
 
 	"""
@@ -95,18 +104,9 @@ class legacy(canvas.canvas):
 		"""
 
 		if self._current_font == None:
-			# First see if the font refers to a file in the resources/ filepool
-			try:
-				font_path = self.experiment.resource(u'%s.ttf' % \
-					self.font_style)
-				self._current_font = pygame.font.Font(font_path, self.font_size)
-			# If not, try to match a system font
-			except:
-				self._current_font = pygame.font.SysFont(self.font_style, \
-					self.font_size)
-			self._current_font.set_bold(self.font_bold)
-			self._current_font.set_italic(self.font_italic)
-			self._current_font.set_underline(self.font_underline)
+			self._font_key = self.font_style, self.font_size, \
+				self.font_bold, self.font_italic, self.font_underline
+			self._current_font = _font(self.experiment, self._font_key)
 		return self._current_font
 
 	def copy(self, canvas):
@@ -125,6 +125,24 @@ class legacy(canvas.canvas):
 		pygame.display.flip()
 		return pygame.time.get_ticks()
 
+	@property
+	def supports_partial_update(self):
+
+		# With double buffering, _show_rects() shows the entire canvas anyway.
+		return not self.experiment.surface.get_flags() & pygame.DOUBLEBUF
+
+	def _show_rects(self, rects):
+
+		# With double buffering, the back buffer does not contain the
+		# previous frame, so the entire display needs to be updated.
+		if self.experiment.surface.get_flags() & pygame.DOUBLEBUF:
+			return self.show()
+		rects = [pygame.Rect(rect) for rect in rects]
+		for rect in rects:
+			self.experiment.surface.blit(self.surface, rect, rect)
+		self.experiment.last_shown_canvas = self.surface
+		pygame.display.update(rects)
+		return pygame.time.get_ticks()
 
 	def clear(self, color=None):
 
@@ -205,37 +223,33 @@ class legacy(canvas.canvas):
 
 	def _text(self, text, x, y):
 
+		# Rendered text runs are kept in the stimulus cache
 		font = self._font()
-		surface = font.render(text, self.antialias, self.fgcolor)
+		key = u'text', text, self._font_key, tuple(self.fgcolor), \
+			self.antialias
+		surface = canvas.canvas_cache.get(key)
+		if surface is None:
+			surface = font.render(text, self.antialias, self.fgcolor)
+			canvas.canvas_cache.put(key, surface)
 		self.surface.blit(surface, (x, y))
 
 	def _text_size(self, text):
 
-		return self._font().size(text)
+		font = self._font()
+		key = self._font_key, text
+		try:
+			return text_size_cache[key]
+		except KeyError:
+			pass
+		if len(text_size_cache) >= max_text_size_cache:
+			text_size_cache.clear()
+		size = font.size(text)
+		text_size_cache[key] = size
+		return size
 
 	def image(self, fname, center=True, x=None, y=None, scale=None):
 
-		# If the filename is a str, we first decode it to unicode
-		if isinstance(fname, str):
-			_fname = fname.decode(self.experiment.encoding)
-		# Next, we encode the filename to a str in the filesystem encoding
-		_fname = fname.encode(misc.filesystem_encoding())
-		try:
-			surface = pygame.image.load(_fname)
-		except pygame.error as e:
-			raise osexception(
-				u"'%s' is not a supported image format" % fname)
-		if scale != None:
-			try:
-				surface = pygame.transform.smoothscale(surface,
-					(int(surface.get_width()*scale),
-					int(surface.get_height()*scale)))
-			except:
-				debug.msg(u"smooth scaling failed for '%s'" % fname,
-					reason=u"warning")
-				surface = pygame.transform.scale(surface,
-					(int(surface.get_width()*scale),
-					int(surface.get_height()*scale)))
+		surface = canvas._image(self.experiment.unistr(fname), scale)
 		size = surface.get_size()
 		if x == None:
 			x = self.xcenter()
@@ -313,6 +327,8 @@ def init_display(experiment):
 	pygame.mouse.set_visible(False)
 	experiment.surface = pygame.display.get_surface()
 
+	clear_font_cache()
+
 	# Create a font, falling back to the default font
 	try:
 		experiment.font = pygame.font.Font(experiment.resource(
@@ -331,3 +347,52 @@ def init_display(experiment):
 def close_display(experiment):
 
 	pygame.display.quit()
+
+def clear_font_cache():
+
+	"""
+	desc:
+		Empties the font cache, the cache of text sizes, and the cache of text
+		layouts. This is done when the display is initialized, because fonts
+		may come from the file pool, which differs between experiments.
+	"""
+
+	font_cache.clear()
+	text_size_cache.clear()
+	html.clear_layout_cache()
+
+def _font(experiment, key):
+
+	"""
+	desc:
+		Returns a font from the font cache, which is shared by all canvases.
+
+	arguments:
+		experiment:
+			desc:	The experiment object.
+			type:	experiment
+		key:
+			desc:	A (style, size, bold, italic, underline) tuple.
+			type:	tuple
+
+	returns:
+		desc:	A PyGame font.
+		type:	Font
+	"""
+
+	try:
+		return font_cache[key]
+	except KeyError:
+		pass
+	style, size, bold, italic, underline = key
+	# First see if the font refers to a file in the resources/ filepool
+	try:
+		font = pygame.font.Font(experiment.resource(u'%s.ttf' % style), size)
+	# If not, try to match a system font
+	except:
+		font = pygame.font.SysFont(style, size)
+	font.set_bold(bold)
+	font.set_italic(italic)
+	font.set_underline(underline)
+	font_cache[key] = font
+	return font
@@ -18,6 +18,9 @@ along with openexp.  If not, see <http://www.gnu.org/licenses/>.
 """
 
 import pygame
+import hashlib
+import weakref
+from collections import OrderedDict
 from pygame.locals import *
 from OpenGL.GL import *
 try:
@@ -263,6 +266,59 @@ class OGLSprite:
         """get_height(self) -> int"""
         return self.srcsize[1]
 
+# Textures are shared by surfaces with identical content, so that stimuli that
+# are drawn again (e.g., the same word or image on every trial) are uploaded
+# to the graphics card only once. When more than max_textures textures are
+# cached, the least recently used texture is released.
+max_textures = 512
+texture_cache = OrderedDict()
+# Hashing a large surface takes about as long as uploading it, so surfaces
+# with more pixels than this are not hashed. Large surfaces that are shared,
+# i.e. that come from the stimulus cache, such as images and patches, are
+# identified by the surface object instead. The surface is only referenced
+# weakly, so that its texture is released when the surface is evicted from
+# the stimulus cache. Other large surfaces are drawn only once, and their
+# textures are not cached at all.
+max_hashed_pixels = 256 * 256
+
+def getTexture(surf, interpolate=True, shared=False):
+    """
+    Return a texture for a surface, reusing a texture with the same content
+    if one has been created before. Large surfaces are only cached if they
+    are shared.
+    """
+    w, h = surf.get_size()
+    if w * h <= max_hashed_pixels:
+        key = w, h, interpolate, \
+            hashlib.sha1(pygame.image.tostring(surf, "RGBA", 0)).digest()
+        ref = None
+    elif shared:
+        key = w, h, interpolate, id(surf)
+        ref = weakref.ref(surf, lambda ref: _releaseTexture(key, ref))
+    else:
+        return OGLSprite(surf, interpolate=interpolate)
+    try:
+        texture, _ref = texture_cache.pop(key)
+        # A surface with the same id may have replaced a surface that no
+        # longer exists
+        if _ref is not None and _ref() is not surf:
+            raise KeyError(key)
+    except KeyError:
+        texture = OGLSprite(surf, interpolate=interpolate)
+        if len(texture_cache) >= max_textures:
+            texture_cache.popitem(last=False)
+    texture_cache[key] = texture, ref
+    return texture
+
+def _releaseTexture(key, ref):
+    """
+    Remove the texture of a shared surface that no longer exists from the
+    cache.
+    """
+    entry = texture_cache.get(key)
+    if entry is not None and entry[1] is ref:
+        del texture_cache[key]
+
 class LowImage:
     """
     Low level representation of an image.
@@ -284,10 +340,11 @@ class LowImage:
         else:
             raise ValueError, "Invalid number of arguments for LowImage constructor."
         if kwargs.has_key('interpolate'):
-            interpolate = kwargs['interpolate']
+            self.interpolate = kwargs['interpolate']
         else:
-            interpolate = True
-        self.gl_texture = OGLSprite(self.surf, interpolate=interpolate)
+            self.interpolate = True
+        self.gl_texture = getTexture(self.surf, interpolate=self.interpolate,
+            shared=kwargs.get('shared', False))
         self.gl_texture_dirty = False
 
 	# this next line supposedly breaks on OSX, set to none if this is the case
@@ -303,7 +360,10 @@ class LowImage:
         """
         """
         if self.gl_texture_dirty:
-            self.gl_texture.update(self.surf)
+            # The texture may be shared with other images, so a modified image
+            # gets a texture of its own
+            self.gl_texture = OGLSprite(self.surf,
+                interpolate=self.interpolate)
             self.gl_texture_dirty = False
     def show(self, x, y):
         """
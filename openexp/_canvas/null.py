@@ -0,0 +1,125 @@
+#-*- coding:utf-8 -*-
+
+"""
+This file is part of openexp.
+
+openexp is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+openexp is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with openexp.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import pygame
+import time
+from libopensesame import debug
+from openexp._canvas.legacy import legacy, clear_font_cache
+
+class null(legacy):
+
+	"""
+	desc: |
+		This is a headless canvas backend, which draws onto in-memory PyGame
+		surfaces and never opens a window. It is meant for benchmarking and
+		testing experiments without a display, sound device, or participant.
+
+		The null back-ends (canvas, keyboard, mouse, sampler, and synth) use a
+		virtual clock, which skips all sleeps, so that experiments run at
+		maximum speed. Responses are given automatically, as when an
+		experiment is run with `auto_response` enabled.
+
+		For function specifications and docstrings, see
+		`openexp._canvas.canvas`.
+	"""
+
+	settings = None
+	supports_partial_update = True
+
+	def show(self):
+
+		self.experiment.surface.blit(self.surface, (0, 0))
+		self.experiment.last_shown_canvas = self.surface
+		return self.experiment.time()
+
+	def _show_rects(self, rects):
+
+		return self.show()
+
+class virtual_clock(object):
+
+	"""
+	desc:
+		A clock that skips sleeps. The time is the real time that has passed
+		since the clock was created, plus the total duration of all sleeps.
+	"""
+
+	def __init__(self):
+
+		"""
+		desc:
+			Constructor.
+		"""
+
+		self._start = time.time()
+		self._skipped = 0
+
+	def time(self):
+
+		"""
+		desc:
+			Gives the current time.
+
+		returns:
+			desc:	A timestamp in milliseconds.
+			type:	float
+		"""
+
+		return 1000. * (time.time() - self._start) + self._skipped
+
+	def sleep(self, ms):
+
+		"""
+		desc:
+			Advances the clock without sleeping.
+
+		arguments:
+			ms:
+				desc:	The duration in milliseconds.
+				type:	[int, float]
+		"""
+
+		self._skipped += ms
+
+def init_display(experiment):
+
+	# Only the font module is needed, because nothing is shown
+	pygame.font.init()
+	experiment.surface = pygame.Surface(experiment.resolution(), 0, 32)
+	experiment.window = experiment.surface
+	experiment.last_shown_canvas = experiment.surface
+	clear_font_cache()
+	try:
+		experiment.font = pygame.font.Font(experiment.resource(
+			u"%s.ttf" % experiment.font_family), experiment.font_size)
+	except:
+		debug.msg(u"'%s.ttf' not found, falling back to default font" \
+			% experiment.font_family)
+		experiment.font = pygame.font.Font(None, experiment.font_size)
+	# Responses cannot be collected, so they are given automatically
+	experiment.auto_response = True
+	clock = virtual_clock()
+	experiment._time_func = clock.time
+	experiment._sleep_func = clock.sleep
+	experiment.time = experiment._time_func
+	experiment.sleep = experiment._sleep_func
+
+def close_display(experiment):
+
+	pass
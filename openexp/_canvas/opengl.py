@@ -21,6 +21,7 @@ import pygame
 from pygame.locals import *
 import random
 import openexp._canvas.legacy
+import openexp._canvas.canvas
 from libopensesame.exceptions import osexception
 from libopensesame import debug, html
 import math
@@ -28,7 +29,6 @@ import subprocess
 import os
 import os.path
 import tempfile
-import copy
 import libopengl
 
 class opengl(openexp._canvas.legacy.legacy):
@@ -39,6 +39,7 @@ class opengl(openexp._canvas.legacy.legacy):
 	"""
 
 	settings = None
+	supports_partial_update = False
 
 	def __init__(self, experiment, bgcolor=None, fgcolor=None, auto_prepare=True):
 
@@ -63,7 +64,7 @@ class opengl(openexp._canvas.legacy.legacy):
 
 		"""see openexp._canvas.legacy"""
 
-		return openexp._canvas.legacy._color(color)
+		return openexp._canvas.canvas._color(color)
 
 	def flip(self, x = True, y = False):
 
@@ -77,9 +78,10 @@ class opengl(openexp._canvas.legacy.legacy):
 
 		"""see openexp._canvas.legacy"""
 
-		# PBS: do we need a deep copy here
-		#self.showables = [s.copy() for s in canvas.showables]
-		self.showables = copy.deepcopy(canvas.showables)
+		# The images are not modified after they have been added, so they can
+		# be shared between canvases
+		self.clear_color = canvas.clear_color
+		self.showables = canvas.showables[:]
 
 	def xcenter(self):
 
@@ -97,11 +99,16 @@ class opengl(openexp._canvas.legacy.legacy):
 
 		"""see openexp._canvas.legacy"""
 
+		libopengl.clearScreen(self.clear_color)
 		for s,loc in self.showables:
 			s.show(loc[0],loc[1])
 		libopengl.doBlockingFlip()
 		return pygame.time.get_ticks()
 
+	def _show_rects(self, rects):
+
+		return self.show()
+
 	def clear(self, color = None):
 
 		"""see openexp._canvas.legacy"""
@@ -111,11 +118,10 @@ class opengl(openexp._canvas.legacy.legacy):
 		else:
 			color = self.color(color)
 
-		# clear the showable list
+		# clear the showable list. The background is cleared with glClear()
+		# when the canvas is shown, rather than drawn as a full-screen texture.
 		self.showables = []
-		surface = pygame.Surface(self.experiment.resolution())
-		surface.fill(color)
-		self.showables.append((libopengl.LowImage(surface), (0,0)))
+		self.clear_color = color
 
 	def set_penwidth(self, penwidth):
 
@@ -328,13 +334,8 @@ class opengl(openexp._canvas.legacy.legacy):
 
 		"""see openexp._canvas.legacy"""
 
-		try:
-			surface = pygame.image.load(fname)
-		except pygame.error as e:
-			raise osexception("'%s' is not a supported image format" % fname)
-
-		if scale != None:
-			surface = pygame.transform.smoothscale(surface, (int(surface.get_width() * scale), int(surface.get_height() * scale)))
+		surface = openexp._canvas.canvas._image(self.experiment.unistr(fname),
+			scale)
 
 		size = surface.get_size()
 
@@ -348,7 +349,7 @@ class opengl(openexp._canvas.legacy.legacy):
 			x -= size[0] / 2
 			y -= size[1] / 2
 
-		self.showables.append((libopengl.LowImage(surface),
+		self.showables.append((libopengl.LowImage(surface, shared=True),
 				       (x,y)))
 
 	def gabor(self, x, y, orient, freq, env = "gaussian", size = 96, stdev = 12, phase = 0, col1 = "white", col2 = "black", bgmode = "avg"):
@@ -368,8 +369,8 @@ class opengl(openexp._canvas.legacy.legacy):
 		bgmode: color of the background (avg/ col2)
 		"""
 
-		surface = openexp._canvas.legacy._gabor(orient, freq, env, size, stdev, phase, col1, col2, bgmode)
-		self.showables.append((libopengl.LowImage(surface),
+		surface = openexp._canvas.canvas._gabor(orient, freq, env, size, stdev, phase, col1, col2, bgmode)
+		self.showables.append((libopengl.LowImage(surface, shared=True),
 				       (x - 0.5 * size, y - 0.5 * size)))
 
 	def noise_patch(self, x, y, env = "gaussian", size = 96, stdev = 12, col1 = "white", col2 = "black", bgmode = "avg"):
@@ -378,16 +379,14 @@ class opengl(openexp._canvas.legacy.legacy):
 		Draws a patch of noise, with an envelope applied over it.
 		"""
 
-		surface = openexp._canvas.legacy._noise_patch(env, size, stdev, col1, col2, bgmode)
-		self.showables.append((libopengl.LowImage(surface),
+		surface = openexp._canvas.canvas._noise_patch(env, size, stdev, col1, col2, bgmode)
+		self.showables.append((libopengl.LowImage(surface, shared=True),
 				       (x - 0.5 * size, y - 0.5 * size)))
 
 """
 Static methods
 """
 
-canvas_cache = {}
-
 def init_display(experiment):
 
 	"""
@@ -423,6 +422,10 @@ def init_display(experiment):
 	# Set for recent linux Mesa DRI Radeon
 	os.environ["LIBGL_SYNC_REFRESH"] = val
 
+	# Textures belong to the OpenGL context in which they were created, so
+	# textures that are cached from a previous display cannot be reused
+	libopengl.texture_cache.clear()
+
 	# Create the window and the surface
 	experiment.window = pygame.display.set_mode(experiment.resolution(), mode)
 	pygame.display.set_caption(experiment.title)
@@ -435,6 +438,10 @@ def init_display(experiment):
 	experiment.time = experiment._time_func
 	experiment.sleep = experiment._sleep_func
 
+	# Text layouts depend on the fonts, which may come from the file pool of
+	# another experiment
+	html.clear_layout_cache()
+
 	# Create a font, falling back to the default font
 	experiment.font = pygame.font.Font(experiment.resource("%s.ttf" % experiment.font_family), experiment.font_size)
 	if experiment.font == None:
@@ -446,5 +453,7 @@ def close_display(experiment):
 	Close the display
 	"""
 
+	# Release the cached textures while the OpenGL context still exists
+	libopengl.texture_cache.clear()
 	pygame.display.quit()
 
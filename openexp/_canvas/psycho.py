@@ -27,6 +27,11 @@ try: # Try both import statements
 	from PIL import Image
 except:
 	import Image
+# Image.fromstring() has been renamed to Image.frombytes() in Pillow
+try:
+	frombytes = Image.frombytes
+except AttributeError:
+	frombytes = Image.fromstring
 import numpy as np
 import os.path
 
@@ -233,7 +238,11 @@ class psycho(canvas.canvas):
 
 	def image(self, fname, center=True, x=None, y=None, scale=None):
 
-		im = Image.open(fname)
+		# The image is decoded through the stimulus cache, and handed to
+		# PsychoPy as a PIL image, so that it is not decoded again.
+		surface = canvas._image(self.experiment.unistr(fname))
+		im = frombytes(u'RGBA', surface.get_size(),
+			pygame.image.tostring(surface, u'RGBA'))
 
 		if scale != None:
 			w = im.size[0] * scale
@@ -251,7 +260,7 @@ class psycho(canvas.canvas):
 			y += h/2
 		pos = x - self.xcenter(), self.ycenter() - y
 
-		stim = visual.ImageStim(win=self.experiment.window, image=fname,
+		stim = visual.ImageStim(win=self.experiment.window, image=im,
 			pos=pos, size=(w,h))
 		self.stim_list.append(stim)
 
@@ -402,6 +411,9 @@ def init_display(experiment):
 	experiment.time = experiment._time_func
 	experiment.sleep = experiment._sleep_func
 	experiment.window.winHandle.set_caption(u'OpenSesame (PsychoPy backend)')
+	# Text layouts depend on the fonts, which may come from the file pool of
+	# another experiment
+	html.clear_layout_cache()
 	# Set Gamma value if specified
 	gamma = experiment.get_check(u'psychopy_gamma', u'unchanged')
 	if type(gamma) in (int, float) and gamma > 0:
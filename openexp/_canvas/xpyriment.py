@@ -265,17 +265,16 @@ class xpyriment(canvas.canvas):
 		if x == None: x = self.xcenter()
 		if y == None: y = self.ycenter()
 		if center == False:
-			if isinstance(fname, unicode):
-				_fname = fname.encode(self.experiment.encoding)
-			else:
-				_fname = fname
-			surf = pygame.image.load(_fname)
+			# The size is taken from the decoded image in the stimulus cache,
+			# but the stimulus itself is created through Expyriment's public
+			# API, which decodes the image again when it is preloaded
+			surface = canvas._image(self.experiment.unistr(fname))
 			if scale == None:
-				x += surf.get_width()/2
-				y += surf.get_height()/2
+				x += surface.get_width()/2
+				y += surface.get_height()/2
 			else:
-				x += scale*surf.get_width()/2
-				y += scale*surf.get_height()/2
+				x += scale*surface.get_width()/2
+				y += scale*surface.get_height()/2
 		stim = stimuli.Picture(fname, position=c2p((x,y)))
 		if scale != None: stim.scale( (scale, scale) )
 		self.add_stim(stim)
@@ -331,6 +330,10 @@ def init_display(experiment):
 	pygame.event.set_allowed(pygame.MOUSEBUTTONDOWN)
 	pygame.event.set_allowed(pygame.MOUSEBUTTONUP)
 
+	# Text layouts depend on the fonts, which may come from the file pool of
+	# another experiment
+	html.clear_layout_cache()
+
 def close_display(experiment):
 
 	control.end()
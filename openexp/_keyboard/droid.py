@@ -77,6 +77,7 @@ class droid(legacy):
 					return key, time
 			if timeout != None and time-start_time >= timeout:
 				break
+			self.experiment.poller.idle(time-start_time, timeout)
 			# Allow Android interrupt
 			if android != None and android.check_pause():
 				android.wait_for_resume()
@@ -36,28 +36,17 @@ class legacy(keyboard.keyboard):
 		`openexp._keyboard.keyboard`.
 	"""
 
+	# The tables that map key codes to names and vice versa are built once,
+	# when the first keyboard is created, and shared by all keyboards.
+	key_code_to_name = None
+	key_name_to_code = None
+
 	def __init__(self, experiment, keylist=None, timeout=None):
 
-		pygame.init()
-		self.key_code_to_name = {}
-		self.key_name_to_code = {}
-		for i in dir(pygame):
-			if i[:2] == u"K_":
-				code = getattr(pygame, i)
-				name1 = self.key_name(code).lower()
-				name2 = name1.upper()
-				name3 = i[2:].lower()
-				name4 = name3.upper()
-				self.key_code_to_name[code] = [name1, name2, name3, name4]
-				try:
-					i = int(name5)
-					self.key_code_to_name[code].append(name5)
-				except:
-					pass
-				self.key_name_to_code[name1] = code
-				self.key_name_to_code[name2] = code
-				self.key_name_to_code[name3] = code
-				self.key_name_to_code[name4] = code
+		if legacy.key_code_to_name is None:
+			pygame.init()
+			legacy.key_code_to_name, legacy.key_name_to_code = \
+				self.key_tables()
 		self.persistent_virtual_keyboard = False
 		self.experiment = experiment
 		self.set_keylist(keylist)
@@ -88,6 +77,7 @@ class legacy(keyboard.keyboard):
 					return key, time
 			if timeout != None and time-start_time >= timeout:
 				break
+			self.experiment.poller.idle(time-start_time, timeout)
 		return None, time
 
 	def get_mods(self):
@@ -127,6 +117,33 @@ class legacy(keyboard.keyboard):
 						u"The escape key was pressed.")
 		return keypressed
 
+	def key_tables(self):
+
+		"""
+		desc:
+			Builds the tables that map key codes to names and vice versa.
+
+		returns:
+			desc:	A (key_code_to_name, key_name_to_code) tuple of dicts.
+			type:	tuple
+		"""
+
+		key_code_to_name = {}
+		key_name_to_code = {}
+		for i in dir(pygame):
+			if i[:2] == u"K_":
+				code = getattr(pygame, i)
+				name1 = self.key_name(code).lower()
+				name2 = name1.upper()
+				name3 = i[2:].lower()
+				name4 = name3.upper()
+				key_code_to_name[code] = [name1, name2, name3, name4]
+				key_name_to_code[name1] = code
+				key_name_to_code[name2] = code
+				key_name_to_code[name3] = code
+				key_name_to_code[name4] = code
+		return key_code_to_name, key_name_to_code
+
 	def key_name(self, key):
 
 		return unicode(pygame.key.name(key)).replace(u'[', u'').replace(u']',
@@ -0,0 +1,55 @@
+#-*- coding:utf-8 -*-
+
+"""
+This file is part of openexp.
+
+openexp is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+openexp is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with openexp.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from openexp._keyboard.legacy import legacy
+
+class null(legacy):
+
+	"""
+	desc: |
+		This is a headless keyboard backend, which does not wait for key
+		presses, but immediately responds with the first key from the list of
+		allowed keys, or 'space' if all keys are allowed. Key names and
+		synonyms are the same as for the legacy back-end.
+
+		For function specifications and docstrings, see
+		`openexp._keyboard.keyboard`.
+	"""
+
+	def get_key(self, keylist=None, timeout=None):
+
+		if keylist == None:
+			keylist = self._keylist
+		if keylist == None:
+			return u'space', self.experiment.time()
+		if len(keylist) > 0:
+			return keylist[0], self.experiment.time()
+		if timeout == None:
+			timeout = self.timeout
+		if timeout != None:
+			self.experiment.sleep(timeout)
+		return None, self.experiment.time()
+
+	def get_mods(self):
+
+		return []
+
+	def flush(self):
+
+		return False
@@ -59,7 +59,13 @@ class psycho(keyboard.keyboard):
 		']' : 'bracketright',
 		'^' : None,
 		'_' : 'underscore'
-		}	
+		}
+	# The inverse of the keymap, i.e. PsychoPy names to PyGame names
+	keymap_inverse = dict([(name, char) for char, name in keymap.items() \
+		if name != None])
+	# The list of valid keys is built once, when it is first needed, and shared
+	# by all keyboards.
+	_valid_keys = None
 
 	def __init__(self, experiment, keylist=None, timeout=None):
 
@@ -73,11 +79,10 @@ class psycho(keyboard.keyboard):
 
 	def valid_keys(self):
 
-		l = []
-		for i in dir(pyglet.window.key):
-			if isinstance(getattr(pyglet.window.key, i), int):
-				l.append(i)
-		return l
+		if psycho._valid_keys is None:
+			psycho._valid_keys = [i for i in dir(pyglet.window.key) \
+				if isinstance(getattr(pyglet.window.key, i), int)]
+		return psycho._valid_keys[:]
 
 	def get_key(self, keylist=None, timeout=None):
 
@@ -134,11 +139,10 @@ class psycho(keyboard.keyboard):
 			l.append(key.upper())
 		if key != key.lower():
 			l.append(key.lower())
-		for char, name in self.keymap.items():
-			if key == char:
-				l.append(name)
-			if key.lower() == name:
-				l.append(char)	
+		if key in self.keymap:
+			l.append(self.keymap[key])
+		if key.lower() in self.keymap_inverse:
+			l.append(self.keymap_inverse[key.lower()])
 		# Make sure that we can deal with None/ timeout responses
 		if key.lower() == 'none':
 			l.append(None)
@@ -79,6 +79,7 @@ class droid(legacy.legacy):
 											u"The escape sequence was clicked/ tapped")
 					if buttonlist == None or event.button in buttonlist:
 						return event.button, event.pos, time
+			self.experiment.poller.idle(time-start_time, timeout)
 			# Allow Android interrupt
 			if android != None and android.check_pause():
 				android.wait_for_resume()
@@ -83,16 +83,14 @@ class legacy(mouse.mouse):
 
 		start_time = pygame.time.get_ticks()
 		time = start_time
+		cursor_rect = None
 
 		while True:
 			time = pygame.time.get_ticks()
 
 			# Draw a cusom cursor if necessary
 			if self.cursor != None and visible:
-				surface = self.experiment.last_shown_canvas.copy()
-				surface.blit(self.cursor, pygame.mouse.get_pos())
-				self.experiment.surface.blit(surface, (0,0))
-				pygame.display.flip()
+				cursor_rect = self.draw_cursor(cursor_rect)
 
 			# Process the input
 			for event in pygame.event.get():
@@ -121,11 +119,47 @@ class legacy(mouse.mouse):
 						return event.button, event.pos, time
 			if timeout != None and time-start_time >= timeout:
 				break
+			self.experiment.poller.idle(time-start_time, timeout)
 
 		if self.cursor == None:
 			pygame.mouse.set_visible(self.visible)
 		return None, None, time
 
+	def draw_cursor(self, cursor_rect):
+
+		"""
+		desc:
+			Draws the custom cursor on top of the last shown canvas, if the
+			mouse has moved. The first time, the entire display is redrawn.
+			After that, only the area under the previous and the new cursor
+			position is updated, unless the display is double buffered.
+
+		arguments:
+			cursor_rect:
+				desc:	The area of the previously drawn cursor, or None if
+						the cursor has not been drawn yet.
+				type:	[Rect, NoneType]
+
+		returns:
+			desc:	The area of the cursor.
+			type:	Rect
+		"""
+
+		new_rect = self.cursor.get_rect(topleft=pygame.mouse.get_pos())
+		if new_rect == cursor_rect:
+			return cursor_rect
+		surface = self.experiment.surface
+		canvas = self.experiment.last_shown_canvas
+		if cursor_rect is None or surface.get_flags() & pygame.DOUBLEBUF:
+			surface.blit(canvas, (0,0))
+			surface.blit(self.cursor, new_rect)
+			pygame.display.flip()
+		else:
+			surface.blit(canvas, cursor_rect, cursor_rect)
+			surface.blit(self.cursor, new_rect)
+			pygame.display.update([cursor_rect, new_rect])
+		return new_rect
+
 	def get_pos(self):
 
 		pygame.event.get()
@@ -0,0 +1,78 @@
+#-*- coding:utf-8 -*-
+
+"""
+This file is part of openexp.
+
+openexp is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+openexp is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with openexp.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from openexp._mouse import mouse
+
+class null(mouse.mouse):
+
+	"""
+	desc: |
+		This is a headless mouse backend, which does not wait for clicks, but
+		immediately responds with the first button from the list of allowed
+		buttons, or the left button if all buttons are allowed. The cursor
+		is always at the display center, unless it has been moved with
+		`set_pos()`.
+
+		For function specifications and docstrings, see
+		`openexp._mouse.mouse`.
+	"""
+
+	def __init__(self, experiment, buttonlist=None, timeout=None,
+		visible=False):
+
+		self.experiment = experiment
+		self.set_buttonlist(buttonlist)
+		self.set_timeout(timeout)
+		self.set_visible(visible)
+		self.pos = self.experiment.get(u'width') / 2, \
+			self.experiment.get(u'height') / 2
+
+	def set_visible(self, visible=True):
+
+		self.visible = visible
+
+	def set_pos(self, pos=(0,0)):
+
+		self.pos = pos
+
+	def get_click(self, buttonlist=None, timeout=None, visible=None):
+
+		if buttonlist == None:
+			buttonlist = self.buttonlist
+		if buttonlist == None:
+			return 1, self.pos, self.experiment.time()
+		if len(buttonlist) > 0:
+			return buttonlist[0], self.pos, self.experiment.time()
+		if timeout == None:
+			timeout = self.timeout
+		if timeout != None:
+			self.experiment.sleep(timeout)
+		return None, None, self.experiment.time()
+
+	def get_pos(self):
+
+		return self.pos, self.experiment.time()
+
+	def get_pressed(self):
+
+		return 0, 0, 0
+
+	def flush(self):
+
+		return False
@@ -112,7 +112,9 @@ class gstreamer(sampler.sampler):
 			self.player.set_state(gst.STATE_PAUSED)
 
 		self.experiment = experiment
-		self.keyboard = keyboard(experiment)
+		# The keyboard is only needed by wait(), so it is created when wait()
+		# is first called.
+		self.keyboard = None
 
 		# Handler of Gstreamer messages
 		self.gst_listener = threading.Thread(target=self._monitor_events,
@@ -225,8 +227,17 @@ class gstreamer(sampler.sampler):
 
 	def wait(self):
 
+		if self.keyboard is None:
+			self.keyboard = keyboard(self.experiment)
 		while not self._end_of_stream_reached:
 			self.keyboard.flush()
+			self.experiment.poller.idle()
+
+def preload(experiment, src):
+
+	# GStreamer reads and decodes sounds from disk while they are played, so
+	# there is nothing to preload
+	pass
 
 def init_sound(experiment):
 
@@ -69,7 +69,7 @@ class legacy(sampler.sampler):
 
 	def __init__(self, experiment, src):
 
-		if src != None:
+		if src is not None:
 			if isinstance(src, basestring):
 				if not os.path.exists(src):
 					raise osexception( \
@@ -85,9 +85,21 @@ class legacy(sampler.sampler):
 				if isinstance(src, unicode):
 					import sys
 					src = src.encode(misc.filesystem_encoding())
-			self.sound = mixer.Sound(src)
+				# Transformed versions of the sound are cached with a key that
+				# starts with the path and the modification time of the file,
+				# followed by the transformations in the order in which they
+				# are applied.
+				self._key = u'sound', src, os.path.getmtime(src)
+				self.sound = _sound(experiment, self._key)
+			else:
+				self._key = None
+				self.sound = mixer.Sound(src)
+		else:
+			self._key = None
 		self.experiment = experiment
-		self.keyboard = keyboard(experiment)
+		# The keyboard is only needed by wait(), so it is created when wait()
+		# is first called.
+		self.keyboard = None
 		self._stop_after = 0
 		self._fade_in = 0
 		self._volume = 1.0
@@ -98,7 +110,6 @@ class legacy(sampler.sampler):
 			raise osexception(
 				u"openexp._sampler.legacy.volume() requires a number between 0.0 and 1.0")
 		self._volume = vol
-		self.sound.set_volume(vol)
 
 	def pitch(self, p):
 
@@ -110,12 +121,7 @@ class legacy(sampler.sampler):
 				u"openexp._sampler.legacy.pitch() requires a positive number")
 		if p == 1:
 			return
-		buf = pygame.sndarray.array(self.sound)
-		_buf = []
-		for i in range(int(float(len(buf)) / p)):
-			_buf.append(buf[int(float(i) * p)])
-		self.sound = pygame.sndarray.make_sound(
-			numpy.array(_buf, dtype=u"int16"))
+		self._transform(u'pitch', p, _pitch)
 
 	def pan(self, p):
 
@@ -127,25 +133,49 @@ class legacy(sampler.sampler):
 				u"openexp._sampler.legacy.pan() requires a number or 'left', 'right'")
 		if p == 0:
 			return
-		buf = pygame.sndarray.array(self.sound)
-		for i in range(len(buf)):
-			l = buf[i][0]
-			r = buf[i][1]
-			if p == "left":
-				r = 0
-			elif p == "right":
-				l = 0
-			elif p < 0:
-				r = int(float(r) / abs(p))
-			else:
-				l = int(float(l) / p)
-			buf[i][0] = l
-			buf[i][1] = r
-		self.sound = pygame.sndarray.make_sound(numpy.array(buf))
+		self._transform(u'pan', p, _pan)
+
+	def _transform(self, name, p, func):
+
+		"""
+		desc:
+			Applies a transformation to the sound. Transformed sounds are kept
+			in the stimulus cache, keyed on the file and the transformations
+			that have been applied to it, so that repeated trials with the
+			same pitch and panning cost nothing.
+
+		arguments:
+			name:
+				desc:	The name of the transformation.
+				type:	unicode
+			p:
+				desc:	The parameter of the transformation.
+			func:
+				desc:	A function that takes a sound and a parameter, and
+						returns a transformed sound.
+				type:	function
+		"""
+
+		if self._key is None:
+			self.sound = func(self.sound, p)
+			return
+		self._key += (name, p),
+		cache = self.experiment.stimulus_cache
+		sound = cache.get(self._key)
+		if sound is None:
+			sound = func(self.sound, p)
+			cache.put(self._key, sound, _nbytes(sound))
+		self.sound = sound
 
 	def play(self, block=False):
 
-		self.sound.play(maxtime=self._stop_after, fade_ms=self._fade_in)
+		# Sounds may be shared with other samplers, which may be playing at
+		# a different volume, so the volume is set on the channel rather than
+		# on the sound.
+		channel = self.sound.play(maxtime=self._stop_after,
+			fade_ms=self._fade_in)
+		if channel is not None:
+			channel.set_volume(self._volume)
 		if block:
 			self.wait()
 
@@ -167,8 +197,138 @@ class legacy(sampler.sampler):
 
 	def wait(self):
 
+		if self.keyboard is None:
+			self.keyboard = keyboard(self.experiment)
 		while mixer.get_busy():
 			self.keyboard.flush()
+			self.experiment.poller.idle()
+
+def _sound(experiment, key):
+
+	"""
+	desc:
+		Returns a decoded sound from the sound bank, which is part of the
+		stimulus cache. Each file is decoded only once, and the decoded sound
+		is shared by all samplers that play the file.
+
+	arguments:
+		experiment:
+			desc:	The experiment object.
+			type:	experiment
+		key:
+			desc:	A (u'sound', path, modification time) tuple, where path is
+					a str in the filesystem encoding.
+			type:	tuple
+
+	returns:
+		desc:	A sound.
+		type:	Sound
+	"""
+
+	cache = experiment.stimulus_cache
+	sound = cache.get(key)
+	if sound is None:
+		sound = mixer.Sound(key[1])
+		cache.put(key, sound, _nbytes(sound))
+	return sound
+
+def _nbytes(sound):
+
+	"""
+	desc:
+		Determines the size of a sound without copying it.
+
+	arguments:
+		sound:
+			desc:	A sound.
+			type:	Sound
+
+	returns:
+		desc:	The size in bytes, or None if the size is unknown.
+		type:	[int, NoneType]
+	"""
+
+	try:
+		return sound.get_buffer().length
+	except:
+		return None
+
+def _pitch(sound, p):
+
+	"""
+	desc:
+		Resamples a sound by a (fractional) factor, using linear interpolation
+		between neighboring samples.
+
+	arguments:
+		sound:
+			desc:	The sound.
+			type:	Sound
+		p:
+			desc:	The factor. p > 1 shortens the sound.
+			type:	[int, float]
+
+	returns:
+		desc:	A new sound.
+		type:	Sound
+	"""
+
+	buf = pygame.sndarray.samples(sound)
+	n = len(buf)
+	x = numpy.arange(int(n / float(p))) * float(p)
+	xp = numpy.arange(n)
+	if buf.ndim == 1:
+		_buf = numpy.interp(x, xp, buf)
+	else:
+		_buf = numpy.empty((len(x), buf.shape[1]))
+		for channel in range(buf.shape[1]):
+			_buf[:,channel] = numpy.interp(x, xp, buf[:,channel])
+	return pygame.sndarray.make_sound(numpy.around(_buf).astype(buf.dtype))
+
+def _pan(sound, p):
+
+	"""
+	desc:
+		Pans a stereo sound by attenuating one of the channels. Mono sounds
+		are returned unchanged.
+
+	arguments:
+		sound:
+			desc:	The sound.
+			type:	Sound
+		p:
+			desc:	Panning, as described for `sampler.pan()`.
+			type:	[int, float, unicode]
+
+	returns:
+		desc:	A new sound.
+		type:	Sound
+	"""
+
+	if pygame.sndarray.samples(sound).ndim == 1:
+		return sound
+	# Copy the sound once, and change the gain of the copy in place
+	sound = pygame.sndarray.make_sound(pygame.sndarray.samples(sound))
+	buf = pygame.sndarray.samples(sound)
+	if p == u"left":
+		channel, gain = 1, 0
+	elif p == u"right":
+		channel, gain = 0, 0
+	elif p < 0:
+		channel, gain = 1, 1. / abs(p)
+	else:
+		channel, gain = 0, 1. / p
+	samples = buf[:,channel]
+	if gain > 1:
+		info = numpy.iinfo(buf.dtype)
+		samples[:] = numpy.clip(samples * gain, info.min, info.max)
+	else:
+		numpy.multiply(samples, gain, out=samples, casting=u'unsafe')
+	return sound
+
+def preload(experiment, src):
+
+	legacy(experiment, src)
 
 def init_sound(experiment):
 
@@ -0,0 +1,131 @@
+#-*- coding:utf-8 -*-
+
+"""
+This file is part of openexp.
+
+openexp is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+openexp is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with openexp.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from openexp._sampler import sampler
+from libopensesame.exceptions import osexception
+from libopensesame import misc
+import os.path
+import wave
+
+class null(sampler.sampler):
+
+	"""
+	desc: |
+		This is a headless sampler backend, which does not play sounds. When
+		the sound is played, it lasts for its duration according to the
+		virtual clock of the null canvas back-end, if this duration is known
+		(for .wav files), or for the stop-after duration.
+
+		For function specifications and docstrings, see
+		`openexp._sampler.sampler`.
+	"""
+
+	settings = None
+
+	def __init__(self, experiment, src):
+
+		self.experiment = experiment
+		self._duration = 0
+		if isinstance(src, basestring):
+			if not os.path.exists(src):
+				raise osexception( \
+					u"openexp._sampler.null.__init__() the file '%s' does not exist" \
+					% src)
+			if os.path.splitext(src)[1].lower() not in (".ogg", ".wav"):
+				raise osexception( \
+					u"openexp._sampler.null.__init__() the file '%s' is not an .ogg or .wav file" \
+					% src)
+			if os.path.splitext(src)[1].lower() == u'.wav':
+				if isinstance(src, unicode):
+					src = src.encode(misc.filesystem_encoding())
+				try:
+					w = wave.open(src, u'rb')
+					self._duration = 1000. * w.getnframes() / w.getframerate()
+					w.close()
+				except:
+					pass
+		self._stop_after = 0
+		self._fade_in = 0
+		self._volume = 1.0
+		self._end_time = None
+
+	def volume(self, vol):
+
+		if type(vol) not in (int, float) or vol < 0 or vol > 1:
+			raise osexception(
+				u"openexp._sampler.null.volume() requires a number between 0.0 and 1.0")
+		self._volume = vol
+
+	def pitch(self, p):
+
+		if type(p) not in (int, float) or p <= 0:
+			raise osexception(
+				u"openexp._sampler.null.pitch() requires a positive number")
+		self._duration /= p
+
+	def pan(self, p):
+
+		if type(p) not in (int, float) and p not in (u"left", u"right"):
+			raise osexception(
+				u"openexp._sampler.null.pan() requires a number or 'left', 'right'")
+
+	def play(self, block=False):
+
+		duration = self._duration
+		if self._stop_after > 0 and (duration == 0 or \
+			self._stop_after < duration):
+			duration = self._stop_after
+		self._end_time = self.experiment.time() + duration
+		if block:
+			self.wait()
+
+	def stop(self):
+
+		self._end_time = None
+
+	def pause(self):
+
+		pass
+
+	def resume(self):
+
+		pass
+
+	def is_playing(self):
+
+		return self._end_time != None and \
+			self.experiment.time() < self._end_time
+
+	def wait(self):
+
+		if self.is_playing():
+			self.experiment.sleep(self._end_time - self.experiment.time())
+		self._end_time = None
+
+def preload(experiment, src):
+
+	pass
+
+def init_sound(experiment):
+
+	pass
+
+def close_sound(experiment):
+
+	pass
@@ -23,7 +23,7 @@ from libopensesame.exceptions import osexception
 class droid(synth.synth):
 
 	def __init__(self, experiment, osc="sine", freq=440, length=100, attack=0,
-		decay=5):
+		decay=5, voices=None):
 
 		raise osexception(
 			'The synth is not supported on the droid back-end, sorry!')
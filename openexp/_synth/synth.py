@@ -25,6 +25,10 @@ except:
 
 from openexp.sampler import sampler
 from libopensesame.exceptions import osexception
+try:
+	import numpy as np
+except ImportError:
+	np = None
 
 class synth(object):
 
@@ -39,8 +43,21 @@ class synth(object):
 		from openexp.synth import synth
 		my_synth = synth(exp, osc='saw', freq='b2', attack=250, length=500)
 		my_synth.play()
+		# Play a chord followed by a single tone, mixed into one sound
+		my_synth = synth(exp, voices=[
+			{'freq' : 'c1', 'length' : 500, 'volume' : .3},
+			{'freq' : 'e1', 'length' : 500, 'volume' : .3},
+			{'freq' : 'g1', 'length' : 500, 'volume' : .3},
+			{'freq' : 'c2', 'length' : 500, 'onset' : 500},
+			])
+		my_synth.play()
 		~~~
 
+		Tones are generated with NumPy only. Except for white noise, which is
+		different each time, generated tones are kept in the stimulus cache
+		(see `exp.stimulus_cache`), so that a tone that is played on every
+		trial is generated only once.
+
 		__Function list:__
 
 		%--
@@ -53,7 +70,7 @@ class synth(object):
 	__metaclass__ = docinherit
 
 	def __init__(self, experiment, osc="sine", freq=440, length=100, attack=0,
-		decay=5):
+		decay=5, voices=None):
 
 		"""
 		desc:
@@ -82,27 +99,129 @@ class synth(object):
 			decay:
 				desc:	The decay (fade-out) time in milliseconds.
 				type:	[int, float]
+			voices:
+				desc:	A list of voices that are mixed into a single sound, or
+						None to play a single tone. Each voice is a dict that
+						can contain the `osc`, `freq`, `length`, `attack`, and
+						`decay` keywords, as well as an `onset` in milliseconds
+						(default: 0) and a `volume` between 0 and 1 (default:
+						1). The other keywords are ignored when voices are
+						given. Voices are added up, so their volumes should
+						sum to at most 1 to avoid clipping.
+				type:	[list, NoneType]
 
 		example: |
 			from openexp.synth import synth
 			my_synth = synth(exp, freq='b2', length=500)
 		"""
 
-		import numpy as np
-		from scipy import signal
-		global np
-		global signal
-
+		if np is None:
+			raise osexception(u'The synth requires NumPy')
 		self.experiment = experiment
 		# We need to multiply the rate by two to get a stereo signal
 		rate = 2*self.experiment.get_check(u'sampler_frequency', 48100)
+		if voices is None:
+			voices = [{u'osc' : osc, u'freq' : freq, u'length' : length,
+				u'attack' : attack, u'decay' : decay}]
+		sound = self.to_int_16(self.mix(voices, rate))
+		self.sampler = sampler(experiment, sound)
+
+	def mix(self, voices, rate):
+
+		"""
+		desc:
+			Renders a list of voices into a single buffer.
+
+		arguments:
+			voices:
+				desc:	A list of voices. See `__init__()`.
+				type:	list
+			rate:
+				desc:	The sampling rate, counting both channels.
+				type:	int
+
+		returns:
+			desc:	A float array with values between -1 and 1. When there is
+					only one voice at full volume, this is a cached waveform
+					that should not be modified.
+			type:	ndarray
+
+		visible:
+			False
+		"""
+
+		waves = []
+		n = 0
+		for voice in voices:
+			wave = self.waveform(voice.get(u'osc', u'sine'),
+				self.key_to_freq(voice.get(u'freq', 440)),
+				voice.get(u'length', 100), voice.get(u'attack', 0),
+				voice.get(u'decay', 5), rate)
+			# The offset is rounded to an even number of samples, so that the
+			# left and right channel are not swapped
+			offset = 2 * int(voice.get(u'onset', 0) * .0005 * rate)
+			waves.append((offset, wave, voice.get(u'volume', 1)))
+			n = max(n, offset + len(wave))
+		if len(waves) == 1 and waves[0][0] == 0 and waves[0][2] == 1:
+			return waves[0][1]
+		buf = np.zeros(n)
+		for offset, wave, volume in waves:
+			if volume == 1:
+				buf[offset:offset+len(wave)] += wave
+			else:
+				buf[offset:offset+len(wave)] += volume * wave
+		return np.clip(buf, -1, 1, out=buf)
+
+	def waveform(self, osc, freq, length, attack, decay, rate):
+
+		"""
+		desc:
+			Generates a tone with an envelope applied to it. Tones are kept in
+			the stimulus cache, except for white noise.
+
+		arguments:
+			osc:
+				desc:	The oscillator.
+				type:	[str, unicode]
+			freq:
+				desc:	The frequency in hertz.
+				type:	[int, float]
+			length:
+				desc:	The length in milliseconds.
+				type:	[int, float]
+			attack:
+				desc:	The attack time in milliseconds.
+				type:	[int, float]
+			decay:
+				desc:	The decay time in milliseconds.
+				type:	[int, float]
+			rate:
+				desc:	The sampling rate, counting both channels.
+				type:	int
+
+		returns:
+			desc:	A read-only float array with values between -1 and 1.
+			type:	ndarray
+
+		visible:
+			False
+		"""
+
 		if not hasattr(self, u'osc_%s' % osc):
 			raise osexception(u'Invalid oscillator for synth: %s' % osc)
+		key = u'synth', osc, freq, length, attack, decay, rate
+		cache = self.experiment.stimulus_cache
+		if osc != u'white_noise':
+			wave = cache.get(key)
+			if wave is not None:
+				return wave
 		osc_fnc = getattr(self, u'osc_%s' % osc)
-		signal = osc_fnc(self.key_to_freq(freq), length, rate)
-		envelope = self.envelope(length, attack, decay, rate)
-		sound = self.to_int_16(signal * envelope)
-		self.sampler = sampler(experiment, sound)
+		wave = osc_fnc(freq, length, rate)
+		wave *= self.envelope(length, attack, decay, rate)
+		wave.flags.writeable = False
+		if osc != u'white_noise':
+			cache.put(key, wave, wave.nbytes)
+		return wave
 
 	def key_to_freq(self, key):
 
@@ -179,10 +298,10 @@ class synth(object):
 			False
 		"""
 
-		length *= .001
-		t = np.linspace(0, length, length*rate)
-		a = signal.square(2*np.pi*freq*t)
-		return a
+		# The phase is expressed in cycles, so that the first half of each
+		# cycle is high and the second half is low
+		phase = freq * self.timebase(length, rate)
+		return np.where(phase % 1 < .5, 1., -1.)
 
 	def osc_saw(self, freq, length, rate):
 
@@ -194,10 +313,10 @@ class synth(object):
 			False
 		"""
 
-		length *= .001
-		t = np.linspace(0, length, length*rate)
-		a = signal.sawtooth(2*np.pi*freq*t)
-		return a
+		# The phase is expressed in cycles, and rises from -1 to 1 during
+		# each cycle
+		phase = freq * self.timebase(length, rate)
+		return 2 * (phase % 1) - 1
 
 	def osc_sine(self, freq, length, rate):
 
@@ -209,10 +328,7 @@ class synth(object):
 			False
 		"""
 
-		length *= .001
-		t = np.linspace(0, length, length*rate)
-		a = np.sin(2*np.pi*freq*t)
-		return a
+		return np.sin(2*np.pi*freq*self.timebase(length, rate))
 
 	def osc_white_noise(self, freq, length, rate):
 
@@ -224,9 +340,20 @@ class synth(object):
 			False
 		"""
 
+		return np.random.random(int(length*.001*rate))*2 - 1
+
+	def timebase(self, length, rate):
+
+		"""
+		desc:
+			Generates the time in seconds of each sample.
+
+		visible:
+			False
+		"""
+
 		length *= .001
-		a = np.random.random(length*rate)*2 - 1
-		return a
+		return np.linspace(0, length, int(length*rate))
 
 	def envelope(self, length, attack, decay, rate):
 
@@ -242,11 +369,12 @@ class synth(object):
 		length *= .001
 		attack *= .001
 		decay *= .001
-		e = np.ones(length*rate)
+		e = np.ones(int(length*rate))
 		attack = int(attack*rate)
 		e[:attack] = np.linspace(0, 1, attack)
 		decay = int(decay*rate)
-		e[-decay:] = np.linspace(1, 0, decay)
+		if decay > 0:
+			e[-decay:] = np.linspace(1, 0, decay)
 		return e
 
 	def to_int_16(self, a):
@@ -260,8 +388,7 @@ class synth(object):
 			False
 		"""
 
-		a *= 32767
-		return a.astype(np.int16)
+		return (a * 32767).astype(np.int16)
 
 	@property
 	def is_playing(self):
@@ -77,11 +77,22 @@ droid = {
 	"icon" : "os-android"
 	}
 
+null = {
+	"description" : "headless, for benchmarking and testing", \
+	"canvas" : "null", \
+	"keyboard" : "null", \
+	"mouse" : "null", \
+	"sampler" : "null", \
+	"synth" : "null", \
+	"icon" : "os-pygame"
+	}
+
 backend_list = {}
 backend_list["legacy"] = legacy
 backend_list["xpyriment"] = xpyriment
 backend_list["droid"] = droid
 backend_list["psycho"] = psycho
+backend_list["null"] = null
 
 def match(experiment):
 
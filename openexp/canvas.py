@@ -47,7 +47,10 @@ def canvas(experiment, *arglist, **kwdict):
 	debug.msg(u'morphing into %s' % backend)
 	mod = __import__('openexp._canvas.%s' % backend, fromlist=['dummy'])
 	cls = getattr(mod, backend)
-	return cls(experiment, *arglist, **kwdict)
+	canvas = cls(experiment, *arglist, **kwdict)
+	if experiment.profiler is not None:
+		experiment.profiler.wrap_canvas(canvas)
+	return canvas
 
 def init_display(experiment):
 
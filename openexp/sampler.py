@@ -74,3 +74,22 @@ def close_sound(experiment):
 	debug.msg('morphing into %s' % backend)
 	mod = __import__('openexp._sampler.%s' % backend, fromlist=['dummy'])
 	mod.close_sound(experiment)
+
+def preload(experiment, src):
+
+	"""
+	desc:
+		Calls the back-end specific preload function, which adds a sound file
+		to the sound bank.
+
+	arguments:
+		experiment:		The experiment object.
+		type:			experiment
+		src:			The full path to a sound file.
+		type:			[unicode, str]
+	"""
+
+	backend = experiment.sampler_backend
+	debug.msg('morphing into %s' % backend)
+	mod = __import__('openexp._sampler.%s' % backend, fromlist=['dummy'])
+	mod.preload(experiment, src)
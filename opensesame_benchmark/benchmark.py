@@ -0,0 +1,329 @@
+#-*- coding:utf-8 -*-
+
+"""
+This file is part of OpenSesame.
+
+OpenSesame is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+OpenSesame is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with OpenSesame.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import platform
+import tempfile
+import subprocess
+try:
+	import resource
+except ImportError:
+	resource = None
+
+# The back-end categories that are set to the headless null back-ends
+backend_categories = [u'canvas', u'keyboard', u'mouse', u'sampler', u'synth']
+
+class phase_timer(object):
+
+	"""
+	desc: |
+		Collects wall-clock times per item type and phase (parse, prepare, and
+		run). Items are nested, for example when a sequence runs a sketchpad,
+		so times are exclusive: the time that is spent in child items is not
+		counted for the parent.
+	"""
+
+	def __init__(self):
+
+		"""
+		desc:
+			Constructor.
+		"""
+
+		self.results = {}
+		self._stack = []
+
+	def wrap(self, phase, item_type, func):
+
+		"""
+		desc:
+			Wraps a function so that calls to it are timed.
+
+		arguments:
+			phase:
+				desc:	The phase, such as 'prepare'.
+				type:	unicode
+			item_type:
+				desc:	The item type, such as 'sketchpad'.
+				type:	unicode
+			func:
+				desc:	The function to wrap.
+				type:	function
+
+		returns:
+			desc:	The wrapped function.
+			type:	function
+		"""
+
+		def timed(*args, **kwdict):
+			# The second element counts the time spent in child calls
+			frame = [time.time(), 0.]
+			self._stack.append(frame)
+			try:
+				return func(*args, **kwdict)
+			finally:
+				self._stack.pop()
+				total = time.time() - frame[0]
+				if len(self._stack) > 0:
+					self._stack[-1][1] += total
+				self.add(phase, item_type, total - frame[1])
+		return timed
+
+	def add(self, phase, item_type, t):
+
+		"""
+		desc:
+			Adds a timed call.
+
+		arguments:
+			phase:
+				desc:	The phase.
+				type:	unicode
+			item_type:
+				desc:	The item type.
+				type:	unicode
+			t:
+				desc:	The duration in seconds.
+				type:	float
+		"""
+
+		d = self.results.setdefault(item_type, {}).setdefault(phase,
+			{u'count' : 0, u'total' : 0., u'max' : 0.})
+		d[u'count'] += 1
+		d[u'total'] += t
+		d[u'max'] = max(d[u'max'], t)
+
+def peak_rss():
+
+	"""
+	desc:
+		Gives the peak resident set size of the current process.
+
+	returns:
+		desc:	The peak RSS in kilobytes, or None if this is not available.
+		type:	[int, NoneType]
+	"""
+
+	if resource is None:
+		return None
+	rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+	# On Mac OS, the peak RSS is in bytes; on Linux, it is in kilobytes
+	if sys.platform == u'darwin':
+		rss /= 1024
+	return rss
+
+def run_experiment(path):
+
+	"""
+	desc: |
+		Parses and runs a single experiment, using the null back-ends, and
+		measures how long each phase takes.
+
+		The null back-ends skip sleeps and respond automatically, so the run
+		times reflect only the overhead of OpenSesame itself, and not the
+		intended durations of items. The intended duration is reported as
+		`virtual_time`. The cost of writing the log file is the run time of
+		the `logger` item type.
+
+	arguments:
+		path:
+			desc:	The path to the experiment.
+			type:	unicode
+
+	returns:
+		desc:	A dict with results.
+		type:	dict
+	"""
+
+	from libopensesame.experiment import experiment
+	from libopensesame.item_store import item_store
+	timer = phase_timer()
+	result = {u'status' : u'ok'}
+	logdir = tempfile.mkdtemp(suffix=u'.opensesame_benchmark')
+	# Time the creation of items per type, which includes parsing their script
+	new = item_store.new
+	def timed_new(self, _type, name=None, script=None):
+		return timer.wrap(u'parse', _type, new)(self, _type, name, script)
+	item_store.new = timed_new
+	try:
+		t0 = time.time()
+		try:
+			exp = experiment(u'benchmark', path,
+				experiment_path=os.path.dirname(path),
+				logfile=os.path.join(logdir, u'benchmark.csv'))
+		finally:
+			item_store.new = new
+		result[u'parse'] = time.time() - t0
+		for category in backend_categories:
+			exp.set(u'%s_backend' % category, u'null')
+		for name, item in exp.items.items():
+			item.prepare = timer.wrap(u'prepare', item.item_type, item.prepare)
+			item.run = timer.wrap(u'run', item.item_type, item.run)
+		t0 = time.time()
+		try:
+			exp.run()
+			result[u'run'] = time.time() - t0
+			result[u'virtual_time'] = exp.time() / 1000.
+		finally:
+			# run() ends the experiment itself, except when it fails
+			if exp.running:
+				exp.end()
+	except Exception as e:
+		result[u'status'] = u'error'
+		result[u'error'] = u'%s: %s' % (e.__class__.__name__, e)
+	finally:
+		shutil.rmtree(logdir, ignore_errors=True)
+	result[u'items'] = timer.results
+	result[u'peak_rss_kb'] = peak_rss()
+	return result
+
+def find_examples(folder=u'examples'):
+
+	"""
+	desc:
+		Lists the experiments in a folder.
+
+	keywords:
+		folder:
+			desc:	The folder.
+			type:	unicode
+
+	returns:
+		desc:	A sorted list of paths.
+		type:	list
+	"""
+
+	return sorted([os.path.join(folder, fname) for fname in \
+		os.listdir(folder) if fname.endswith(u'.opensesame') or \
+		fname.endswith(u'.opensesame.tar.gz')])
+
+def call(args, timeout, **kwdict):
+
+	"""
+	desc:
+		Runs a process, like `subprocess.call()`, but kills it if it takes
+		too long. This is necessary because some experiments wait for a
+		particular key, which the null keyboard never presses.
+
+	arguments:
+		args:
+			desc:	The command line.
+			type:	list
+		timeout:
+			desc:	The time limit in seconds, or 0 for no limit.
+			type:	[int, float]
+
+	keyword-dict:
+		kwdict:	Keywords that are passed to `subprocess.Popen()`.
+
+	returns:
+		desc:	The exit status, or None if the process has been killed.
+		type:	[int, NoneType]
+	"""
+
+	process = subprocess.Popen(args, **kwdict)
+	t0 = time.time()
+	while process.poll() is None:
+		if timeout > 0 and time.time() - t0 > timeout:
+			process.kill()
+			process.wait()
+			return None
+		time.sleep(.1)
+	return process.returncode
+
+def main():
+
+	"""
+	desc: |
+		Runs the benchmark from the command line. Each experiment is run in a
+		separate process, so that the peak memory usage is measured per
+		experiment. Results are written as JSON to the standard output, or to
+		a file.
+
+		Usage:
+
+			python -m opensesame_benchmark.benchmark [-o results.json]
+				[-t seconds] [experiment ...]
+
+		If no experiments are specified, all examples are run. Experiments
+		that do not finish within the time limit (default: 60 s) are stopped,
+		and reported with the status `timeout`.
+	"""
+
+	import optparse
+	from libopensesame import misc
+	parser = optparse.OptionParser(
+		u'usage: python -m opensesame_benchmark.benchmark [experiment ...] '
+		u'[options]')
+	parser.add_option(u'-o', u'--output', action=u'store', dest=u'output',
+		help=u'Write results to a file instead of the standard output')
+	parser.add_option(u'-t', u'--timeout', action=u'store', type=u'float',
+		dest=u'timeout', default=60,
+		help=u'Stop experiments that take longer than this number of seconds '
+		u'(0 for no limit)')
+	parser.add_option(u'--single', action=u'store_true', dest=u'single',
+		help=u'Run experiments in this process (used internally)')
+	options, paths = parser.parse_args()
+	if len(paths) == 0:
+		paths = find_examples()
+	results = {}
+	for path in paths:
+		if options.single:
+			results[path] = run_experiment(path)
+			continue
+		fd, output = tempfile.mkstemp(suffix=u'.json')
+		os.close(fd)
+		sys.stderr.write(u'Benchmarking %s ...\n' % path)
+		with open(os.devnull, u'w') as devnull:
+			status = call([sys.executable, u'-m',
+				u'opensesame_benchmark.benchmark', u'--single', u'-o', output,
+				path], options.timeout, stdout=devnull)
+		if status is None:
+			results[path] = {u'status' : u'timeout',
+				u'error' : u'The experiment did not finish within %s s' % \
+				options.timeout}
+			os.remove(output)
+			continue
+		try:
+			with open(output) as fd:
+				results.update(json.load(fd)[u'experiments'])
+		except ValueError:
+			results[path] = {u'status' : u'error',
+				u'error' : u'The benchmark process crashed'}
+		os.remove(output)
+	report = {
+		u'opensesame_version' : misc.version,
+		u'python_version' : platform.python_version(),
+		u'platform' : platform.platform(),
+		u'time' : time.strftime(u'%Y-%m-%d %H:%M:%S'),
+		u'experiments' : results
+		}
+	s = json.dumps(report, indent=1, sort_keys=True)
+	if options.output is None:
+		print(s)
+	else:
+		with open(options.output, u'w') as fd:
+			fd.write(s)
+
+if __name__ == u'__main__':
+	main()
@@ -18,7 +18,20 @@ along with OpenSesame.  If not, see <http://www.gnu.org/licenses/>.
 """
 
 import unittest
-from opensesame_unittest import parsing, backends, syntax
+from opensesame_unittest import parsing, backends, syntax, lexing, sequences, \
+	stimuluscache, prepareahead, texttemplates, logformats, varregistry, \
+	conditions, forms, scripts, archives
 unittest.main(parsing, exit=False)
 unittest.main(backends, exit=False)
+unittest.main(lexing, exit=False)
+unittest.main(sequences, exit=False)
+unittest.main(stimuluscache, exit=False)
+unittest.main(prepareahead, exit=False)
+unittest.main(texttemplates, exit=False)
+unittest.main(logformats, exit=False)
+unittest.main(varregistry, exit=False)
+unittest.main(conditions, exit=False)
+unittest.main(forms, exit=False)
+unittest.main(scripts, exit=False)
+unittest.main(archives, exit=False)
 unittest.main(syntax)
@@ -0,0 +1,222 @@
+#!/usr/bin/env python
+#-*- coding:utf-8 -*-
+
+"""
+This file is part of OpenSesame.
+
+OpenSesame is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+OpenSesame is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with OpenSesame.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+script = u'''
+set start "trial"
+set description "Ünïcode description"
+
+define sequence trial
+	run log "always"
+
+define logger log
+'''
+
+class check_archives(unittest.TestCase):
+
+	"""
+	desc:
+		Checks whether experiments survive being saved to and opened from
+		.opensesame.tar.gz and .opensesame.zip files, and whether unchanged
+		pool files are copied from the previous .opensesame.tar.gz file.
+	"""
+
+	def setUp(self):
+
+		from libopensesame import misc
+		self.folder = tempfile.mkdtemp(suffix=u'.opensesame_unittest')
+		self.pool = {
+			u'short.txt'		: 'short\n',
+			u'long_' + u'x' * 120 + u'.txt'	: 'long\n' * 1000,
+			u'empty.txt'		: '',
+			}
+		# Non-ASCII names can only be tested if the file system encoding
+		# supports them
+		try:
+			u'vidéo_ü.txt'.encode(misc.filesystem_encoding())
+		except UnicodeError:
+			pass
+		else:
+			self.pool[u'vidéo_ü.txt'] = 'unicode\n'
+
+	def tearDown(self):
+
+		shutil.rmtree(self.folder, ignore_errors=True)
+
+	def path(self, fname):
+
+		"""
+		desc:
+			Gives the path of a file in the temporary folder.
+
+		arguments:
+			fname:
+				desc:	A file name.
+				type:	unicode
+
+		returns:
+			type:	unicode
+		"""
+
+		return os.path.join(self.folder, fname)
+
+	def writeFile(self, path, contents):
+
+		"""
+		desc:
+			Writes a file.
+
+		arguments:
+			path:
+				desc:	The path of the file.
+				type:	unicode
+			contents:
+				desc:	The contents.
+				type:	str
+		"""
+
+		from libopensesame import misc
+		with open(path.encode(misc.filesystem_encoding()), u'wb') as fd:
+			fd.write(contents)
+
+	def readFile(self, path):
+
+		"""
+		desc:
+			Reads a file.
+
+		arguments:
+			path:
+				desc:	The path of the file.
+				type:	unicode
+
+		returns:
+			type:	str
+		"""
+
+		from libopensesame import misc
+		with open(path.encode(misc.filesystem_encoding()), u'rb') as fd:
+			return fd.read()
+
+	def newExperiment(self):
+
+		"""
+		desc:
+			Creates an experiment with files in the pool.
+
+		returns:
+			type:	experiment
+		"""
+
+		from libopensesame.experiment import experiment
+		path = self.path(u'source.opensesame')
+		self.writeFile(path, script.encode(u'utf-8'))
+		exp = experiment(u'source', path)
+		for fname, contents in self.pool.items():
+			self.writeFile(os.path.join(exp.pool_folder, fname), contents)
+		return exp
+
+	def checkExperiment(self, path, lazy_pool=False):
+
+		"""
+		desc:
+			Opens an experiment and checks its script and pool.
+
+		arguments:
+			path:
+				desc:	The path of the experiment.
+				type:	unicode
+
+		keywords:
+			lazy_pool:
+				desc:	Indicates whether pool files should be extracted on
+						demand.
+				type:	bool
+		"""
+
+		from libopensesame.experiment import experiment
+		exp = experiment(u'target', path, lazy_pool=lazy_pool)
+		self.assertEqual(exp.description, u'Ünïcode description')
+		self.assertEqual(sorted(exp.items.keys()), [u'log', u'trial'])
+		for fname, contents in self.pool.items():
+			self.assertTrue(exp.file_in_pool(fname))
+			self.assertEqual(self.readFile(exp.get_file(fname)), contents)
+
+	def runTest(self):
+
+		"""
+		desc:
+			Saves and opens experiments in both archive formats.
+		"""
+
+		import tarfile
+		import zipfile
+		from libopensesame import misc
+		exp = self.newExperiment()
+		# Round trip through a .zip file, with and without lazy extraction
+		path = exp.save(self.path(u'exp.opensesame.zip'))
+		self.assertTrue(zipfile.is_zipfile(path))
+		self.checkExperiment(path)
+		self.checkExperiment(path, lazy_pool=True)
+		# Round trip through a .tar.gz file, which should also be readable
+		# with tarfile
+		path = exp.save(self.path(u'exp'))
+		self.assertEqual(path, self.path(u'exp.opensesame.tar.gz'))
+		self.assertEqual(exp.save(path), False)
+		tar = tarfile.open(path.encode(misc.filesystem_encoding()), u'r:gz')
+		self.assertEqual(tar.getnames()[0], u'script.opensesame')
+		self.assertEqual(len(tar.getnames()), len(self.pool) + 2)
+		tar.close()
+		self.checkExperiment(path)
+		self.checkExperiment(path, lazy_pool=True)
+		# Save the experiment again, with another compression level, after
+		# changing one file. The unchanged files should be copied from the
+		# previous archive without being compressed again, so that their
+		# compressed members are identical.
+		first = exp._archive_index[u'members']
+		long_name = u'long_' + u'x' * 120 + u'.txt'
+		src = os.path.join(exp.pool_folder, u'short.txt')
+		st = os.stat(src)
+		self.pool[u'short.txt'] = 'SHORT\n'
+		self.writeFile(src, self.pool[u'short.txt'])
+		# The modification time is not changed, so the change can only be
+		# detected by the checksum of this recently modified file
+		os.utime(src, (st.st_atime, st.st_mtime))
+		data = self.readFile(path)
+		path = exp.save(path, overwrite=True, compresslevel=1)
+		second = exp._archive_index[u'members']
+		new_data = self.readFile(path)
+		def member(data, index, name):
+			offset, length = index[u'pool/' + name][1:3]
+			return data[offset:offset+length]
+		self.assertEqual(member(data, first, long_name),
+			member(new_data, second, long_name))
+		self.assertNotEqual(member(data, first, u'short.txt'),
+			member(new_data, second, u'short.txt'))
+		self.checkExperiment(path)
+		self.assertEqual([fname for fname in os.listdir(self.folder) \
+			if not fname.startswith(u'exp.')], [u'source.opensesame'])
+
+if __name__ == '__main__':
+	unittest.main()
@@ -104,12 +104,13 @@ class check_backend_argspec(unittest.TestCase):
 		"""
 
 		self.checkBackendCategory(u'canvas', ['legacy', 'droid', 'xpyriment',
-			'psycho'])
-		self.checkBackendCategory(u'keyboard', ['legacy', 'droid', 'psycho'])
+			'psycho', 'null'])
+		self.checkBackendCategory(u'keyboard', ['legacy', 'droid', 'psycho',
+			'null'])
 		self.checkBackendCategory(u'mouse', ['legacy', 'droid', 'xpyriment',
-			'psycho'])
-		self.checkBackendCategory(u'sampler', ['legacy', 'gstreamer'])
-		self.checkBackendCategory(u'synth', ['legacy', 'droid'])
+			'psycho', 'null'])
+		self.checkBackendCategory(u'sampler', ['legacy', 'gstreamer', 'null'])
+		self.checkBackendCategory(u'synth', ['legacy', 'droid', 'null'])
 
 
 if __name__ == '__main__':
@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+#-*- coding:utf-8 -*-
+
+"""
+This file is part of OpenSesame.
+
+OpenSesame is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+OpenSesame is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with OpenSesame.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import unittest
+
+class check_compile_cond(unittest.TestCase):
+
+	"""
+	desc:
+		Checks whether conditional statements are translated to Python code.
+	"""
+
+	def runTest(self):
+
+		"""
+		desc:
+			Translates and evaluates conditional statements.
+		"""
+
+		from libopensesame.experiment import experiment
+		exp = experiment(u'compile_cond',
+			u'set start "trial"\ndefine sequence trial\n')
+		for cond, code in [
+			(u'always', u'True'),
+			(u'NEVER', u'False'),
+			(u'[correct] = 1', u"self.get(u'correct') == 1"),
+			(u'[correct]=1', u"self.get(u'correct') == 1"),
+			(u'[response] != space', u'self.get(u\'response\') != u"space"'),
+			(u'[word] = "two words"',
+				u'self.get(u\'word\') == u"two words"'),
+			(u'[a] >= 10 or not [b] < 3',
+				u"self.get(u'a') >= 10 or not self.get(u'b') < 3"),
+			(u'([a] + 1) * 2 = [b]',
+				u"( self.get(u'a') + 1 ) * 2 == self.get(u'b')"),
+			(u'[x] = true', u"self.get(u'x') == True"),
+			(u'[c] = 1.5', u"self.get(u'c') == 1.5"),
+			(u'=self.get("a") == 1', u'self.get("a") == 1'),
+			# Backslashes escape the next character, like in the script
+			(u'[a] = x\\ y', u'self.get(u\'a\') == u"x y"'),
+			(u'[a] = x\\\\y', u'self.get(u\'a\') == u"x\\y"'),
+			(u'[a] = "x\\\\ y"', u'self.get(u\'a\') == u"x\\ y"'),
+			]:
+			self.assertEqual(exp.compile_cond(cond, bytecode=False), code)
+		# Compiled statements are shared
+		self.assertTrue(exp.compile_cond(u'[a] = 1') is \
+			exp.compile_cond(u'[a] = 1'))
+		self.assertRaises(Exception, exp.compile_cond, u'[a] = "unclosed')
+		self.assertRaises(Exception, exp.compile_cond, u'[a] = x\\')
+		exp.set(u'a', u'x y')
+		self.assertTrue(eval(exp.compile_cond(u'[a] = x\\ y'), {},
+			{u'self' : exp}))
+		# Items evaluate the code with themselves as self
+		exp.set(u'a', 10)
+		exp.set(u'b', 22)
+		self.assertTrue(eval(exp.compile_cond(u'([a] + 1) * 2 = [b]'), {},
+			{u'self' : exp}))
+		self.assertFalse(eval(exp.compile_cond(u'[a] < 10 and [b] = 22'), {},
+			{u'self' : exp}))
+
+if __name__ == '__main__':
+	unittest.main()
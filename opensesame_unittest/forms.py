@@ -0,0 +1,169 @@
+#!/usr/bin/env python
+#-*- coding:utf-8 -*-
+
+"""
+This file is part of OpenSesame.
+
+OpenSesame is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+OpenSesame is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with OpenSesame.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import unittest
+
+class check_form_rendering(unittest.TestCase):
+
+	"""
+	desc:
+		Checks whether redrawing only the widgets that have changed gives the
+		same display as redrawing the entire form, and whether a full redraw
+		shows changes to widget attributes.
+	"""
+
+	def snapshot(self):
+
+		"""
+		desc:
+			Gives the contents of the display.
+
+		returns:
+			desc:	The pixels of the display.
+			type:	str
+		"""
+
+		# The display is compared with ==, because the assertion messages of
+		# assertEqual() would contain all pixels
+		import pygame
+		return pygame.image.tostring(self.exp.surface, u'RGB')
+
+	def runTest(self):
+
+		"""
+		desc:
+			Renders a form with the null back-ends.
+		"""
+
+		# The form widgets require PyQt4 (for translations) and PIL
+		try:
+			from libopensesame import widgets
+		except ImportError as e:
+			self.skipTest(u'the form widgets are not available: %s' % e)
+		from libopensesame.experiment import experiment
+		self.exp = experiment(u'forms',
+			u'set start "trial"\ndefine sequence trial\n')
+		for category in (u'canvas', u'keyboard', u'mouse', u'sampler',
+			u'synth'):
+			self.exp.set(u'%s_backend' % category, u'null')
+		self.exp.init_display()
+		try:
+			form = widgets.form(self.exp, cols=[1, 1], rows=[1, 1])
+			label = widgets.label(form, text=u'Label')
+			checkbox = widgets.checkbox(form, text=u'Checkbox')
+			rating_scale = widgets.rating_scale(form, nodes=5)
+			form.set_widget(label, (0, 0))
+			form.set_widget(checkbox, (1, 0))
+			form.set_widget(rating_scale, (0, 1), colspan=2)
+			rects = []
+			show_rects = form.canvas._show_rects
+			def _show_rects(_rects):
+				rects.append(_rects)
+				return show_rects(_rects)
+			form.canvas._show_rects = _show_rects
+			# The first time, the entire form is drawn
+			form.render(dirty_only=True)
+			self.assertEqual(rects, [])
+			# Nothing has changed, so nothing is drawn
+			form.render(dirty_only=True)
+			self.assertEqual(rects, [])
+			checkbox.set_checked(True)
+			rating_scale.set_value(2)
+			form.render(dirty_only=True)
+			self.assertEqual(len(rects), 1)
+			self.assertEqual(len(rects[0]), 2)
+			dirty = self.snapshot()
+			form.render()
+			self.assertTrue(self.snapshot() == dirty)
+			# Attributes that are changed directly are shown by a full redraw
+			label.text = u'Another label'
+			form.render(dirty_only=True)
+			self.assertTrue(self.snapshot() == dirty)
+			form.render()
+			self.assertFalse(self.snapshot() == dirty)
+		finally:
+			self.exp.end()
+
+class check_form_stimulus_list(unittest.TestCase):
+
+	"""
+	desc:
+		Checks whether a form on a back-end that keeps a list of stimuli, which
+		is only reset by `clear()`, does not add stimuli to the canvas each
+		time that a widget changes.
+	"""
+
+	def runTest(self):
+
+		"""
+		desc:
+			Renders a form with the null back-ends, while pretending that the
+			canvas does not support partial updates.
+		"""
+
+		try:
+			from libopensesame import widgets
+		except ImportError as e:
+			self.skipTest(u'the form widgets are not available: %s' % e)
+		from libopensesame.experiment import experiment
+		exp = experiment(u'forms',
+			u'set start "trial"\ndefine sequence trial\n')
+		for category in (u'canvas', u'keyboard', u'mouse', u'sampler',
+			u'synth'):
+			exp.set(u'%s_backend' % category, u'null')
+		exp.init_display()
+		try:
+			form = widgets.form(exp, cols=[1, 1], rows=[1, 1])
+			checkbox = widgets.checkbox(form, text=u'Checkbox')
+			rating_scale = widgets.rating_scale(form, nodes=5)
+			form.set_widget(checkbox, (0, 0))
+			form.set_widget(rating_scale, (0, 1), colspan=2)
+			# Store all draws in a list, like the psycho, xpyriment, and
+			# opengl back-ends do
+			canvas = form.canvas
+			canvas.supports_partial_update = False
+			stim_list = []
+			def store(name):
+				func = getattr(canvas, name)
+				def wrapper(*args, **kwargs):
+					stim_list.append(name)
+					return func(*args, **kwargs)
+				setattr(canvas, name, wrapper)
+			for name in (u'rect', u'line', u'arrow', u'ellipse', u'circle',
+				u'polygon', u'text', u'textline', u'image', u'fixdot'):
+				store(name)
+			clear = canvas.clear
+			def _clear(*args, **kwargs):
+				del stim_list[:]
+				return clear(*args, **kwargs)
+			canvas.clear = _clear
+			form.render(dirty_only=True)
+			n = len(stim_list)
+			self.assertTrue(n > 0)
+			for i in range(5):
+				checkbox.set_checked(i % 2 == 0)
+				rating_scale.set_value(i)
+				form.render(dirty_only=True)
+				self.assertEqual(len(stim_list), n)
+		finally:
+			exp.end()
+
+if __name__ == '__main__':
+	unittest.main()
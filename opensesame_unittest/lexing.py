@@ -0,0 +1,144 @@
+#!/usr/bin/env python
+#-*- coding:utf-8 -*-
+
+"""
+This file is part of OpenSesame.
+
+OpenSesame is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+OpenSesame is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with OpenSesame.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import random
+import shlex
+import unittest
+
+class check_script_lexer(unittest.TestCase):
+
+	"""
+	desc:
+		Checks whether `script_lexer.split()` splits lines in the same way as
+		`shlex.split()`.
+	"""
+
+	def shlexSplit(self, line):
+
+		"""
+		desc:
+			Splits a line with `shlex`, which does not handle unicode directly.
+
+		arguments:
+			line:
+				desc:	A line of script.
+				type:	unicode
+
+		returns:
+			desc:	A list of tokens, or a tuple with the error message if
+					the line cannot be split.
+			type:	[list, tuple]
+		"""
+
+		try:
+			return [token.decode(u'utf-8') for token in \
+				shlex.split(line.encode(u'utf-8'))]
+		except ValueError as e:
+			return u'error', unicode(e)
+
+	def lexerSplit(self, line):
+
+		"""
+		desc:
+			Splits a line with `script_lexer`, without using the token cache.
+
+		arguments:
+			line:
+				desc:	A line of script.
+				type:	unicode
+
+		returns:
+			desc:	A list of tokens, or a tuple with the error message if
+					the line cannot be split.
+			type:	[list, tuple]
+		"""
+
+		from libopensesame import script_lexer
+		script_lexer.token_cache.clear()
+		try:
+			return script_lexer.split(line)
+		except ValueError as e:
+			return u'error', unicode(e)
+
+	def checkLine(self, line):
+
+		"""
+		desc:
+			Checks a single line.
+
+		arguments:
+			line:
+				desc:	A line of script.
+				type:	unicode
+		"""
+
+		self.assertEqual(self.lexerSplit(line), self.shlexSplit(line),
+			msg=repr(line))
+
+	def runTest(self):
+
+		"""
+		desc:
+			Checks typical lines of script, quoting and escaping edge cases,
+			and randomly generated lines.
+		"""
+
+		for line in [
+			u'',
+			u'   ',
+			u'set a b',
+			u'set a "b c"',
+			u'setcycle 0 word "hello world"',
+			u'\tdraw textline 0 0 "It\'s \\"quoted\\"" center=1',
+			u'set description "Tab\there"',
+			u'set a "é ü ñ"',
+			u'set a "[var]"=1',
+			u'a"b c"d',
+			u"a'b c'd",
+			u'"" \'\'',
+			u'"\\\\" "\\a" \'\\\'',
+			u'a\\ b c',
+			u'a\\"b',
+			u'"unclosed',
+			u"'unclosed",
+			u'ends with \\',
+			u'"ends with \\',
+			u'"ends with \\\\',
+			u'"a\\"',
+			u'a\nb',
+			u'#comment "quoted"',
+			]:
+			self.checkLine(line)
+		# A line that is split twice gives the same tokens from the cache,
+		# without sharing the list
+		from libopensesame import script_lexer
+		tokens = script_lexer.split(u'set a "b c"')
+		tokens.append(u'x')
+		self.assertEqual(script_lexer.split(u'set a "b c"'),
+			[u'set', u'a', u'b c'])
+		alphabet = [u'a', u'b', u' ', u'\t', u'"', u"'", u'\\', u'é', u'=',
+			u'[', u'#', u'\n', u'x']
+		rand = random.Random(0)
+		for i in range(5000):
+			self.checkLine(u''.join(rand.choice(alphabet) for j in \
+				range(rand.randint(0, 30))))
+
+if __name__ == '__main__':
+	unittest.main()
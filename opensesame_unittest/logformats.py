@@ -0,0 +1,136 @@
+#!/usr/bin/env python
+#-*- coding:utf-8 -*-
+
+"""
+This file is part of OpenSesame.
+
+OpenSesame is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+OpenSesame is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with OpenSesame.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+script = u'''
+set start "block"
+set log_flush_rows 2
+
+define loop block
+	set cycles 5
+	set repeat 1
+	set order "sequential"
+	set item "trial"
+	setcycle 0 word "a"
+	setcycle 1 word "b, \\"c\\""
+	setcycle 2 word "d"
+	setcycle 3 word "e"
+	setcycle 4 word "f"
+
+define sequence trial
+	run log_word "always"
+	run log_count "always"
+
+define logger log_word
+	set auto_log "no"
+	log "word"
+	log "count_trial"
+
+define logger log_count
+	set auto_log "no"
+	log "count_log_count"
+'''
+
+class check_log_formats(unittest.TestCase):
+
+	"""
+	desc:
+		Checks whether the log formats write the same rows, using an
+		experiment with two loggers that log different variables.
+	"""
+
+	def setUp(self):
+
+		self.folder = tempfile.mkdtemp(suffix=u'.opensesame_unittest')
+
+	def tearDown(self):
+
+		shutil.rmtree(self.folder, ignore_errors=True)
+
+	def runExperiment(self, log_format):
+
+		"""
+		desc:
+			Runs the experiment with the null back-ends.
+
+		arguments:
+			log_format:
+				desc:	The log format.
+				type:	unicode
+
+		returns:
+			desc:	The path of the log file.
+			type:	unicode
+		"""
+
+		from libopensesame.experiment import experiment
+		logfile = os.path.join(self.folder, u'%s.csv' % log_format)
+		exp = experiment(u'log_formats', script, logfile=logfile)
+		exp.set(u'log_format', log_format)
+		for category in (u'canvas', u'keyboard', u'mouse', u'sampler',
+			u'synth'):
+			exp.set(u'%s_backend' % category, u'null')
+		exp.run()
+		return logfile
+
+	def runTest(self):
+
+		"""
+		desc:
+			Compares the csv, buffered_csv, and npz log formats.
+		"""
+
+		csv = open(self.runExperiment(u'csv')).read()
+		self.assertEqual(open(self.runExperiment(u'buffered_csv')).read(),
+			csv)
+		try:
+			import numpy
+		except ImportError:
+			return
+		path = self.runExperiment(u'npz')
+		npz_path = os.path.splitext(path)[0] + u'.npz'
+		self.assertFalse(os.path.exists(npz_path + u'.journal'))
+		npz = numpy.load(npz_path)
+		# Five rows per table, in chunks of two rows
+		self.assertEqual(sorted(npz.files), sorted(
+			[u'table00_chunk%.4d_%s' % (chunk, name) for chunk in \
+			range(3) for name in (u'word', u'count_trial')] +
+			[u'table01_chunk%.4d_count_log_count' % chunk for chunk in \
+			range(3)]))
+		def column(table, name):
+			return list(numpy.concatenate([npz[u'table%.2d_chunk%.4d_%s' % \
+				(table, chunk, name)] for chunk in range(3)]))
+		self.assertEqual(column(0, u'word'),
+			[u'a', u'b, "c"', u'd', u'e', u'f'])
+		self.assertEqual(column(0, u'count_trial'), [0., 1., 2., 3., 4.])
+		self.assertEqual(column(1, u'count_log_count'), [0., 1., 2., 3., 4.])
+		# The csv log contains the same rows, with a header for each logger
+		self.assertEqual(csv.count(u'count_trial,word\n'), 1)
+		self.assertEqual(csv.count(u'count_log_count\n'), 1)
+		for row in [u'"0","a"\n', u'"4","f"\n', u'"4"\n']:
+			self.assertTrue(row in csv)
+		npz.close()
+
+if __name__ == '__main__':
+	unittest.main()
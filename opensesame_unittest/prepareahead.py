@@ -0,0 +1,144 @@
+#!/usr/bin/env python
+#-*- coding:utf-8 -*-
+
+"""
+This file is part of OpenSesame.
+
+OpenSesame is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+OpenSesame is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with OpenSesame.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+# The inline script draws a random number after each sketchpad, and records
+# how many stimuli are in the cache during the first trial
+script = u'''
+set start "experiment"
+
+define sequence experiment
+	run init "always"
+	run block "always"
+
+define inline_script init
+	___run__
+	import random
+	random.seed(1)
+	cached = None
+	__end__
+
+define loop block
+	set cycles 4
+	set repeat 2
+	set order "random"
+	set item "trial"
+	set prepare_ahead "%(prepare_ahead)s"
+	setcycle 0 orient 0
+	setcycle 0 word "a"
+	setcycle 1 orient 45
+	setcycle 1 word "b"
+	setcycle 2 orient 90
+	setcycle 2 word "c"
+	setcycle 3 orient 135
+	setcycle 3 word "d"
+
+define sequence trial
+	run patch "always"
+	run draw "always"
+	run log "always"
+
+define sketchpad patch
+	set duration 0
+	draw gabor 0 0 orient=[orient] freq=0.05 env=gaussian size=64 stdev=12 phase=0 color1=white color2=black bgmode=avg show_if="always"
+	draw textline 0 100 "[word]" center=1 color=white font_family="mono" font_size=18 font_italic=no font_bold=no show_if="always"
+
+define inline_script draw
+	___run__
+	exp.set(u'r', random.random())
+	if cached is None:
+		cached = len(exp.stimulus_cache)
+	__end__
+
+define logger log
+	set auto_log "no"
+	log "count_trial"
+	log "orient"
+	log "word"
+	log "r"
+'''
+
+class check_prepare_ahead(unittest.TestCase):
+
+	"""
+	desc:
+		Checks whether a loop that prepares its cycles ahead runs exactly as a
+		loop that doesn't, while generating its stimuli before the first
+		cycle.
+	"""
+
+	def setUp(self):
+
+		self.folder = tempfile.mkdtemp(suffix=u'.opensesame_unittest')
+
+	def tearDown(self):
+
+		shutil.rmtree(self.folder, ignore_errors=True)
+
+	def runExperiment(self, prepare_ahead):
+
+		"""
+		desc:
+			Runs the experiment with the null back-ends.
+
+		arguments:
+			prepare_ahead:
+				desc:	The value of the loop's prepare_ahead variable.
+				type:	unicode
+
+		returns:
+			desc:	A (log, cached) tuple, where log is the contents of the log
+					file, and cached is the number of stimuli that were in
+					the cache during the first trial.
+			type:	tuple
+		"""
+
+		from libopensesame.experiment import experiment
+		logfile = os.path.join(self.folder, u'%s.csv' % prepare_ahead)
+		exp = experiment(u'prepare_ahead', script % {u'prepare_ahead' : \
+			prepare_ahead}, logfile=logfile)
+		for category in (u'canvas', u'keyboard', u'mouse', u'sampler',
+			u'synth'):
+			exp.set(u'%s_backend' % category, u'null')
+		exp.run()
+		return open(logfile).read(), exp.python_workspace[u'cached']
+
+	def runTest(self):
+
+		"""
+		desc:
+			Compares the log files of a seeded experiment, with and without
+			preparing ahead.
+		"""
+
+		log, cached = self.runExperiment(u'no')
+		log_ahead, cached_ahead = self.runExperiment(u'yes')
+		self.assertEqual(log.count(u'\n'), 9)
+		self.assertEqual(log_ahead, log)
+		# Without preparing ahead, only the Gabor patch and word of the first
+		# trial are cached during the first trial, otherwise all four of each
+		self.assertEqual((cached, cached_ahead), (2, 8))
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,183 @@
+#!/usr/bin/env python
+#-*- coding:utf-8 -*-
+
+"""
+This file is part of OpenSesame.
+
+OpenSesame is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+OpenSesame is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with OpenSesame.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from StringIO import StringIO
+
+script = u'''
+set start "experiment"
+set description "Ünïcode description"
+set subject_parity "even"
+
+define sequence experiment
+	run instructions "always"
+	run block "always"
+
+define sketchpad instructions
+	set duration "keypress"
+	draw textline 0 0 "Press a key, ök?" center=1 color=white font_family="mono" font_size=18 font_italic=no font_bold=no show_if="always"
+
+define loop block
+	set cycles 100
+	set repeat 1
+	set order "random"
+	set item "trial"
+%(cycles)s
+
+define sequence trial
+	run code "always"
+	run response "[word] != 'skip'"
+	run log "always"
+
+define inline_script code
+	___run__
+	# A comment, with a tab	and "quotes"
+	word = self.get(u'word')
+	__end__
+	set _prepare ""
+
+define keyboard_response response
+	set allowed_responses "z;m"
+	set timeout 2000
+
+define logger log
+	log "word"
+	log "response"
+'''
+
+class check_scripts(unittest.TestCase):
+
+	"""
+	desc:
+		Checks whether experiment scripts are read and written without
+		changes, from strings and from files.
+	"""
+
+	def setUp(self):
+
+		self.folder = tempfile.mkdtemp(suffix=u'.opensesame_unittest')
+		self.script = script % {u'cycles' : u'\n'.join(
+			u'\tsetcycle %d word "wörd %d"' % (i, i) for i in range(100))}
+
+	def tearDown(self):
+
+		shutil.rmtree(self.folder, ignore_errors=True)
+
+	def body(self, exp):
+
+		"""
+		desc:
+			Gives the script of an experiment without the header, which
+			contains the current time.
+
+		arguments:
+			exp:
+				desc:	The experiment.
+				type:	experiment
+
+		returns:
+			type:	unicode
+		"""
+
+		s = exp.to_string()
+		self.assertTrue(s.startswith(u'# Generated by OpenSesame'))
+		return s.split(u'\n', 3)[3]
+
+	def fromFile(self, string):
+
+		"""
+		desc:
+			Creates an experiment from a script, which is first written to a
+			file. The script is not passed to the constructor directly, because
+			the constructor would first check whether it is a path, which
+			fails for non-ASCII scripts if the file system encoding is ASCII.
+
+		arguments:
+			string:
+				desc:	The script.
+				type:	unicode
+
+		returns:
+			type:	experiment
+		"""
+
+		from libopensesame.experiment import experiment
+		path = os.path.join(self.folder, u'script.opensesame')
+		with open(path, u'w') as fd:
+			fd.write(string.encode(u'utf-8'))
+		return experiment(u'scripts', path)
+
+	def fromLines(self, data):
+
+		"""
+		desc:
+			Creates an experiment from a script through `read_script()`, as
+			for scripts in archives.
+
+		arguments:
+			data:
+				desc:	The script.
+				type:	str
+
+		returns:
+			type:	experiment
+		"""
+
+		from libopensesame.experiment import experiment
+		exp = experiment(u'scripts', u'set start "experiment"\n')
+		exp.read_script(StringIO(data))
+		return exp
+
+	def runTest(self):
+
+		"""
+		desc:
+			Reads and writes the script in several ways.
+		"""
+
+		exp = self.fromFile(self.script)
+		body = self.body(exp)
+		self.assertEqual(exp.description, u'Ünïcode description')
+		self.assertEqual(len(exp.items[u'block'].matrix), 100)
+		self.assertEqual(exp.items[u'block'].matrix[99][u'word'], u'wörd 99')
+		self.assertTrue(u'# A comment, with a tab\tand "quotes"' in \
+			exp.items[u'code']._run)
+		# Reading the script back gives the same script
+		self.assertEqual(self.body(self.fromFile(exp.to_string())), body)
+		# The script is written with special characters in U+XXXX notation,
+		# so that the file is plain ASCII
+		fd = StringIO()
+		exp.write_script(fd)
+		data = fd.getvalue()
+		self.assertEqual(self.body(self.fromFile(data.decode(u'ascii'))),
+			body)
+		# Files with Windows line endings are read in the same way, also when
+		# they are read through read_script() directly
+		body = self.body(self.fromLines(data))
+		self.assertEqual(self.body(self.fromLines(data.replace('\n',
+			'\r\n'))), body)
+		self.assertEqual(self.fromLines(data.replace('\n', '\r\n')).get(
+			u'subject_parity'), u'even')
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,183 @@
+#!/usr/bin/env python
+#-*- coding:utf-8 -*-
+
+"""
+This file is part of OpenSesame.
+
+OpenSesame is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+OpenSesame is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with OpenSesame.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+# Inline scripts that record in the workspace that they have been run
+script = u'''
+set start "main"
+set x 1
+
+define sequence main
+	run init "always"
+	run container "always"
+
+define inline_script init
+	___run__
+	runs = []
+	__end__
+
+define inline_script a
+	___run__
+	runs.append(u'a')
+	__end__
+
+define inline_script b
+	___run__
+	runs.append(u'b')
+	__end__
+
+define inline_script c
+	___run__
+	runs.append(u'c')
+	__end__
+
+define %(container)s container
+	run a "always"
+	run b "[x] = 1"
+	run c "never"
+'''
+
+def run_experiment(container, replace=None):
+
+	"""
+	desc:
+		Runs an experiment, in which a sequence or parallel runs three inline
+		scripts, with the null back-ends.
+
+	arguments:
+		container:
+			desc:	The item type that runs the inline scripts.
+			type:	unicode
+
+	keywords:
+		replace:
+			desc:	A function that changes the experiment after it has been
+					run, after which the experiment is run again, or None to
+					run the experiment only once.
+			type:	[function, NoneType]
+
+	returns:
+		desc:	A list of the inline scripts that have been run, for each run.
+		type:	list
+	"""
+
+	from libopensesame.experiment import experiment
+	folder = tempfile.mkdtemp(suffix=u'.opensesame_unittest')
+	try:
+		exp = experiment(u'sequences', script % {u'container' : container},
+			logfile=os.path.join(folder, u'log.csv'))
+		for category in (u'canvas', u'keyboard', u'mouse', u'sampler',
+			u'synth'):
+			exp.set(u'%s_backend' % category, u'null')
+		exp.run()
+		runs = [sorted(exp.python_workspace[u'runs'])]
+		if replace is not None:
+			replace(exp)
+			exp.run()
+			runs.append(sorted(exp.python_workspace[u'runs']))
+	finally:
+		shutil.rmtree(folder, ignore_errors=True)
+	return runs
+
+def replace_b(exp):
+
+	"""
+	desc:
+		Replaces item b by another inline script, without changing the
+		sequence or parallel itself.
+
+	arguments:
+		exp:
+			desc:	The experiment.
+			type:	experiment
+	"""
+
+	from libopensesame.inline_script import inline_script
+	exp.items[u'b'] = inline_script(u'b', exp,
+		u'___run__\nruns.append(u\'B\')\n__end__\n')
+
+def enable_c(exp):
+
+	"""
+	desc:
+		Changes the run-if statement of item c in the list of items of the
+		sequence or parallel, as the GUI does, without changing the
+		experiment's items.
+
+	arguments:
+		exp:
+			desc:	The experiment.
+			type:	experiment
+	"""
+
+	exp.items[u'container'].items[2] = u'c', u'always'
+
+class check_sequence(unittest.TestCase):
+
+	"""
+	desc:
+		Checks whether a sequence runs its items, according to their run-if
+		statements, and whether its execution plan follows changes to the
+		experiment's items.
+	"""
+
+	def runTest(self):
+
+		"""
+		desc:
+			Runs a sequence twice.
+		"""
+
+		self.assertEqual(run_experiment(u'sequence', replace_b),
+			[[u'a', u'b'], [u'B', u'a']])
+		self.assertEqual(run_experiment(u'sequence', enable_c),
+			[[u'a', u'b'], [u'a', u'b', u'c']])
+
+class check_parallel(unittest.TestCase):
+
+	"""
+	desc:
+		Checks whether the parallel plug-in, which derives from the sequence,
+		runs its items.
+	"""
+
+	def runTest(self):
+
+		"""
+		desc:
+			Runs a parallel twice.
+		"""
+
+		# The parallel plug-in also contains the GUI, which requires PyQt4
+		try:
+			import PyQt4
+		except ImportError:
+			self.skipTest(u'the parallel plug-in requires PyQt4')
+		self.assertEqual(run_experiment(u'parallel', replace_b),
+			[[u'a', u'b'], [u'B', u'a']])
+		self.assertEqual(run_experiment(u'parallel', enable_c),
+			[[u'a', u'b'], [u'a', u'b', u'c']])
+
+if __name__ == '__main__':
+	unittest.main()
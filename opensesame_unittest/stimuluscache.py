@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+#-*- coding:utf-8 -*-
+
+"""
+This file is part of OpenSesame.
+
+OpenSesame is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+OpenSesame is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with OpenSesame.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import unittest
+
+class check_stimulus_cache(unittest.TestCase):
+
+	"""
+	desc:
+		Checks whether the stimulus cache stays within its memory budget, and
+		evicts the least-recently-used stimuli first.
+	"""
+
+	def runTest(self):
+
+		"""
+		desc:
+			Fills the cache beyond its budget.
+		"""
+
+		from libopensesame.stimulus_cache import stimulus_cache
+		cache = stimulus_cache(max_bytes=100)
+		for key in u'abcd':
+			cache.put(key, key.upper(), size=30)
+		self.assertEqual(len(cache), 3)
+		self.assertEqual(cache.nbytes, 90)
+		self.assertEqual(cache.evictions, 1)
+		self.assertFalse(u'a' in cache)
+		# Using 'b' makes 'c' the least-recently-used stimulus
+		self.assertEqual(cache.get(u'b'), u'B')
+		cache.put(u'e', u'E', size=30)
+		self.assertTrue(u'b' in cache)
+		self.assertFalse(u'c' in cache)
+		self.assertEqual(cache.get(u'c', u'miss'), u'miss')
+		self.assertEqual((cache.hits, cache.misses, cache.evictions),
+			(1, 1, 2))
+		# Replacing a stimulus doesn't count its size twice
+		cache.put(u'e', u'E', size=30)
+		self.assertEqual(cache.nbytes, 90)
+		# Stimuli that are larger than the budget are not cached
+		cache.put(u'f', u'F', size=101)
+		self.assertFalse(u'f' in cache)
+		cache.resize(30)
+		self.assertEqual(len(cache), 1)
+		self.assertTrue(u'e' in cache)
+		cache.resize(0)
+		cache.put(u'g', u'G', size=1)
+		self.assertEqual((len(cache), cache.nbytes), (0, 0))
+		cache.reset_stats()
+		self.assertEqual((cache.hits, cache.misses, cache.evictions),
+			(0, 0, 0))
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+#-*- coding:utf-8 -*-
+
+"""
+This file is part of OpenSesame.
+
+OpenSesame is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+OpenSesame is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with OpenSesame.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import unittest
+
+class check_synth_waveforms(unittest.TestCase):
+
+	"""
+	desc:
+		Checks whether synth tones are cached, and whether voices are mixed
+		into a single buffer.
+	"""
+
+	def runTest(self):
+
+		"""
+		desc:
+			Generates tones with the null back-ends.
+		"""
+
+		try:
+			import numpy
+		except ImportError:
+			self.skipTest(u'the synth requires NumPy')
+		from libopensesame.experiment import experiment
+		from openexp.synth import synth
+		exp = experiment(u'synth',
+			u'set start "trial"\ndefine sequence trial\n')
+		for category in (u'canvas', u'keyboard', u'mouse', u'sampler',
+			u'synth'):
+			exp.set(u'%s_backend' % category, u'null')
+		cache = exp.stimulus_cache
+		cache.clear()
+		cache.reset_stats()
+		# A repeated tone is taken from the cache
+		my_synth = synth(exp, osc=u'saw', freq=440, length=100)
+		self.assertEqual((cache.hits, len(cache)), (0, 1))
+		synth(exp, osc=u'saw', freq=440, length=100)
+		self.assertEqual((cache.hits, len(cache)), (1, 1))
+		# White noise is different each time, and is not cached
+		synth(exp, osc=u'white_noise', length=100)
+		synth(exp, osc=u'white_noise', length=100)
+		self.assertEqual((cache.hits, len(cache)), (1, 1))
+		# A tone without decay ends at full volume
+		wave = my_synth.waveform(u'square', 10, 100, 0, 0, 1000)
+		self.assertEqual(len(wave), 100)
+		self.assertEqual(numpy.abs(wave).min(), 1)
+		# The second voice starts halfway the first voice, and the sound
+		# lasts until the end of the second voice
+		buf = my_synth.mix([
+			{u'osc' : u'square', u'freq' : 10, u'length' : 100,
+				u'decay' : 0, u'volume' : .5},
+			{u'osc' : u'square', u'freq' : 10, u'length' : 100,
+				u'decay' : 0, u'volume' : .25, u'onset' : 50},
+			], 1000)
+		self.assertEqual(len(buf), 150)
+		self.assertEqual(numpy.abs(buf[:50]).max(), .5)
+		self.assertEqual(numpy.abs(buf[100:]).max(), .25)
+		cache.clear()
+
+if __name__ == '__main__':
+	unittest.main()
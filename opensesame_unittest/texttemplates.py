@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+#-*- coding:utf-8 -*-
+
+"""
+This file is part of OpenSesame.
+
+OpenSesame is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+OpenSesame is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with OpenSesame.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import unittest
+
+class check_text_template(unittest.TestCase):
+
+	"""
+	desc:
+		Checks whether text templates and `item.eval_text()` substitute
+		variable references.
+	"""
+
+	def runTest(self):
+
+		"""
+		desc:
+			Renders templates directly and through `eval_text()`.
+		"""
+
+		from libopensesame import text_template
+		template = text_template.get(u'x [a] y [a] [b-c] []')
+		self.assertTrue(text_template.get(u'x [a] y [a] [b-c] []') is \
+			template)
+		self.assertEqual(template.dependencies, frozenset([u'a']))
+		self.assertEqual(template.render({u'a' : u'A'}),
+			u'x A y A [b-c] []')
+		self.assertEqual(template.render({}), u'x [a] y [a] [b-c] []')
+		from libopensesame.experiment import experiment
+		exp = experiment(u'text_template',
+			u'set start "trial"\ndefine sequence trial\n')
+		exp.set(u'a', u'A')
+		exp.set(u'n', 3)
+		exp.set(u'f', 1.23456)
+		exp.set(u'ref', u'a')
+		exp.set(u'nested', u'[a]')
+		for text, kwdict, result in [
+			(u'plain', {}, u'plain'),
+			(u'x [a] y [a]', {}, u'x A y A'),
+			(u'[n]', {}, 3),
+			(u'[f]', {}, 1.23456),
+			(u'[f]', {u'round_float' : True}, 1.23),
+			(u'[[ref]]', {}, u'A'),
+			(u'[nested]', {}, u'A'),
+			(u'[a]', {u'quote_str' : True}, u"'A'"),
+			(u'[missing]', {u'soft_ignore' : True}, u'[missing]'),
+			(u'[a] [missing]', {u'soft_ignore' : True}, u'A [missing]'),
+			]:
+			self.assertEqual(exp.eval_text(text, **kwdict), result)
+
+if __name__ == '__main__':
+	unittest.main()
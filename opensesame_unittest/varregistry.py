@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+#-*- coding:utf-8 -*-
+
+"""
+This file is part of OpenSesame.
+
+OpenSesame is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+OpenSesame is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with OpenSesame.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import unittest
+
+script = u'''
+set start "block"
+
+define loop block
+	set item "trial"
+	setcycle 0 word "a"
+	setcycle 1 word "b"
+
+define sequence trial
+	run kb "always"
+	run log "always"
+
+define keyboard_response kb
+
+define logger log
+'''
+
+class check_var_registry(unittest.TestCase):
+
+	"""
+	desc:
+		Checks whether the variable registry lists the same variables as
+		querying all items, and whether its cache follows changes to items.
+	"""
+
+	def allNames(self, exp):
+
+		"""
+		desc:
+			Lists all variables by querying all items.
+
+		arguments:
+			exp:
+				desc:	The experiment.
+				type:	experiment
+
+		returns:
+			desc:	A sorted list of variable names.
+			type:	list
+		"""
+
+		names = set()
+		for item in exp.items.values() + [exp]:
+			for var, val in item.var_info() + item.variables.items():
+				names.add(var)
+		return sorted(names)
+
+	def checkNames(self, exp, present, absent):
+
+		"""
+		desc:
+			Checks the names in the registry.
+
+		arguments:
+			exp:
+				desc:	The experiment.
+				type:	experiment
+			present:
+				desc:	Variables that should be listed.
+				type:	list
+			absent:
+				desc:	Variables that should not be listed.
+				type:	list
+		"""
+
+		names = exp.var_registry.names()
+		self.assertEqual(sorted(names), self.allNames(exp))
+		self.assertEqual(len(names), len(set(names)))
+		for var in present:
+			self.assertTrue(var in exp.var_registry, msg=var)
+		for var in absent:
+			self.assertFalse(var in exp.var_registry, msg=var)
+
+	def runTest(self):
+
+		"""
+		desc:
+			Changes the variables of an experiment in several ways.
+		"""
+
+		from libopensesame.experiment import experiment
+		exp = experiment(u'var_registry', script)
+		self.checkNames(exp, [u'word', u'response_kb', u'count_block'],
+			[u'color', u'new_var'])
+		# The list is cached as long as nothing changes
+		self.assertTrue(exp.var_registry.names() is exp.var_registry.names())
+		self.assertEqual(sorted(var for var, val, item_name in \
+			exp.var_list(u'time_kb')), [u'response_time_kb', u'time_kb'])
+		exp.set(u'new_var', 1)
+		self.checkNames(exp, [u'new_var'], [])
+		exp.unset(u'new_var')
+		self.checkNames(exp, [], [u'new_var'])
+		exp.items[u'block'].from_string(
+			u'set item "trial"\nsetcycle 0 color "red"\n')
+		self.checkNames(exp, [u'color'], [u'word'])
+		exp.items.new(u'keyboard_response', u'kb2')
+		self.checkNames(exp, [u'response_kb2'], [])
+		del exp.items[u'kb2']
+		self.checkNames(exp, [], [u'response_kb2'])
+
+if __name__ == '__main__':
+	unittest.main()
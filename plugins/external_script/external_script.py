@@ -62,8 +62,8 @@ class external_script(item.item):
 		
 		if self.module == None:
 			try:
-				self.module = imp.load_source("file", os.path.join( \
-					self.experiment.pool_folder, self.file))
+				self.module = imp.load_source("file",
+					self.experiment.get_file(self.file))
 			except Exception as e:
 				raise osexception( \
 					"Failed to import '%s' in the prepare phase of external_script item '%s': %s" \
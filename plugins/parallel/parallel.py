@@ -71,22 +71,21 @@ class parallel(sequence.sequence):
 			self._keyboard.flush()
 			
 		# Do nothing if there are no items
-		if len(self._items) == 0:
+		if len(self._plan) == 0:
 			return
 		
-		# The first item is the main item, which is not executed in a thread
-		item, cond = self._items[0]
-		if eval(cond):
-			main_item = self.experiment.items[item]
-		else:
+		# The first item is the main item, which is not executed in a thread.
+		# The plan contains (item, bytecode) tuples, where the bytecode is
+		# None for items that are always run (see sequence.compile_plan()).
+		main_item, cond = self._plan[0]
+		if cond is not None and not eval(cond):
 			main_item = None
 						
 		# Create a list of threads for the rest of the items
 		tl = []	
-		if len(self._items) > 1:
-			for item, cond in self._items[1:]:		
-				if eval(cond):				
-					tl.append(parallel_process(self.experiment.items[item]))
+		for _item, cond in self._plan[1:]:
+			if cond is None or eval(cond):
+				tl.append(parallel_process(_item))
 										
 		# Run all threads
 		for t in tl:
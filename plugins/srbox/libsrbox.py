@@ -243,6 +243,7 @@ class libsrbox:
 						l.append(8)
 					if l != []:
 						return l, t
+			self.experiment.poller.idle(t - c, timeout)
 		return None, t
 
 	def close(self):